@@ -0,0 +1,100 @@
+from pathlib import Path
+import argparse
+import json
+import sys
+
+
+def load_results(results_file: Path) -> dict:
+    """Reads the results written by benchmarks.runner."""
+    with open(results_file, "r", encoding="utf-8") as results_stream:
+        return json.load(results_stream)
+
+
+def compare(baseline: dict, candidate: dict, threshold: float = 0.1) -> list[dict]:
+    """ Compares the median total time of all cases that are in both results.
+        :param threshold: Relative slowdown above which a case counts as regression
+        :return: One entry per case with both times, the ratio, whether it regressed and both memory uses"""
+    baseline_cases = {case["name"]: case for case in baseline["corpus"] + baseline["synthetic"]}
+    comparison = []
+    for case in candidate["corpus"] + candidate["synthetic"]:
+        if case["name"] not in baseline_cases:
+            continue
+        before = baseline_cases[case["name"]]["total"]["median"]
+        after = case["total"]["median"]
+        ratio = after / before if before > 0 else float("inf")
+        comparison.append({"name": case["name"], "baseline": before, "candidate": after, "ratio": ratio,
+                           "regression": ratio > 1 + threshold,
+                           "memory": (baseline_cases[case["name"]].get("memory"), case.get("memory"))})
+    return comparison
+
+
+def compare_startup(baseline: dict, candidate: dict, threshold: float = 0.1) -> list[dict]:
+    """ Compares the median start time of all commands that are in both results.
+        :param threshold: Relative slowdown above which a command counts as regression
+        :return: One entry per command with both times, the ratio and whether it regressed"""
+    baseline_startup = baseline.get("startup", {})
+    comparison = []
+    for name, timing in candidate.get("startup", {}).items():
+        if name not in baseline_startup:
+            continue
+        before = baseline_startup[name]["median"]
+        after = timing["median"]
+        ratio = after / before if before > 0 else float("inf")
+        comparison.append({"name": name, "baseline": before, "candidate": after, "ratio": ratio,
+                           "regression": ratio > 1 + threshold})
+    return comparison
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compares two results of benchmarks.runner, for example of two "
+                                                 "commits.")
+    parser.add_argument("baseline", type=Path, help="Results of the reference commit.")
+    parser.add_argument("candidate", type=Path, help="Results to compare with the reference.")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative slowdown above which a case is reported as regression (default: 0.1).")
+    args = parser.parse_args(argv)
+
+    baseline = load_results(args.baseline)
+    candidate = load_results(args.candidate)
+    comparison = compare(baseline, candidate, args.threshold)
+    startup = compare_startup(baseline, candidate, args.threshold)
+    if not comparison and not startup:
+        print("The results have no cases in common.")
+        return 1
+
+    print(f"Baseline:  {baseline['meta'].get('revision')} ({baseline['meta'].get('date')})")
+    print(f"Candidate: {candidate['meta'].get('revision')} ({candidate['meta'].get('date')})")
+    name_width = max(len(entry["name"]) for entry in comparison + startup)
+    for title, entries in (("Startup", startup), ("Case", comparison)):
+        if not entries:
+            continue
+        print(f"{title:<{name_width}}  {'Baseline [ms]':>13}  {'Candidate [ms]':>14}  {'Ratio':>6}")
+        for entry in entries:
+            marker = "  regression" if entry["regression"] else ""
+            print(f"{entry['name']:<{name_width}}  {entry['baseline'] * 1000:>13.3f}  "
+                  f"{entry['candidate'] * 1000:>14.3f}  {entry['ratio']:>6.2f}{marker}")
+
+    memory = [entry for entry in comparison if None not in entry["memory"]]
+    if memory:
+        print()
+        print(f"{'Case':<{name_width}}  {'Baseline model [KiB]':>20}  {'Candidate model [KiB]':>21}  "
+              f"{'Baseline peak [KiB]':>19}  {'Candidate peak [KiB]':>20}")
+        for entry in memory:
+            before, after = entry["memory"]
+            print(f"{entry['name']:<{name_width}}  {before['model'] / 1024:>20.1f}  {after['model'] / 1024:>21.1f}  "
+                  f"{before['peak'] / 1024:>19.1f}  {after['peak'] / 1024:>20.1f}")
+
+    stages = [stage for stage in candidate.get("scaling", {}) if stage in baseline.get("scaling", {})]
+    if stages:
+        print()
+        print(f"{'Scaling exponent':<30}  {'Baseline':>8}  {'Candidate':>9}")
+        for stage in stages:
+            before, after = baseline["scaling"][stage], candidate["scaling"][stage]
+            if before is not None and after is not None:
+                print(f"{stage:<30}  {before:>8.2f}  {after:>9.2f}")
+
+    return 1 if any(entry["regression"] for entry in comparison + startup) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
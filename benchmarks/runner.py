@@ -0,0 +1,247 @@
+from pathlib import Path
+import argparse
+import datetime
+import json
+import math
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import yaml
+
+from controller_utils.myutils.UT_PCErrorLogging import UT_PCErrorLogging
+from controller_utils.precice_struct import PS_PreCICEConfig
+from controller_utils.ui_struct import UI_UserInput
+from generation_utils.file_generator import FileGenerator
+from generation_utils.profiler import Profiler
+from generation_utils.topology_document import TopologyDocument
+from generation_utils.topology_formats import TOPOLOGY_FORMATS, dump_topology
+
+from .startup import measure_startup, print_startup
+from .synthetic_topology import COUPLING_KINDS, SHAPES, write_topology
+
+REPOSITORY = Path(__file__).parent.parent
+DEFAULT_SIZES = [2, 4, 8, 16, 32, 64, 128, 256, 512]
+
+
+def run_pipeline(topology_file: Path, output_root: Path) -> dict:
+    """ Runs the complete generation pipeline once, like `precice-gen` does.
+        :return: Time of every stage and the total time in seconds"""
+    profiler = Profiler()
+    start = time.perf_counter()
+    file_generator = FileGenerator(topology_file, output_root, jobs=1, profiler=profiler)
+    file_generator.logger.clear_log_state()
+    file_generator.generate()
+    file_generator.check_topology()
+    total = time.perf_counter() - start
+
+    if file_generator.logger.has_errors():
+        raise RuntimeError(f"Generation of {topology_file} failed: {file_generator.logger.get_errors()}")
+    stages = {stage["name"]: stage["total"] for stage in profiler.summary()}
+    return {"total": total, "stages": stages}
+
+
+def measure_memory(topology_file: Path, output_root: Path) -> dict:
+    """ Traces the allocations of one pipeline run. Tracing slows the run down, so it is not part of the timed runs.
+        :return: The peak of the pipeline and the size of the data model (the UI and preCICE structures) in bytes"""
+    tracemalloc.start()
+    try:
+        file_generator = FileGenerator(topology_file, output_root, jobs=1)
+        file_generator.logger.clear_log_state()
+        file_generator.generate()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    del file_generator
+
+    topology = TopologyDocument.from_file(topology_file)
+    tracemalloc.start()
+    try:
+        user_input = UI_UserInput()
+        user_input.init_from_yaml(topology.data, UT_PCErrorLogging())
+        precice_config = PS_PreCICEConfig()
+        precice_config.create_config(user_input)
+        model = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return {"peak": peak, "model": model}
+
+
+def measure_parse(topology_file: Path, repeat: int) -> dict:
+    """ Times parsing the topology in every supported format, converted from the original file in memory.
+        "yaml-pure" is the pure Python YAML loader that is used if PyYAML was built without libyaml.
+        :return: The median time in seconds by format"""
+    data = TopologyDocument.from_file(topology_file).data
+    parse = {}
+    for topology_format in TOPOLOGY_FORMATS:
+        content = dump_topology(data, topology_format)
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            TopologyDocument(f"topology.{topology_format}", content)
+            times.append(time.perf_counter() - start)
+        parse[topology_format] = statistics.median(times)
+    text = dump_topology(data, "yaml").decode("utf-8")
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        yaml.load(text, Loader=yaml.SafeLoader)
+        times.append(time.perf_counter() - start)
+    parse["yaml-pure"] = statistics.median(times)
+    return parse
+
+
+def benchmark_case(name: str, topology_file: Path, repeat: int, work_dir: Path) -> dict:
+    """ Times a case repeat times, every repetition generates into a fresh folder.
+        :return: The minimum and median of the total time, the median of every stage and the memory use"""
+    case_dir = work_dir / name.replace("/", "_")
+    runs = [run_pipeline(topology_file, case_dir / str(repetition)) for repetition in range(repeat)]
+    totals = [run["total"] for run in runs]
+    stage_names = list(dict.fromkeys(stage for run in runs for stage in run["stages"]))
+    topology = TopologyDocument.from_file(topology_file)
+    return {
+        "name": name,
+        "participants": len(topology.participants),
+        "exchanges": len(topology.exchanges),
+        "repeat": repeat,
+        "total": {"min": min(totals), "median": statistics.median(totals)},
+        "stages": {stage: statistics.median(run["stages"].get(stage, 0.0) for run in runs) for stage in stage_names},
+        "memory": measure_memory(topology_file, case_dir / "memory"),
+        "parse": measure_parse(topology_file, repeat),
+    }
+
+
+def scaling_exponent(cases: list[dict], stage: str = None) -> float:
+    """ Least-squares slope of log(time) over log(participants): about 1 for linear and 2 for quadratic growth.
+        :param stage: The stage to fit, the total time if None"""
+    points = []
+    for case in cases:
+        seconds = case["total"]["median"] if stage is None else case["stages"].get(stage, 0.0)
+        if seconds > 0:
+            points.append((math.log(case["participants"]), math.log(seconds)))
+    if len(points) < 2:
+        return None
+    mean_x = statistics.fmean(x for x, _ in points)
+    mean_y = statistics.fmean(y for _, y in points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if variance == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def git_revision() -> str:
+    """The checked out commit, so that results of two commits can be told apart."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPOSITORY, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes: list[int], repeat: int = 5, kind: str = "FSI", coupling: str = "strong",
+                   shape: str = "star", exchanges_per_pair: int = 1, corpus: bool = True,
+                   startup: bool = True) -> dict:
+    """ Benchmarks the example corpus and synthetic topologies of the given sizes.
+        :param startup: Also time the start of the CLI in fresh interpreters
+        :return: The machine readable results"""
+    results = {
+        "meta": {
+            "revision": git_revision(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "synthetic": {"kind": kind, "coupling": coupling, "shape": shape,
+                          "exchanges-per-pair": exchanges_per_pair},
+        },
+        "corpus": [],
+        "synthetic": [],
+        "startup": measure_startup(repeat) if startup else {},
+    }
+    with tempfile.TemporaryDirectory(prefix="precice-gen-bench-") as work_dir:
+        work_dir = Path(work_dir)
+        if corpus:
+            for topology_file in sorted((REPOSITORY / "examples").rglob("topology.yaml")):
+                name = topology_file.parent.relative_to(REPOSITORY).as_posix()
+                results["corpus"].append(benchmark_case(name, topology_file, repeat, work_dir))
+        for size in sizes:
+            name = f"{shape}-{kind}-{coupling}-{size}"
+            topology_file = write_topology(work_dir / name / "topology.yaml", participants=size,
+                                           exchanges_per_pair=exchanges_per_pair, kind=kind, coupling=coupling,
+                                           shape=shape)
+            results["synthetic"].append(benchmark_case(name, topology_file, repeat, work_dir))
+
+    stages = list(dict.fromkeys(stage for case in results["synthetic"] for stage in case["stages"]))
+    results["scaling"] = {"total": scaling_exponent(results["synthetic"])}
+    results["scaling"].update({stage: scaling_exponent(results["synthetic"], stage) for stage in stages})
+    return results
+
+
+def print_results(results: dict) -> None:
+    """Prints the results as tables."""
+    if results.get("startup"):
+        print_startup(results["startup"])
+        print()
+    cases = results["corpus"] + results["synthetic"]
+    if not cases:
+        return
+    name_width = max(len(case["name"]) for case in cases)
+    print(f"{'Case':<{name_width}}  {'Participants':>12}  {'Exchanges':>9}  {'Min [ms]':>9}  {'Median [ms]':>11}  "
+          f"{'Peak [KiB]':>10}  {'Model [KiB]':>11}")
+    for case in cases:
+        print(f"{case['name']:<{name_width}}  {case['participants']:>12}  {case['exchanges']:>9}  "
+              f"{case['total']['min'] * 1000:>9.3f}  {case['total']['median'] * 1000:>11.3f}  "
+              f"{case['memory']['peak'] / 1024:>10.1f}  {case['memory']['model'] / 1024:>11.1f}")
+
+    parse_formats = list(dict.fromkeys(topology_format for case in cases for topology_format in case.get("parse", {})))
+    if parse_formats:
+        print()
+        print(f"{'Parse [ms]':<{name_width}}  " +
+              "  ".join(f"{topology_format:>9}" for topology_format in parse_formats))
+        for case in cases:
+            print(f"{case['name']:<{name_width}}  " + "  ".join(
+                f"{case['parse'][topology_format] * 1000:>9.3f}" if topology_format in case.get("parse", {})
+                else f"{'':>9}" for topology_format in parse_formats))
+
+    if results["scaling"]["total"] is not None:
+        print()
+        print("Scaling exponents over the participant count (1 = linear, 2 = quadratic):")
+        for stage, exponent in results["scaling"].items():
+            if exponent is not None:
+                print(f"  {stage:<30} {exponent:5.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Times the generation pipeline on the examples and on synthetic "
+                                                 "topologies and writes machine readable results.")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="JSON file for the results.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Participant counts of the synthetic topologies.")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Repetitions of every case.")
+    parser.add_argument("-k", "--kind", choices=sorted(COUPLING_KINDS), default="FSI", help="Coupling kind.")
+    parser.add_argument("-t", "--type", choices=["strong", "weak"], default="strong", help="Exchange type.")
+    parser.add_argument("-s", "--shape", choices=SHAPES, default="star", help="Coupling graph.")
+    parser.add_argument("-e", "--exchanges-per-pair", type=int, default=1,
+                        help="How often the data of the coupling kind is exchanged per coupled pair.")
+    parser.add_argument("--no-corpus", action="store_true", help="Skip the topologies in examples/.")
+    parser.add_argument("--no-startup", action="store_true",
+                        help="Skip timing the start of the CLI and the import of the generator.")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, repeat=args.repeat, kind=args.kind, coupling=args.type, shape=args.shape,
+                             exchanges_per_pair=args.exchanges_per_pair, corpus=not args.no_corpus,
+                             startup=not args.no_startup)
+    print_results(results)
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
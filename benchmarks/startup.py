@@ -0,0 +1,110 @@
+from pathlib import Path
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from .synthetic_topology import write_topology
+
+REPOSITORY = Path(__file__).parent.parent
+CLI = REPOSITORY / "cli.py"
+# A topology that fails the schema validation, the CLI has to reject it before generating anything
+INVALID_TOPOLOGY = "participants: 2\nexchanges: []\n"
+
+
+def startup_commands(work_dir: Path) -> dict[str, list[str]]:
+    """ The commands whose start is timed, each runs in a fresh interpreter.
+        :param work_dir: Folder for the topologies and the generated cases
+        :return: The command line by name"""
+    topology_file = write_topology(work_dir / "small" / "topology.yaml", participants=2)
+    invalid_file = work_dir / "invalid" / "topology.yaml"
+    invalid_file.parent.mkdir(parents=True, exist_ok=True)
+    invalid_file.write_text(INVALID_TOPOLOGY, encoding="utf-8")
+    return {
+        "python": [sys.executable, "-c", "pass"],
+        "cli --help": [sys.executable, str(CLI), "--help"],
+        "cli invalid topology": [sys.executable, str(CLI), "-f", str(invalid_file), "-o", str(invalid_file.parent)],
+        "cli generate 2 participants": [sys.executable, str(CLI), "-f", str(topology_file), "-o",
+                                        str(topology_file.parent), "--no-cache"],
+        "import file_generator": [sys.executable, "-c", "import generation_utils.file_generator"],
+    }
+
+
+def time_command(command: list[str], repeat: int) -> dict:
+    """ Runs a command repeat times.
+        :return: The minimum and median wall time in seconds and the exit code of the last run"""
+    times = []
+    returncode = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        returncode = subprocess.run(command, cwd=REPOSITORY, capture_output=True).returncode
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": statistics.median(times), "returncode": returncode}
+
+
+def import_profile(command: list[str], top: int = 10) -> list[dict]:
+    """ Runs a command once with -X importtime.
+        :param top: Number of modules to report
+        :return: The modules with the highest cumulative import time in seconds, slowest first"""
+    stderr = subprocess.run([command[0], "-X", "importtime"] + command[1:], cwd=REPOSITORY, capture_output=True,
+                            text=True).stderr
+    modules = []
+    for line in stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append({"module": name.strip(), "cumulative": int(cumulative) / 1e6})
+    return sorted(modules, key=lambda module: module["cumulative"], reverse=True)[:top]
+
+
+def measure_startup(repeat: int = 10, top: int = 10) -> dict:
+    """ Times the start of the CLI and the import of the generator, each in a fresh interpreter.
+        :return: The timings and the slowest imports by command name"""
+    with tempfile.TemporaryDirectory(prefix="precice-gen-startup-") as work_dir:
+        commands = startup_commands(Path(work_dir))
+        startup = {}
+        for name, command in commands.items():
+            startup[name] = time_command(command, repeat)
+            startup[name]["imports"] = import_profile(command, top)
+    return startup
+
+
+def print_startup(startup: dict, imports: int = 5) -> None:
+    """ Prints the timings and the slowest imports of every command.
+        :param imports: Number of imports to show per command"""
+    if not startup:
+        return
+    name_width = max(len(name) for name in startup)
+    print(f"{'Startup':<{name_width}}  {'Min [ms]':>9}  {'Median [ms]':>11}  {'Exit':>4}")
+    for name, timing in startup.items():
+        print(f"{name:<{name_width}}  {timing['min'] * 1000:>9.1f}  {timing['median'] * 1000:>11.1f}  "
+              f"{timing['returncode']:>4}")
+    for name, timing in startup.items():
+        if timing["imports"] and imports:
+            print(f"Slowest imports of {name}: " + ", ".join(
+                f"{module['module']} {module['cumulative'] * 1000:.1f} ms" for module in timing["imports"][:imports]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Times the start of the CLI and the import of the generator, "
+                                                 "each in a fresh interpreter.")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="JSON file for the results.")
+    parser.add_argument("-r", "--repeat", type=int, default=10, help="Runs of every command.")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to report per command.")
+    args = parser.parse_args(argv)
+
+    startup = measure_startup(args.repeat, args.top)
+    print_startup(startup, args.top)
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(startup, output_file, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
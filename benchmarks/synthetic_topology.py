@@ -0,0 +1,92 @@
+from pathlib import Path
+import argparse
+import yaml
+
+# Data exchanged per coupling kind: (data, data-type, direction). "forward" is from the fluid to the structure
+COUPLING_KINDS = {
+    # Fluid-structure interaction
+    "FSI": [("Force", "vector", "forward"), ("Displacement", "vector", "backward")],
+    # Conjugate heat transfer
+    "CHT": [("Temperature", "scalar", "forward"), ("HeatTransfer", "scalar", "backward")],
+    # One-way fluid-to-structure coupling
+    "F2S": [("Force", "vector", "forward")],
+}
+
+SHAPES = ("star", "chain")
+
+
+def make_topology(participants: int, exchanges_per_pair: int = 1, kind: str = "FSI", coupling: str = "strong",
+                  shape: str = "star") -> dict:
+    """ Builds a synthetic topology.
+        :param participants: Number of participants, at least 2
+        :param exchanges_per_pair: How often the data of the coupling kind is exchanged between two coupled participants
+        :param kind: Coupling kind, one of FSI, CHT or F2S
+        :param coupling: Exchange type, strong or weak
+        :param shape: star couples one structure with all fluids, chain couples every participant with the next one
+        :return: The topology as it would be parsed from topology.yaml"""
+    if participants < 2:
+        raise ValueError("A topology needs at least 2 participants")
+    if kind not in COUPLING_KINDS:
+        raise ValueError(f"Unknown coupling kind {kind}, expected one of {', '.join(COUPLING_KINDS)}")
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown shape {shape}, expected one of {', '.join(SHAPES)}")
+
+    if shape == "star":
+        names = ["Solid"] + [f"Fluid{index}" for index in range(1, participants)]
+        pairs = [(fluid, names[0]) for fluid in names[1:]]
+    else:
+        names = [f"{'Fluid' if index % 2 == 0 else 'Solid'}{index}" for index in range(participants)]
+        pairs = list(zip(names[:-1], names[1:]))
+
+    topology = {
+        "coupling-scheme": {"max-time": 1.0, "time-window-size": 0.01, "max-iterations": 30},
+        "participants": [{"name": name, "solver": "OpenFOAM" if name.startswith("Fluid") else "CalculiX",
+                          "dimensionality": 3} for name in names],
+        "exchanges": [],
+    }
+    if coupling == "strong":
+        topology["acceleration"] = {"name": "IQN-ILS", "initial-relaxation": {"value": 0.5},
+                                    "max-used-iterations": 50, "time-windows-reused": 10}
+
+    for fluid, structure in pairs:
+        for repetition in range(1, exchanges_per_pair + 1):
+            for data, data_type, direction in COUPLING_KINDS[kind]:
+                source, target = (fluid, structure) if direction == "forward" else (structure, fluid)
+                suffix = f"-{repetition}" if exchanges_per_pair > 1 else ""
+                topology["exchanges"].append({
+                    "from": source,
+                    "from-patch": "interface",
+                    "to": target,
+                    "to-patch": "surface",
+                    "data": f"{data}-{fluid}-{structure}{suffix}",
+                    "data-type": data_type,
+                    "type": coupling,
+                })
+    return topology
+
+
+def write_topology(topology_file: Path, **parameters) -> Path:
+    """ Writes a synthetic topology.yaml, see make_topology for the parameters."""
+    topology_file = Path(topology_file)
+    topology_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(topology_file, "w", encoding="utf-8") as topology_stream:
+        yaml.safe_dump(make_topology(**parameters), topology_stream, sort_keys=False)
+    return topology_file
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Writes a synthetic topology.yaml for benchmarking.")
+    parser.add_argument("output", type=Path, help="The topology.yaml to write.")
+    parser.add_argument("-n", "--participants", type=int, default=2, help="Number of participants.")
+    parser.add_argument("-e", "--exchanges-per-pair", type=int, default=1,
+                        help="How often the data of the coupling kind is exchanged per coupled pair.")
+    parser.add_argument("-k", "--kind", choices=sorted(COUPLING_KINDS), default="FSI", help="Coupling kind.")
+    parser.add_argument("-t", "--type", choices=["strong", "weak"], default="strong", help="Exchange type.")
+    parser.add_argument("-s", "--shape", choices=SHAPES, default="star", help="Coupling graph.")
+    args = parser.parse_args(argv)
+    write_topology(args.output, participants=args.participants, exchanges_per_pair=args.exchanges_per_pair,
+                   kind=args.kind, coupling=args.type, shape=args.shape)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,203 @@
-from generation_utils.file_generator import FileGenerator
 import argparse
+import sys
 from pathlib import Path
 
-def parse_args():
-    parser = argparse.ArgumentParser(description="Takes topology.yaml files as input and writes out needed files to start the precice.")
+def parse_args(argv=None):
+    from generation_utils.archive_writer import ARCHIVE_FORMATS
+
+    parser = argparse.ArgumentParser(description="Takes topology.yaml files as input and writes out needed files to start the precice.",
+                                     epilog="Use 'precice-gen batch --help' to generate many topologies at once and "
+                                            "'precice-gen serve --help' to run the generator as a service. "
+                                            "'precice-gen watch --help' regenerates a topology whenever it changes, "
+                                            "'precice-gen plan --help' shows what a generation would change and "
+                                            "'precice-gen sweep --help' generates a parameter study.")
     parser.add_argument(
         "-f", "--input-file", 
         type=Path, 
         required=True,
+        help="Input topology.yaml file (or a topology in JSON or CBOR, detected from the extension or the content)"
+    )
+    parser.add_argument(
+        "-o", "--output-path",
+        type=Path,
+        required=False,
+        help="Output path for the generated folder.",
+        default=Path(__file__).parent
+    )
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        required=False,
+        help="Enable verbose logging output.",
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        required=False,
+        help="Number of threads generating the files of the participants (default: chosen by Python).",
+        default=None
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        required=False,
+        help="Print the time spent in every generation stage.",
+    )
+    parser.add_argument(
+        "--profile-trace",
+        type=Path,
+        required=False,
+        help="Write the timings of the generation stages as Chrome trace (chrome://tracing, Perfetto) to this file. "
+             "Implies --profile.",
+        default=None
+    )
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        required=False,
+        help="Remove the _generated folder before generating. By default only files whose content changed "
+             "are rewritten.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        required=False,
+        help="Always generate the files instead of restoring them from the cache of generated cases.",
+    )
+    parser.add_argument(
+        "--validate-topology",
+        action="store_true",
+        required=False,
+        default=True,
+        help="Whether to validate the input topology.yaml file against the preCICE topology schema.",
+    )
+    parser.add_argument(
+        "--no-validate-topology",
+        dest="validate_topology",
+        action="store_false",
+        required=False,
+        help="Generate the topology.yaml file even if it does not match the preCICE topology schema.",
+    )
+    parser.add_argument(
+        "--archive",
+        type=str,
+        required=False,
+        help="Write the generated case into this archive instead of the _generated folder, '-' for stdout. "
+             "No folder is created and the cache of generated cases is not used.",
+        default=None
+    )
+    parser.add_argument(
+        "--archive-format",
+        choices=ARCHIVE_FORMATS,
+        required=False,
+        help="Format of the archive (default: derived from the file name, tar for stdout).",
+        default=None
+    )
+    return parser.parse_args(argv)
+
+
+def parse_batch_args(argv=None):
+    parser = argparse.ArgumentParser(prog="precice-gen batch",
+                                     description="Generates many topology.yaml files in one process pool.")
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="Directories (searched recursively for topology.yaml, .json and .cbor), glob patterns or topology files."
+    )
+    parser.add_argument(
+        "-o", "--output-path",
+        type=Path,
+        required=False,
+        help="Root for the generated cases. Each case keeps its path relative to the common folder of all inputs. "
+             "By default every case is generated next to its topology.yaml.",
+        default=None
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        required=False,
+        help="Number of worker processes (default: number of CPUs).",
+        default=None
+    )
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        required=False,
+        help="Also show the warnings of every case.",
+    )
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        required=False,
+        help="Remove the _generated folder of every case before generating. By default only files whose "
+             "content changed are rewritten.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        required=False,
+        help="Always generate the files instead of restoring them from the cache of generated cases.",
+    )
+    parser.add_argument(
+        "--validate-topology",
+        action="store_true",
+        required=False,
+        default=True,
+        help="Whether to validate the input topology.yaml files against the preCICE topology schema.",
+    )
+    parser.add_argument(
+        "--no-validate-topology",
+        dest="validate_topology",
+        action="store_false",
+        required=False,
+        help="Generate the topology.yaml files even if they do not match the preCICE topology schema.",
+    )
+    return parser.parse_args(argv)
+
+
+def parse_serve_args(argv=None):
+    parser = argparse.ArgumentParser(prog="precice-gen serve",
+                                     description="Keeps the generator loaded and answers JSON-lines generation requests "
+                                                 "on stdin or on a Unix domain socket.")
+    parser.add_argument(
+        "-s", "--socket",
+        type=Path,
+        required=False,
+        help="Path of the Unix domain socket to listen on. A stale socket at this path is replaced, any other "
+             "file is not. If not given, requests are read from stdin and answered on stdout.",
+        default=None
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        required=False,
+        help="Always generate the files instead of restoring them from the cache of generated cases.",
+    )
+    parser.add_argument(
+        "--validate-topology",
+        action="store_true",
+        required=False,
+        default=True,
+        help="Whether to validate the received topologies against the preCICE topology schema.",
+    )
+    parser.add_argument(
+        "--no-validate-topology",
+        dest="validate_topology",
+        action="store_false",
+        required=False,
+        help="Generate the received topologies even if they do not match the preCICE topology schema.",
+    )
+    return parser.parse_args(argv)
+
+
+def parse_watch_args(argv=None):
+    parser = argparse.ArgumentParser(prog="precice-gen watch",
+                                     description="Stays resident and regenerates a topology.yaml file whenever it "
+                                                 "changes. Only the files affected by a change are generated again.")
+    parser.add_argument(
+        "-f", "--input-file",
+        type=Path,
+        required=True,
         help="Input topology.yaml file"
     )
     parser.add_argument(
@@ -23,6 +213,26 @@ def parse_args():
         required=False,
         help="Enable verbose logging output.",
     )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        required=False,
+        help="Number of threads generating the files of the participants (default: chosen by Python).",
+        default=None
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        required=False,
+        help="Seconds without further changes before a change is generated (default: 0.2).",
+        default=0.2
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        required=False,
+        help="Poll the file for changes instead of using inotify.",
+    )
     parser.add_argument(
         "--validate-topology",
         action="store_true",
@@ -30,31 +240,313 @@ def parse_args():
         default=True,
         help="Whether to validate the input topology.yaml file against the preCICE topology schema.",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--no-validate-topology",
+        dest="validate_topology",
+        action="store_false",
+        required=False,
+        help="Generate the topology.yaml file even if it does not match the preCICE topology schema.",
+    )
+    return parser.parse_args(argv)
+
+
+def parse_plan_args(argv=None):
+    parser = argparse.ArgumentParser(prog="precice-gen plan",
+                                     description="Shows what generating a topology.yaml file would change, without "
+                                                 "writing anything: the added, removed and modified files and the "
+                                                 "changed elements of precice-config.xml.")
+    parser.add_argument(
+        "-f", "--input-file",
+        type=Path,
+        required=True,
+        help="Input topology.yaml file"
+    )
+    parser.add_argument(
+        "-o", "--output-path",
+        type=Path,
+        required=False,
+        help="Output path whose generated folder is compared with the new case.",
+        default=Path(__file__).parent
+    )
+    parser.add_argument(
+        "--against",
+        type=Path,
+        required=False,
+        help="Compare with the case of this older topology.yaml file instead of the generated folder.",
+        default=None
+    )
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        required=False,
+        help="Also list the unchanged files and show modified elements before and after the change.",
+    )
+    parser.add_argument(
+        "--validate-topology",
+        action="store_true",
+        required=False,
+        default=True,
+        help="Whether to validate the topology.yaml files against the preCICE topology schema.",
+    )
+    parser.add_argument(
+        "--no-validate-topology",
+        dest="validate_topology",
+        action="store_false",
+        required=False,
+        help="Plan the topology.yaml files even if they do not match the preCICE topology schema.",
+    )
+    return parser.parse_args(argv)
+
+
+def parse_sweep_args(argv=None):
+    parser = argparse.ArgumentParser(prog="precice-gen sweep",
+                                     description="Generates one case per combination of coupling-scheme and "
+                                                 "acceleration settings of a sweep spec. The topology is generated "
+                                                 "once, every case only gets its own precice-config.xml.")
+    parser.add_argument(
+        "spec",
+        type=Path,
+        help="Sweep spec (YAML) with the swept parameters under 'axes' or 'variants' and optionally the "
+             "'base' topology.yaml file and the 'mode' (product or zip)."
+    )
+    parser.add_argument(
+        "-f", "--input-file",
+        type=Path,
+        required=False,
+        help="Base topology.yaml file, overrides the 'base' of the spec.",
+        default=None
+    )
+    parser.add_argument(
+        "-o", "--output-path",
+        type=Path,
+        required=True,
+        help="Folder for the case folders (case-0000, case-0001, ...) and the sweep-index.json."
+    )
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        required=False,
+        help="Also show the warnings of the base case.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        required=False,
+        help="Print the time spent in every stage.",
+    )
+    parser.add_argument(
+        "--validate-topology",
+        action="store_true",
+        required=False,
+        default=True,
+        help="Whether to validate the base topology and every swept value against the preCICE topology schema.",
+    )
+    parser.add_argument(
+        "--no-validate-topology",
+        dest="validate_topology",
+        action="store_false",
+        required=False,
+        help="Generate the cases even if they do not match the preCICE topology schema.",
+    )
+    return parser.parse_args(argv)
+
+
+def sweep_main(argv):
+    args = parse_sweep_args(argv)
+
+    import time
+    from generation_utils.profiler import Profiler
+    from generation_utils.sweep_generator import SweepGenerator, load_sweep_spec, sweep_variants
+    from generation_utils.topology_document import TopologyDocument
+
+    try:
+        spec = load_sweep_spec(args.spec)
+        variants = sweep_variants(spec)
+    except ValueError as spec_error:
+        print(spec_error)
+        return 1
+    input_file = args.input_file
+    if input_file is None:
+        if "base" not in spec:
+            print(f"No base topology, give it with -f or as 'base' in {args.spec}")
+            return 1
+        input_file = args.spec.parent / spec["base"]
+
+    profiler = Profiler(enabled=args.profile)
+    start = time.perf_counter()
+    with profiler.span("load topology"):
+        topology = TopologyDocument.from_file(input_file)
+    sweep_generator = SweepGenerator(topology, args.output_path, variants, validate_topology=args.validate_topology,
+                                     profiler=profiler)
+    succeeded = sweep_generator.run()
+    elapsed = time.perf_counter() - start
+
+    for error in sweep_generator.logger.get_errors():
+        print(f"  - {error}")
+    if args.verbose:
+        for warning in sweep_generator.logger.get_warnings():
+            print(f"  warning: {warning}")
+    if sweep_generator.cases:
+        generated = sum("error" not in case for case in sweep_generator.cases)
+        print(f"Generated {generated} of {len(variants)} cases of {input_file} in {args.output_path} in "
+              f"{elapsed:.2f} s ({elapsed / len(variants) * 1000:.2f} ms per case)")
+    if profiler.enabled:
+        profiler.print_table()
+    return 0 if succeeded else 1
+
+
+def plan_main(argv):
+    args = parse_plan_args(argv)
+
+    from generation_utils.case_planner import plan_case
+    from generation_utils.topology_document import TopologyDocument
+
+    previous_topology = TopologyDocument.from_file(args.against) if args.against is not None else None
+    plan = plan_case(TopologyDocument.from_file(args.input_file), output_path=args.output_path,
+                     previous_topology=previous_topology, validate_topology=args.validate_topology)
+    plan.print_report(verbose=args.verbose)
+    return 1 if plan.errors else 0
+
+
+def watch_main(argv):
+    args = parse_watch_args(argv)
+
+    from generation_utils.topology_watcher import TopologyWatcher
+
+    watcher = TopologyWatcher(args.input_file, args.output_path, validate_topology=args.validate_topology,
+                              jobs=args.jobs, debounce=args.debounce, polling=args.poll, verbose=args.verbose)
+    watcher.run()
+    return 0
+
+
+def serve_main(argv):
+    from generation_utils.generation_server import GenerationServer
+
+    args = parse_serve_args(argv)
+    server = GenerationServer(validate_topology=args.validate_topology, use_cache=not args.no_cache)
+    if args.socket is not None:
+        if not server.serve_unix_socket(args.socket):
+            server.logger.print_all()
+            return 1
+    else:
+        server.serve_stream()
+    return 0
+
+
+def batch_main(argv):
+    from generation_utils.batch_generator import BatchGenerator, find_topologies
+
+    args = parse_batch_args(argv)
+    topology_files = find_topologies(args.inputs)
+    if not topology_files:
+        print("No topology files found for: " + " ".join(args.inputs))
+        return 1
+
+    batch_generator = BatchGenerator(topology_files, args.output_path, workers=args.jobs,
+                                     validate_topology=args.validate_topology, clean_generated=args.clean,
+                                     use_cache=not args.no_cache)
+    results = batch_generator.run()
+    batch_generator.print_summary(results, verbose=args.verbose)
+    return 0 if all(result["status"] == "success" for result in results) else 1
 
 
 def main():
-    args = parse_args()
+    argv = sys.argv[1:]
+    if argv and argv[0] == "batch":
+        sys.exit(batch_main(argv[1:]))
+    if argv and argv[0] == "serve":
+        sys.exit(serve_main(argv[1:]))
+    if argv and argv[0] == "watch":
+        sys.exit(watch_main(argv[1:]))
+    if argv and argv[0] == "plan":
+        sys.exit(plan_main(argv[1:]))
+    if argv and argv[0] == "sweep":
+        sys.exit(sweep_main(argv[1:]))
+
+    args = parse_args(argv)
+
+    # Only what a stage needs is imported, so that --help, argument errors and invalid topologies answer at once
+    from generation_utils.profiler import Profiler
+    from generation_utils.topology_document import TopologyDocument
+
+    archive_target = args.archive
+    if archive_target == "-":
+        # The archive is written to stdout, all messages go to stderr
+        archive_target = sys.stdout.buffer
+        sys.stdout = sys.stderr
+
+    profiler = Profiler(enabled=args.profile or args.profile_trace is not None)
+    with profiler.span("load topology"):
+        topology = TopologyDocument.from_file(args.input_file)
+
+    # A topology that cannot be read is never generated, with or without the schema validation
+    if topology.error is not None:
+        print(f"Cannot read {args.input_file}: {topology.error}")
+        sys.exit(1)
 
-    file_generator = FileGenerator(args.input_file, args.output_path)
+    # An invalid topology is rejected with all its errors before anything is generated
+    if args.validate_topology:
+        from generation_utils.topology_validator import topology_errors
+
+        with profiler.span("schema validation"):
+            validation_errors = topology_errors(topology.data)
+        if validation_errors:
+            print(f"Validation of {args.input_file} failed:")
+            for validation_error in validation_errors:
+                print(f"  - {validation_error}")
+            sys.exit(1)
+
+    from generation_utils.archive_writer import ArchiveStructureHandler
+    from generation_utils.file_generator import FileGenerator
+    from generation_utils.generation_cache import GenerationCache
+
+    structure = None if archive_target is None else ArchiveStructureHandler(archive_target, args.archive_format)
+
+    # The cache copies the files of a case from its _generated folder, which an archive does not have
+    cache = None if args.no_cache or structure is not None else GenerationCache()
+    file_generator = FileGenerator(args.input_file, args.output_path, topology=topology, clean_generated=args.clean,
+                                   cache=cache, jobs=args.jobs, profiler=profiler, structure=structure)
 
     # Clear any previous log state
     file_generator.logger.clear_log_state()
 
-    # Generate precice-config.xml, README.md, clean.sh
-    file_generator.generate_level_0()
-    # Generate configuration for the solvers
-    file_generator.generate_level_1()
+    try:
+        # Topologies that were generated before are restored from the cache
+        if not file_generator.generate_from_cache():
+            # Generate precice-config.xml, README.md, clean.sh
+            file_generator.generate_level_0()
+            # Generate configuration for the solvers
+            file_generator.generate_level_1()
+
+            # Format the generated preCICE configuration
+            file_generator.format_precice_config()
+
+            file_generator.store_in_cache()
+    except BaseException:
+        # Nothing of a generation that crashed is moved into place
+        file_generator.structure.discard()
+        raise
 
-    # Format the generated preCICE configuration
-    file_generator.format_precice_config()
-    
+    # Remove files that are no longer generated and record the content hashes. A generation that logged errors is
+    # discarded and leaves the previous _generated folder untouched
+    with profiler.span("finalize"):
+        succeeded = file_generator.finish()
+    # Errors of the participant files and of the structure, e.g. an archive that could not be written, are reported
+    # with the generation
+    for logger in (file_generator.other_files_generator.logger, file_generator.structure.logger):
+        for error in logger.get_errors():
+            file_generator.logger.error(error)
 
     file_generator.handle_output(args)
 
-    file_generator.validate_topology(args)
-    
+    if profiler.enabled:
+        profiler.print_table()
+        if args.profile_trace is not None:
+            profiler.write_chrome_trace(args.profile_trace)
+            print(f"Chrome trace written to {args.profile_trace}")
+    if not succeeded:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,9 @@
+import sys
+
+
+def intern_name(name):
+    """ interns a participant, mesh or data name, such that all structures share one string object
+    per name and dictionary lookups by name can compare by identity. Other values are returned unchanged """
+    if isinstance(name, str):
+        return sys.intern(name)
+    return name
@@ -1 +1,2 @@
-from .UT_PCErrorLogging import UT_PCErrorLogging
\ No newline at end of file
+from .UT_PCErrorLogging import UT_PCErrorLogging
+from .UT_Names import intern_name
@@ -0,0 +1,154 @@
+"""
+The intermediate representation (IR) of a generated preCICE case.
+
+PS_PreCICEConfig.create_config derives the complete model (data, meshes, participants with
+their meshes, data and mappings, M2N connections and the coupling scheme) once and freezes it
+into these classes. The emitters of precice-config.xml, the adapter-config.json files and the
+README only read the IR, none of them derives anything on its own.
+
+All classes are frozen dataclasses that only hold strings, numbers, None and tuples. An IR is
+therefore immutable, hashable, comparable and cheap to pickle. The order of every tuple is the
+order in which the elements are emitted.
+"""
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class DataIR:
+    """ A data declaration, e.g. <data:vector name="Force" /> """
+    name: str
+    kind: str # "scalar" or "vector"
+
+
+@dataclass(frozen=True)
+class MeshIR:
+    """ A mesh with the data used on it """
+    name: str
+    dimensions: int
+    use_data: tuple = ()  # names of the data
+
+
+@dataclass(frozen=True)
+class ReceiveMeshIR:
+    """ A mesh that a participant receives from another participant """
+    name: str
+    from_participant: str
+
+
+@dataclass(frozen=True)
+class DataAccessIR:
+    """ Data that is read or written on a mesh """
+    name: str
+    mesh: str
+
+
+@dataclass(frozen=True)
+class MappingIR:
+    """ A nearest-neighbor mapping between two meshes """
+    direction: str # "read" or "write"
+    from_mesh: str
+    to_mesh: str
+    constraint: str # "consistent" or "conservative"
+
+
+@dataclass(frozen=True)
+class InterfaceIR:
+    """ The coupling interface of a participant, taken from the first exchange it receives in the topology """
+    from_participant: str
+    from_patch: str
+    to_patch: str
+
+
+@dataclass(frozen=True)
+class ParticipantIR:
+    """ A participant with everything it provides, receives, reads, writes and maps """
+    name: str
+    solver: str
+    provide_meshes: tuple = ()  # mesh names
+    receive_meshes: tuple = ()  # ReceiveMeshIR
+    write_data: tuple = ()      # DataAccessIR
+    read_data: tuple = ()       # DataAccessIR
+    mappings: tuple = ()        # MappingIR
+    interface: InterfaceIR = None
+
+
+@dataclass(frozen=True)
+class M2NIR:
+    """ A socket connection between two participants """
+    acceptor: str
+    connector: str
+    exchange_directory: str = ".."
+
+
+@dataclass(frozen=True)
+class ExchangeIR:
+    """ Data that is exchanged between two participants within the coupling scheme """
+    data: str
+    mesh: str
+    from_participant: str
+    to_participant: str
+
+
+@dataclass(frozen=True)
+class ConvergenceMeasureIR:
+    """ A relative convergence measure of an implicit coupling scheme """
+    limit: str
+    mesh: str
+    data: str
+
+
+@dataclass(frozen=True)
+class AccelerationOptionIR:
+    """ An option of the acceleration, with its attributes in emission order """
+    tag: str
+    attributes: tuple = ()  # (name, value) pairs
+
+
+@dataclass(frozen=True)
+class AccelerationIR:
+    """ The acceleration of an implicit coupling scheme """
+    name: str
+    options: tuple = ()  # AccelerationOptionIR
+    data: tuple = ()     # DataAccessIR
+
+
+@dataclass(frozen=True)
+class CouplingSchemeIR:
+    """ The coupling scheme. Two participants are coupled as first and second participant,
+    more participants by a multi coupling scheme with one control participant """
+    type: str # e.g. "serial-implicit", "parallel-explicit" or "multi"
+    participants: tuple = ()  # participant names, first and second for two participants
+    control: str = None       # the control participant of a multi coupling scheme
+    max_time: str = None
+    time_window_size: str = None
+    max_iterations: str = None
+    exchanges: tuple = ()             # ExchangeIR
+    convergence_measures: tuple = ()  # ConvergenceMeasureIR
+    acceleration: AccelerationIR = None
+
+
+@dataclass(frozen=True)
+class ConfigIR:
+    """ The complete generated case """
+    data: tuple = ()          # DataIR
+    meshes: tuple = ()        # MeshIR
+    participants: tuple = ()  # ParticipantIR
+    m2n: tuple = ()           # M2NIR
+    coupling_scheme: CouplingSchemeIR = None
+
+    def get_participant(self, participant_name: str):
+        """ returns the participant with the given name, None if there is none.
+        The lookup table is built on the first call and is not part of the pickled state """
+        participants_by_name = self.__dict__.get("_participants_by_name")
+        if participants_by_name is None:
+            participants_by_name = {}
+            for participant in self.participants:
+                participants_by_name.setdefault(participant.name, participant)
+            object.__setattr__(self, "_participants_by_name", participants_by_name)
+        return participants_by_name.get(participant_name)
+
+    def __getstate__(self):
+        """ the state to pickle, without the lookup table """
+        state = dict(self.__dict__)
+        state.pop("_participants_by_name", None)
+        return state
@@ -0,0 +1,81 @@
+from controller_utils.precice_struct.PS_ConfigIR import ConfigIR, CouplingSchemeIR
+import xml.etree.ElementTree as etree
+
+
+def build_precice_config_tree(config_ir: ConfigIR):
+    """ Builds the XML element tree of the preCICE config from the intermediate representation.
+    The tree uses the final preCICE tag and attribute names, the emitter orders and formats it """
+    precice_configuration_tag = etree.Element("precice-configuration")
+
+    # 1 quantities
+    for data in config_ir.data:
+        etree.SubElement(precice_configuration_tag, "data:" + data.kind, name=data.name)
+
+    # 2 meshes
+    for mesh in config_ir.meshes:
+        mesh_tag = etree.SubElement(precice_configuration_tag, "mesh", name=mesh.name, dimensions=str(mesh.dimensions))
+        for data_name in mesh.use_data:
+            etree.SubElement(mesh_tag, "use-data", name=data_name)
+
+    # 3 participants
+    for participant in config_ir.participants:
+        solver_tag = etree.SubElement(precice_configuration_tag, "participant", name=participant.name)
+        for mesh_name in participant.provide_meshes:
+            etree.SubElement(solver_tag, "provide-mesh", name=mesh_name)
+        for receive_mesh in participant.receive_meshes:
+            etree.SubElement(solver_tag, "receive-mesh", name=receive_mesh.name,
+                             **{"from": receive_mesh.from_participant})
+        for data in participant.read_data:
+            etree.SubElement(solver_tag, "read-data", name=data.name, mesh=data.mesh)
+        for data in participant.write_data:
+            etree.SubElement(solver_tag, "write-data", name=data.name, mesh=data.mesh)
+        for mapping in participant.mappings:
+            etree.SubElement(solver_tag, "mapping:nearest-neighbor", direction=mapping.direction,
+                             **{"from": mapping.from_mesh}, to=mapping.to_mesh, constraint=mapping.constraint)
+
+    for m2n in config_ir.m2n:
+        etree.SubElement(precice_configuration_tag, "m2n:sockets", acceptor=m2n.acceptor, connector=m2n.connector,
+                         **{"exchange-directory": m2n.exchange_directory})
+
+    # 4 coupling scheme
+    if config_ir.coupling_scheme is not None:
+        build_coupling_scheme_tree(precice_configuration_tag, config_ir.coupling_scheme)
+
+    return precice_configuration_tag
+
+
+def build_coupling_scheme_tree(tag: etree.Element, scheme: CouplingSchemeIR):
+    """ Adds the coupling scheme, including its exchanges and acceleration, to the given element """
+    coupling_scheme = etree.SubElement(tag, "coupling-scheme:" + scheme.type)
+    if scheme.control is None:
+        etree.SubElement(coupling_scheme, "participants", first=scheme.participants[0],
+                         second=scheme.participants[1])
+    else:
+        for participant_name in scheme.participants:
+            if participant_name == scheme.control:
+                etree.SubElement(coupling_scheme, "participant", name=participant_name, control="yes")
+            else:
+                etree.SubElement(coupling_scheme, "participant", name=participant_name)
+
+    if scheme.max_time is not None:
+        etree.SubElement(coupling_scheme, "max-time", value=scheme.max_time)
+    if scheme.time_window_size is not None:
+        etree.SubElement(coupling_scheme, "time-window-size", value=scheme.time_window_size)
+    if scheme.max_iterations is not None:
+        etree.SubElement(coupling_scheme, "max-iterations", value=scheme.max_iterations)
+
+    for exchange in scheme.exchanges:
+        etree.SubElement(coupling_scheme, "exchange", data=exchange.data, mesh=exchange.mesh,
+                         **{"from": exchange.from_participant}, to=exchange.to_participant)
+    for measure in scheme.convergence_measures:
+        etree.SubElement(coupling_scheme, "relative-convergence-measure", limit=measure.limit, mesh=measure.mesh,
+                         data=measure.data)
+
+    acceleration = scheme.acceleration
+    if acceleration is not None:
+        acceleration_tag = etree.SubElement(coupling_scheme, "acceleration:" + acceleration.name)
+        for option in acceleration.options:
+            etree.SubElement(acceleration_tag, option.tag, dict(option.attributes))
+        for data in acceleration.data:
+            etree.SubElement(acceleration_tag, "data", name=data.name, mesh=data.mesh)
+    return coupling_scheme
@@ -1,7 +1,7 @@
 from controller_utils.myutils.UT_PCErrorLogging import UT_PCErrorLogging
 from controller_utils.precice_struct.PS_ParticipantSolver import PS_ParticipantSolver
 from controller_utils.ui_struct.UI_UserInput import UI_UserInput
-import xml.etree.ElementTree as etree
+from controller_utils.precice_struct.PS_ConfigIR import *
 
 class PS_CouplingScheme(object):
     """Class to represent the Coupling schemes """
@@ -15,15 +15,15 @@ class PS_CouplingScheme(object):
         """ This method should be overwritten by the subclasses """
         pass
 
-    def write_precice_xml_config(self, tag: etree, config): # config: PS_PreCICEConfig
-        """ parent function to write out XML file """
+    def create_ir(self, config): # config: PS_PreCICEConfig
+        """ parent function to create the intermediate representation of the coupling scheme """
         pass
 
-    def write_participants_and_coupling_scheme(self, tag: etree, config, coupling_str:str ):
-        """ write out the config XMl file """
+    def create_participants_ir(self, config, coupling_str:str ):
+        """ returns the type of the coupling scheme, its participants and the control participant
+        (None if there are only two participants) """
         if len(config.solvers) <= 2:
             # for only
-            coupling_scheme = etree.SubElement(tag, "coupling-scheme:" + coupling_str)
             # print the participants, ASSUMPTION! we assume there is at least two
             mylist = ["NONE", "NONE"]
             mycomplexity = [-1, -1]
@@ -36,17 +36,13 @@ class PS_CouplingScheme(object):
                 pass
             # the solver with the higher complexity should be first
             if mycomplexity[0] < mycomplexity[1]:
-                i = etree.SubElement(coupling_scheme, "participants", first=mylist[0],
-                                     second=mylist[1])
                 config.couplingScheme_participants = mylist[0], mylist[1]
             else:
-                i = etree.SubElement(coupling_scheme, "participants", first=mylist[1],
-                                     second=mylist[0])
                 config.couplingScheme_participants = mylist[1], mylist[0]
+            return coupling_str, config.couplingScheme_participants, None
             
         else:
             # TODO: is "multi" good for all
-            coupling_scheme = etree.SubElement(tag, "coupling-scheme:multi")
             # first find the solver with the most meshes and this should be the one who controls the coupling
             nr_max_meshes = -1
             control_participant_name = "NONE"
@@ -57,17 +53,8 @@ class PS_CouplingScheme(object):
                     nr_max_meshes = len(participant.meshes)
                     control_participant_name = participant.name
                 pass
-            # second print all the participants
-            for participant_name in config.solvers:
-                participant = config.solvers[participant_name]
-                if participant.name == control_participant_name:
-                    i = etree.SubElement(coupling_scheme, "participant", name=participant_name, control="yes")
-                else:
-                    i = etree.SubElement(coupling_scheme, "participant", name=participant_name)
-                    pass
-                pass
-            pass
-        return coupling_scheme
+            # second all the participants
+            return "multi", tuple(config.solvers), control_participant_name
 
     def _find_simplest_solver(self, config):
         """Find the solver with minimal complexity"""
@@ -93,44 +80,24 @@ class PS_CouplingScheme(object):
                         other_mesh_name = allm
         return other_solver_for_coupling, other_mesh_name
 
-    def write_exchange_and_convergance(self, config, coupling_scheme, relative_conv_str:str):
-        """Writes to the XML the exchange list"""
+    def create_exchange_and_convergance_ir(self, config, relative_conv_str:str):
+        """Returns the exchanges and the convergence measures (if relative_conv_str is not empty)"""
+        exchanges = []
+        convergence_measures = []
         for exchange in config.exchanges:
             from_s = exchange.get('from')
             to_s = exchange.get('to')
             data = exchange.get('data')
 
-            # Process mappings
-            read_mappings = [m.copy() for m in config.mappings_read]
-            write_mappings = [m.copy() for m in config.mappings_write]
-
-            read_mapping = next((m for m in read_mappings if 
-                                (m['from'] == from_s + '-Mesh' and m['to'] == to_s + '-Mesh') ), None)
-            write_mapping = next((m for m in write_mappings if 
-                                (m['from'] == from_s + '-Mesh' and m['to'] == to_s + '-Mesh')), None)
-
             # Choose mesh based on mapping constraint
-            if read_mapping and read_mapping['constraint'] == 'conservative':
-                exchange_mesh_name = read_mapping['to']
-            elif read_mapping and read_mapping['constraint'] == 'consistent':
-                exchange_mesh_name = read_mapping['from']
-            elif write_mapping and write_mapping['constraint'] == 'conservative':
-                exchange_mesh_name = write_mapping['to']
-            elif write_mapping and write_mapping['constraint'] == 'consistent':
-                exchange_mesh_name = write_mapping['from']
-            else:
-                exchange_mesh_name = from_s + '-Mesh'
-            if exchange_mesh_name not in config.exchange_mesh_names:
-                config.exchange_mesh_names.append(exchange_mesh_name)
-            e = etree.SubElement(coupling_scheme, "exchange", 
-                                data=data, mesh=exchange_mesh_name,
-                                from___=from_s, to=to_s)
+            exchange_mesh_name = config.get_exchange_mesh_name(from_s, to_s, from_s + '-Mesh')
+            config.exchange_mesh_names[exchange_mesh_name] = None
+            exchanges.append(ExchangeIR(data, exchange_mesh_name, from_s, to_s))
             # Use the same mesh for the relative convergence measure
             if relative_conv_str != "":
-                c = etree.SubElement(coupling_scheme, "relative-convergence-measure",
-                                 limit=relative_conv_str, mesh=exchange_mesh_name
-                                 ,data=data)
+                convergence_measures.append(ConvergenceMeasureIR(relative_conv_str, exchange_mesh_name, data))
             pass
+        return tuple(exchanges), tuple(convergence_measures)
 
 
 class PS_ExplicitCoupling(PS_CouplingScheme):
@@ -150,27 +117,29 @@ class PS_ExplicitCoupling(PS_CouplingScheme):
         self.coupling = simulation_conf.coupling
         pass
 
-    def write_precice_xml_config(self, tag:etree, config): # config: PS_PreCICEConfig
-        """ write out the config XMl file """
-        coupling_scheme = self.write_participants_and_coupling_scheme( tag, config, f"{self.coupling}-explicit" )
-        config.coupling_scheme = coupling_scheme
+    def create_ir(self, config): # config: PS_PreCICEConfig
+        """ creates the intermediate representation of the coupling scheme """
+        scheme_type, participants, control = self.create_participants_ir(config, f"{self.coupling}-explicit")
+        max_time = None
+        time_window_size = None
         if str(self.display_standard_values).lower() == 'true':
             if self.NrTimeStep is None:
                 self.NrTimeStep = 1e-3
             if self.Dt is None:
                 self.Dt = 1e-3
-            i = etree.SubElement(coupling_scheme, "max-time", value=str(self.NrTimeStep))
-            attr = { "value": str(self.Dt)}
-            i = etree.SubElement(coupling_scheme, "time-window-size", attr)
+            max_time = str(self.NrTimeStep)
+            time_window_size = str(self.Dt)
         else:
             if self.NrTimeStep is not None:
-                i = etree.SubElement(coupling_scheme, "max-time", value=str(self.NrTimeStep))
+                max_time = str(self.NrTimeStep)
             if self.Dt is not None:
-                attr = { "value": str(self.Dt)}
-                i = etree.SubElement(coupling_scheme, "time-window-size", attr)
+                time_window_size = str(self.Dt)
 
-        # write out the exchange but not the convergence (if empty it will not be written)
-        self.write_exchange_and_convergance(config, coupling_scheme, "")
+        # the exchanges but not the convergence (if empty it will not be written)
+        exchanges, convergence_measures = self.create_exchange_and_convergance_ir(config, "")
+        return CouplingSchemeIR(type=scheme_type, participants=participants, control=control, max_time=max_time,
+                                time_window_size=time_window_size, exchanges=exchanges,
+                                convergence_measures=convergence_measures)
 
 
 class PS_ImplicitCoupling(PS_CouplingScheme):
@@ -206,13 +175,15 @@ class PS_ImplicitCoupling(PS_CouplingScheme):
 
         pass
 
-    def write_precice_xml_config(self, tag:etree, config): # config: PS_PreCICEConfig
-        """ write out the config XMl file """
+    def create_ir(self, config): # config: PS_PreCICEConfig
+        """ creates the intermediate representation of the coupling scheme """
         if self.coupling not in ['serial', 'parallel']:
             raise ValueError(f"coupling must be 'serial' or 'parallel', but got {self.coupling}")
-        coupling_scheme = self.write_participants_and_coupling_scheme( tag, config, f"{self.coupling}-implicit" )
-        config.coupling_scheme = coupling_scheme
+        scheme_type, participants, control = self.create_participants_ir(config, f"{self.coupling}-implicit")
 
+        max_time = None
+        time_window_size = None
+        max_iterations = None
         if str(self.display_standard_values).lower() == 'true':
             if self.NrTimeStep is None:
                 self.NrTimeStep = 1e-3
@@ -220,29 +191,29 @@ class PS_ImplicitCoupling(PS_CouplingScheme):
                 self.Dt = 1e-3
             if self.maxIteration is None:
                 self.maxIteration = 50
-            i = etree.SubElement(coupling_scheme, "max-time", value = str(self.NrTimeStep))
-            attr = { "value": str(self.Dt)}
-            i = etree.SubElement(coupling_scheme, "time-window-size", attr)
-            i = etree.SubElement(coupling_scheme, "max-iterations", value=str(self.maxIteration))
-            #i = etree.SubElement(coupling_scheme, "extrapolation-order", value=str(self.extrapolation_order))
+            max_time = str(self.NrTimeStep)
+            time_window_size = str(self.Dt)
+            max_iterations = str(self.maxIteration)
+            #extrapolation_order = str(self.extrapolation_order)
         else:
             if self.NrTimeStep is not None:
-                i = etree.SubElement(coupling_scheme, "max-time", value = str(self.NrTimeStep))
+                max_time = str(self.NrTimeStep)
             if self.Dt is not None:
-                attr = { "value": str(self.Dt)}
-                i = etree.SubElement(coupling_scheme, "time-window-size", attr)
+                time_window_size = str(self.Dt)
             if self.maxIteration is not None:
-                i = etree.SubElement(coupling_scheme, "max-iterations", value=str(self.maxIteration))
+                max_iterations = str(self.maxIteration)
             #if self.extrapolation_order is not None:
-            #    i = etree.SubElement(coupling_scheme, "extrapolation-order", value=str(self.extrapolation_order))
-
-        # write out the exchange and the convergance rate
-        self.write_exchange_and_convergance(config, coupling_scheme, str(self.relativeConverganceEps))
+            #    extrapolation_order = str(self.extrapolation_order)
 
-        # finally we write out the post processing...
-        self.acceleration.write_precice_xml_config(coupling_scheme, config, self)
+        # the exchange and the convergance rate
+        exchanges, convergence_measures = self.create_exchange_and_convergance_ir(
+            config, str(self.relativeConverganceEps))
 
-        pass
+        # finally the post processing...
+        return CouplingSchemeIR(type=scheme_type, participants=participants, control=control, max_time=max_time,
+                                time_window_size=time_window_size, max_iterations=max_iterations,
+                                exchanges=exchanges, convergence_measures=convergence_measures,
+                                acceleration=self.acceleration.create_ir(config, self))
 
 
 class PS_ImplicitAcceleration(object):
@@ -253,14 +224,15 @@ class PS_ImplicitAcceleration(object):
         self.precondition_type = "residual-sum"
         self.post_process_quantities = {} # The quantities that are in the acceleration
 
-    def write_precice_xml_config(self, tag: etree.Element, config, parent):
-        """ Write out the config XML file of the acceleration in case of implicit coupling
-            Only for explicit coupling (one directional) this should not write out anything """
+    def create_ir(self, config, parent):
+        """ Creates the intermediate representation of the acceleration in case of implicit coupling
+            Only for explicit coupling (one directional) there is no acceleration """
 
         self.name = config.acceleration["name"] if config.acceleration is not None else "IQN-ILS"
         self.display_standard_values = config.acceleration["display_standard_values"] if config.acceleration is not None else "false"
 
-        post_processing = etree.SubElement(tag, "acceleration:" + self.name)
+        options = []
+        data = []
 
         # Identify unique solvers and their meshes
         solver_meshes = {}
@@ -289,8 +261,6 @@ class PS_ImplicitAcceleration(object):
         from_s = "___"
         to_s = "__"
         exchange_mesh_name = ""
-        read_mappings = [m.copy() for m in config.mappings_read]
-        write_mappings = [m.copy() for m in config.mappings_write]
 
         acceleration = config.acceleration
         if acceleration is not None and self.display_standard_values:
@@ -299,64 +269,60 @@ class PS_ImplicitAcceleration(object):
                     if self.name == "IQN-ILS":
                         if a == "initial-relaxation":
                             if b.get("enforce") is not None:
-                                i = etree.SubElement(post_processing, a, value=str(b.get("value")), enforce=str(b.get("enforce")))
+                                options.append(AccelerationOptionIR(a, (("value", str(b.get("value"))), ("enforce", str(b.get("enforce"))))))
                             else:
-                                i = etree.SubElement(post_processing, a, value=str(b.get("value")))
+                                options.append(AccelerationOptionIR(a, (("value", str(b.get("value"))),)))
                         elif a == "max-used-iterations" or a == "time-windows-reused":
-                            i = etree.SubElement(post_processing, a, value=str(b))
+                            options.append(AccelerationOptionIR(a, (("value", str(b)),)))
                         elif a == "filter":
                             if b.get("type") is not None:
-                                i = etree.SubElement(post_processing, a, limit=str(b.get("limit")), type=str(b.get("type")))
+                                options.append(AccelerationOptionIR(a, (("limit", str(b.get("limit"))), ("type", str(b.get("type"))))))
                             else:
-                                i = etree.SubElement(post_processing, a, limit=str(b.get("limit")))
+                                options.append(AccelerationOptionIR(a, (("limit", str(b.get("limit"))),)))
                         elif a == "preconditioner":
                             if b.get("type") is not None:
-                                i = etree.SubElement(post_processing, a, type=str(b.get("type")))                                
-                                i.set("freeze-after", str(b.get("freeze-after")))
+                                options.append(AccelerationOptionIR(a, (("type", str(b.get("type"))), ("freeze-after", str(b.get("freeze-after"))))))
                             else:
-                                i = etree.SubElement(post_processing, a, freeze_after=str(b.get("freeze-after")))
+                                options.append(AccelerationOptionIR(a, (("freeze_after", str(b.get("freeze-after"))),)))
                     if self.name == "aitken":
                         if a == "initial-relaxation":
                             if b.get("enforce") is not None:
-                                i = etree.SubElement(post_processing, a, value=str(b.get("value")), enforce=str(b.get("enforce")))
+                                options.append(AccelerationOptionIR(a, (("value", str(b.get("value"))), ("enforce", str(b.get("enforce"))))))
                             else:
-                                i = etree.SubElement(post_processing, a, value=str(b.get("value")))
+                                options.append(AccelerationOptionIR(a, (("value", str(b.get("value"))),)))
                         elif a == "preconditioner":
                             if b.get("type") is not None:
-                                i = etree.SubElement(post_processing, a, type=str(b.get("type")))                                
-                                i.set("freeze-after", str(b.get("freeze-after")))
+                                options.append(AccelerationOptionIR(a, (("type", str(b.get("type"))), ("freeze-after", str(b.get("freeze-after"))))))
                             else:
-                                i = etree.SubElement(post_processing, a, freeze_after=str(b.get("freeze-after")))
+                                options.append(AccelerationOptionIR(a, (("freeze_after", str(b.get("freeze-after"))),)))
                     if self.name == "IQN-IMVJ":
                         if a == "initial-relaxation":
                             if b.get("enforce") is not None:
-                                i = etree.SubElement(post_processing, a, value=str(b.get("value")), enforce=str(b.get("enforce")))
+                                options.append(AccelerationOptionIR(a, (("value", str(b.get("value"))), ("enforce", str(b.get("enforce"))))))
                             else:
-                                i = etree.SubElement(post_processing, a, value=str(b.get("value")))
+                                options.append(AccelerationOptionIR(a, (("value", str(b.get("value"))),)))
                         elif a == "max-used-iterations" or a == "time-windows-reused":
-                            i = etree.SubElement(post_processing, a, value=str(b))
+                            options.append(AccelerationOptionIR(a, (("value", str(b)),)))
                         elif a == "filter":
                             if b.get("type") is not None:
-                                i = etree.SubElement(post_processing, a, limit=str(b.get("limit")), type=str(b.get("type")))
+                                options.append(AccelerationOptionIR(a, (("limit", str(b.get("limit"))), ("type", str(b.get("type"))))))
                             else:
-                                i = etree.SubElement(post_processing, a, limit=str(b.get("limit")))
+                                options.append(AccelerationOptionIR(a, (("limit", str(b.get("limit"))),)))
                         elif a == "preconditioner":
                             if b.get("type") is not None:
-                                i = etree.SubElement(post_processing, a, type=str(b.get("type")))                                
-                                i.set("freeze-after", str(b.get("freeze-after")))
+                                options.append(AccelerationOptionIR(a, (("type", str(b.get("type"))), ("freeze-after", str(b.get("freeze-after"))))))
                             else:
-                                i = etree.SubElement(post_processing, a, freeze_after=str(b.get("freeze-after")))                          
+                                options.append(AccelerationOptionIR(a, (("freeze_after", str(b.get("freeze-after"))),)))                          
                         elif a == "imvj-restart-mode":
-                            i = etree.SubElement(
-                                post_processing,
+                            options.append(AccelerationOptionIR(
                                 a,
-                                {
-                                    "truncation-threshold": str(b.get("truncation-threshold")),
-                                    "chunk-size": str(b.get("chunk-size")),
-                                    "reused-time-windows-at-restart": str(b.get("reused-time-windows-at-restart")),
-                                    "type": str(b.get("type"))
-                                }
-                            )
+                                (
+                                    ("truncation-threshold", str(b.get("truncation-threshold"))),
+                                    ("chunk-size", str(b.get("chunk-size"))),
+                                    ("reused-time-windows-at-restart", str(b.get("reused-time-windows-at-restart"))),
+                                    ("type", str(b.get("type")))
+                                )
+                            ))
                             
 
                             
@@ -365,45 +331,24 @@ class PS_ImplicitAcceleration(object):
                 # Use the first mesh from the simplest solver
                 mesh_name = list(solver_meshes[simple_solver])[0]
                 
-                # i = etree.SubElement(post_processing, "data", 
-                #                      name=q.instance_name, 
-                #                      mesh=mesh_name)
+                # data.append(DataAccessIR(q.instance_name, mesh_name))
         
                 #Copy over logic from _determine_exchange_mesh to determine right mesh
-                for exchange in config.exchanges:
-                    # print("Exchange data: " + exchange.get('data'))
-                    # print("Quantity name: " + q.instance_name)
-                    if exchange.get('data').lower() == q.instance_name.lower():
-                        from_s = exchange.get('from')
-                        to_s = exchange.get('to')        
-
-                        # Process mappings
-                        read_mapping = next((m for m in read_mappings if 
-                                            (m['from'] == from_s + '-Mesh' and m['to'] == to_s + '-Mesh') ), None)
-                        write_mapping = next((m for m in write_mappings if 
-                                            (m['from'] == from_s + '-Mesh' and m['to'] == to_s + '-Mesh')), None)
-
-                        # Choose mesh based on mapping constraint
-                        if read_mapping and read_mapping['constraint'] == 'conservative':
-                            exchange_mesh_name = read_mapping['to']
-                        elif read_mapping and read_mapping['constraint'] == 'consistent':
-                            exchange_mesh_name = read_mapping['from']
-                        elif write_mapping and write_mapping['constraint'] == 'conservative':
-                            exchange_mesh_name = write_mapping['to']
-                        elif write_mapping and write_mapping['constraint'] == 'consistent':
-                            exchange_mesh_name = write_mapping['from']
-                        else:
-                            exchange_mesh_name = q.source_mesh_name
+                # the last exchange of the quantity determines the mesh
+                for exchange in config.exchange_index.with_data(q.instance_name, ignore_case=True)[-1:]:
+                    from_s = exchange.get('from')
+                    to_s = exchange.get('to')        
+
+                    # Choose mesh based on mapping constraint
+                    exchange_mesh_name = config.get_exchange_mesh_name(from_s, to_s, q.source_mesh_name)
 
                 # print(exchange_mesh_name)
                 if exchange_mesh_name != "":
                     if config.couplingScheme.coupling == 'serial':
                         if exchange_mesh_name == config.couplingScheme_participants[1]+"-Mesh":
-                            i = etree.SubElement(post_processing, "data", 
-                                    name=q.instance_name, 
-                                    mesh=exchange_mesh_name)
+                            data.append(DataAccessIR(q.instance_name, exchange_mesh_name))
                     # parallel coupling
                     else:
-                        i = etree.SubElement(post_processing, "data", 
-                                    name=q.instance_name, 
-                                    mesh=exchange_mesh_name)
\ No newline at end of file
+                        data.append(DataAccessIR(q.instance_name, exchange_mesh_name))
+
+        return AccelerationIR(self.name, tuple(options), tuple(data))
\ No newline at end of file
@@ -3,6 +3,8 @@ from controller_utils.precice_struct.PS_QuantityCoupled import *
 
 class PS_Mesh(object):
     """ The mesh object that is assigned to one or more solver"""
+    __slots__ = ("name", "quantities", "list_of_solvers", "source_solver")
+
     def __init__(self):
         self.name = "" # name of the mesh
         self.quantities = {} # list of the quantities that are stored here
@@ -30,6 +30,8 @@ class SolverNature(Enum):
 
 class PS_ParticipantSolver(object):
     """Class to represent a participant in the preCICE data structure """
+    __slots__ = ("solver_domain", "dim", "dimensionality", "nature", "quantities_read", "quantities_write",
+                 "meshes", "coupling_participants", "solver_name", "name")
 
     dim: SolverDimension
     dimensionality: int
@@ -87,8 +89,8 @@ class PS_ParticipantSolver(object):
         other_mesh_name = conf.get_mesh_name_by_participants(other_solver_name, self.name)
         self.create_mesh_for_coupling(conf, other_solver_name )
         
-        # Determine reading and writing quantities based on exchanges
-        for exchange in conf.exchanges:
+        # Determine reading and writing quantities based on the exchanges of this participant
+        for exchange in conf.exchange_index.of_participant_with_data(self.name, w_list, r_list):
             if exchange['from'] == self.name:
                 # This participant is writing data
                 if exchange['data'] in w_list:
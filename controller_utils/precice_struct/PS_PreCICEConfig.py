@@ -1,11 +1,13 @@
 from controller_utils.myutils.UT_PCErrorLogging import UT_PCErrorLogging
+from controller_utils.myutils.UT_Names import intern_name
 from controller_utils.ui_struct.UI_UserInput import UI_UserInput
 from controller_utils.ui_struct.UI_Coupling import *
 from controller_utils.precice_struct.PS_Mesh import *
 from controller_utils.precice_struct.PS_ParticipantSolver import PS_ParticipantSolver
 from controller_utils.precice_struct.PS_CouplingScheme import *
-import xml.etree.ElementTree as etree
-import xml.dom.minidom as my_minidom
+from controller_utils.precice_struct.PS_ConfigIR import *
+from controller_utils.precice_struct.PS_ConfigTree import build_precice_config_tree
+from dataclasses import replace
 
 class PS_PreCICEConfig(object):
     """Top main class for the preCICE config """
@@ -20,11 +22,15 @@ class PS_PreCICEConfig(object):
         self.meshes = {} # dictionary with the meshes of the coupling scenario
         self.coupling_quantities = {} # dictionary with the coupling quantities
         self.exchanges = []    # list to store full exchange details
+        self.exchange_index = None # index over the exchanges of the topology
         self.mappings_read = []
         self.mappings_write = []
+        self.mappings = {} # (from mesh, to mesh, direction) -> first mapping between the meshes
         self.couplingScheme_participants = None
         self.couplingScheme = None
-        self.exchange_mesh_names = []
+        # the exchanged meshes, a dictionary is used as a set that keeps the insertion order
+        self.exchange_mesh_names = {}
+        self.ir = None # the intermediate representation, created by create_config
         pass
 
     def get_coupling_quantity(self, quantity_name:str, source_mesh_name:str, bc: str, solver, read:bool):
@@ -67,7 +73,7 @@ class PS_PreCICEConfig(object):
             return self.meshes[mesh_name]
         # create a new mesh and add it to the dictionary
         new_mesh = PS_Mesh()
-        new_mesh.name = mesh_name
+        new_mesh.name = intern_name(mesh_name)
         self.meshes[mesh_name] = new_mesh
         return self.meshes[mesh_name]
 
@@ -100,10 +106,44 @@ class PS_PreCICEConfig(object):
         # TODO: create solver ... ?
         return None
 
-    def create_config(self, user_input: UI_UserInput):
-        """Creates the main preCICE config from the UI structure."""
+    def add_mapping(self, direction: str, mapping: dict):
+        """ stores the mapping, the first mapping between two meshes and in one direction is used for the lookup """
+        if direction == "read":
+            self.mappings_read.append(mapping)
+        else:
+            self.mappings_write.append(mapping)
+        self.mappings.setdefault((mapping['from'], mapping['to'], direction), mapping)
+        pass
+
+    def get_mapping(self, from_mesh_name: str, to_mesh_name: str, direction: str):
+        """ returns the mapping from one mesh to the other in the given direction, None if there is none """
+        return self.mappings.get((from_mesh_name, to_mesh_name, direction))
+
+    def get_exchange_mesh_name(self, from_participant: str, to_participant: str, default_mesh_name: str):
+        """ returns the mesh on which data is exchanged from one participant to the other,
+        this depends on the constraint of the mapping between the meshes of the two participants """
+        from_mesh_name = from_participant + '-Mesh'
+        to_mesh_name = to_participant + '-Mesh'
+        read_mapping = self.get_mapping(from_mesh_name, to_mesh_name, "read")
+        write_mapping = self.get_mapping(from_mesh_name, to_mesh_name, "write")
+
+        # Choose mesh based on mapping constraint
+        if read_mapping and read_mapping['constraint'] == 'conservative':
+            return read_mapping['to']
+        elif read_mapping and read_mapping['constraint'] == 'consistent':
+            return read_mapping['from']
+        elif write_mapping and write_mapping['constraint'] == 'conservative':
+            return write_mapping['to']
+        elif write_mapping and write_mapping['constraint'] == 'consistent':
+            return write_mapping['from']
+        return default_mesh_name
+
+    def create_config(self, user_input: UI_UserInput, log: UT_PCErrorLogging = None):
+        """Creates the main preCICE config from the UI structure.
+        Returns the intermediate representation of the case, which is also stored in self.ir"""
 
         self.exchanges = user_input.exchanges.copy()
+        self.exchange_index = user_input.exchange_index
         self.acceleration = user_input.acceleration
         # participants
         for participant_name in user_input.participants:
@@ -122,17 +162,16 @@ class PS_PreCICEConfig(object):
             participant2_solver = self.solvers[participant2_name]
             max_coupling_value = min(max_coupling_value, coupling.coupling_type.value)
 
-            temp_d = {}
             data_forward = ""
             data_backward = ""
 
-            for d in self.exchanges:
-                if d["from"] == participant1_name and d["to"] == participant2_name:
-                    temp_d = d
-                    data_forward = d["data"]
-                if d["to"] == participant1_name and d["from"] == participant2_name:
-                    temp_d = d
-                    data_backward = d["data"]
+            # the last exchange in each direction determines the data
+            forward_exchanges = self.exchange_index.between(participant1_name, participant2_name)
+            if forward_exchanges:
+                data_forward = forward_exchanges[-1]["data"]
+            backward_exchanges = self.exchange_index.between(participant2_name, participant1_name)
+            if backward_exchanges:
+                data_backward = backward_exchanges[-1]["data"]
 
             # ========== FSI =========
             if coupling.coupling_type == UI_CouplingType.fsi:
@@ -178,25 +217,25 @@ class PS_PreCICEConfig(object):
         # Initialize coupling scheme with user input
         self.couplingScheme.initFromUI(user_input, self)
 
-        pass
-
-    def write_precice_xml_config(self, filename:str, log:UT_PCErrorLogging, sync_mode: str, mode: str):
-        """ This is the main entry point to write preCICE config into an XML file"""
-
-        self.sync_mode = sync_mode  # Store sync_mode
-        self.mode = mode  # Store mode
+        self.ir = self.create_ir(log)
+        return self.ir
 
-        nsmap = {
-            "data": "data",
-            "mapping": "mapping",
-            "coupling-scheme": "coupling-scheme",
-            "post-processing": "post-processing",
-            "m2n": "m2n",
-            "master": "master"
-        }
-
-        precice_configuration_tag = etree.Element("precice-configuration", nsmap=nsmap)
+    def vary_coupling_scheme(self, user_input: UI_UserInput):
+        """ Returns the intermediate representation of the case with the coupling scheme and the acceleration of
+        user_input. Only the coupling scheme is derived again, the participants, meshes, mappings, M2N connections
+        and exchanges are taken from the IR created by create_config. Used to generate many variants of one case
+        whose 'coupling-scheme' or 'acceleration' sections differ """
+        self.acceleration = user_input.acceleration
+        self.couplingScheme.initFromUI(user_input, self)
+        coupling_scheme = self.couplingScheme.create_ir(self)
+        # the exchanges do not depend on the varied settings, they include the additional exchanges of create_ir
+        coupling_scheme = replace(coupling_scheme, exchanges=self.ir.coupling_scheme.exchanges)
+        return replace(self.ir, coupling_scheme=coupling_scheme)
 
+    def create_ir(self, log: UT_PCErrorLogging = None):
+        """ Derives the intermediate representation of the whole case from the model built by create_config.
+        All decisions (data types, mappings, received meshes, M2N connections, the coupling scheme and the
+        additional exchanges to the control participant) are taken here, the emitters only read the result """
 
         # write out:
         # first get the dimensionality of the coupling
@@ -219,40 +258,45 @@ class PS_PreCICEConfig(object):
             data_from_exchanges.append((data_key, dim, data_type))
 
         # Track created data entries to prevent duplicates
+        data_list = []
         created_data = set()
         for data, dim, data_type in data_from_exchanges:
             mystr = "scalar"
             if data_type is not None:
                 mystr = data_type
             if dim > 1:
-                if data_type == "scalar":
+                if data_type == "scalar" and log is not None:
                     log.rep_info(f"Data {data} is a vector, but data-type is set to scalar.")
                 mystr = "vector"
             
             if data not in created_data:
-                data_tag = etree.SubElement(precice_configuration_tag, etree.QName("data:"+mystr),
-                                        name=data)
+                data_list.append(DataIR(data, mystr))
                 created_data.add(data)
 
         # 2 meshes
+        meshes_list = []
         for mesh_name in self.meshes:
             mesh = self.meshes[mesh_name]
-            mesh_tag = etree.SubElement(precice_configuration_tag, "mesh", name=mesh.name, dimensions=str(dimensionality))
-            for quantities_name in mesh.quantities:
-                quant = mesh.quantities[quantities_name]
-                quant_tag = etree.SubElement(mesh_tag, "use-data", name=quant.instance_name)
+            meshes_list.append(MeshIR(mesh.name, dimensionality,
+                                      tuple(mesh.quantities[q].instance_name for q in mesh.quantities)))
 
         # Initialize dictionaries to store provide and receive meshes
         self.solver_provide_meshes = {}
         self.solver_receive_meshes = {}
         # 3 participants
         m2n_pairs_added = set()
-        self.solver_tags = {}
+        m2n_list = []
+        # the received meshes, data and mappings of each participant, in the order they are derived
+        receive_meshes = {}
+        write_data = {}
+        read_data = {}
+        mappings = {}
         for solver_name in self.solvers:
             solver = self.solvers[solver_name]
-            solver_tag = etree.SubElement(precice_configuration_tag,
-                                          "participant", name=solver.name)
-            self.solver_tags[solver_name] = solver_tag
+            receive_meshes[solver_name] = []
+            write_data[solver_name] = []
+            read_data[solver_name] = []
+            mappings[solver_name] = []
 
             # Initialize lists for this solver's provide and receive meshes
             self.solver_provide_meshes[solver_name] = []
@@ -261,8 +305,6 @@ class PS_PreCICEConfig(object):
             # there are more than one meshes per participant
             for solvers_mesh_name in solver.meshes:
                 # print("Mesh=", solvers_mesh_name)
-                solver_mesh_tag = etree.SubElement(solver_tag,
-                                              "provide-mesh", name=solvers_mesh_name)
                 # Save provided meshes
                 self.solver_provide_meshes[solver_name].append(solvers_mesh_name)
 
@@ -280,8 +322,7 @@ class PS_PreCICEConfig(object):
                 used_meshes = {}
                 for q_name in solver.quantities_read:
                     q = solver.quantities_read[q_name]
-                    read_tag = etree.SubElement(solver_tag,
-                                                       "read-data", name=q.instance_name, mesh=solvers_mesh_name)
+                    read_data[solver_name].append(DataAccessIR(q.instance_name, solvers_mesh_name))
                     for other_solvers_name in q.list_of_solvers:
                         other_solver = q.list_of_solvers[other_solvers_name]
                         # consistent only read
@@ -295,9 +336,8 @@ class PS_PreCICEConfig(object):
                             # within one participant put the "use-mesh" only once there
                             if solvers_mesh_name != q.source_mesh_name and \
                                             q.source_mesh_name not in used_meshes:
-                                solver_mesh_tag = etree.SubElement(solver_tag,
-                                                                   "receive-mesh", name=q.source_mesh_name,
-                                                                   from___=q.source_solver.name)
+                                receive_meshes[solver_name].append(
+                                    ReceiveMeshIR(q.source_mesh_name, q.source_solver.name))
                                 # Save received meshes
                                 if solver_name not in self.solver_receive_meshes:
                                     self.solver_receive_meshes[solver_name] = []
@@ -308,8 +348,7 @@ class PS_PreCICEConfig(object):
                     pass
                 for q_name in solver.quantities_write:
                     q = solver.quantities_write[q_name]
-                    write_tag = etree.SubElement(solver_tag,
-                                                       "write-data", name=q.instance_name, mesh=solvers_mesh_name)
+                    write_data[solver_name].append(DataAccessIR(q.instance_name, solvers_mesh_name))
                     for other_solvers_name in q.list_of_solvers:
                         other_solver = q.list_of_solvers[other_solvers_name]
                         # conservative only write
@@ -330,10 +369,9 @@ class PS_PreCICEConfig(object):
                     other_solver = list_of_solvers_with_higher_complexity_read[other_solver_name]
                     mapping_string = type_of_the_mapping_read[other_solver_name]
                     other_solver_mesh_name = self.get_mesh_name_by_participants(other_solver_name, solver_name)
-                    mapped_tag = etree.SubElement(solver_tag, "mapping:nearest-neighbor", direction = "read",
-                                                  from___ = other_solver_mesh_name, to= solvers_mesh_name,
-                                                  constraint = mapping_string)
-                    self.mappings_read.append({
+                    mappings[solver_name].append(
+                        MappingIR("read", other_solver_mesh_name, solvers_mesh_name, mapping_string))
+                    self.add_mapping("read", {
                         'other_solver_name': other_solver_name,
                         'from': other_solver_mesh_name,
                         'to': solvers_mesh_name,
@@ -348,16 +386,13 @@ class PS_PreCICEConfig(object):
                     
                     # Always add receive mesh for the participant specifying a mapping if it does not already exist
                     if other_solver_mesh_name not in self.solver_receive_meshes[solver_name]:
-                        solver_mesh_tag = etree.SubElement(solver_tag,
-                                                           "receive-mesh", name=other_solver_mesh_name,
-                                                           from___=other_solver_name)
+                        receive_meshes[solver_name].append(ReceiveMeshIR(other_solver_mesh_name, other_solver_name))
                         self.solver_receive_meshes[solver_name].append(other_solver_mesh_name)
                     
                     # Add write mapping
-                    mapped_tag = etree.SubElement(solver_tag, "mapping:nearest-neighbor", direction="write",
-                                              from___ = solvers_mesh_name, to = other_solver_mesh_name,
-                                              constraint = mapping_string)
-                    self.mappings_write.append({
+                    mappings[solver_name].append(
+                        MappingIR("write", solvers_mesh_name, other_solver_mesh_name, mapping_string))
+                    self.add_mapping("write", {
                         'other_solver_name': other_solver_name,
                         'from': solvers_mesh_name,
                         'to': other_solver_mesh_name,
@@ -371,61 +406,60 @@ class PS_PreCICEConfig(object):
                     # Check if this pair or its reverse has already been added
                     m2n_pair = tuple(sorted([solver_name, other_solver_name]))
                     if m2n_pair not in m2n_pairs_added:
-                        m2n_tag = etree.SubElement(precice_configuration_tag, "m2n:sockets", 
-                                                   acceptor=solver_name, 
-                                                   connector=other_solver_name, 
-                                                   exchange___directory="..")
+                        m2n_list.append(M2NIR(solver_name, other_solver_name))
                         m2n_pairs_added.add(m2n_pair)
                 pass
 
         # 4 coupling scheme
         # TODO: later this might be more complex !!!
-        self.couplingScheme.write_precice_xml_config(precice_configuration_tag, self)
+        coupling_scheme = self.couplingScheme.create_ir(self)
 
         # Validate mesh exchanges for convergence measures
-        self.validate_convergence_measure_mesh_exchange(self,self.exchange_mesh_names)
-        # =========== generate XML ===========================
-
-        xml_string = etree.tostring(precice_configuration_tag, #pretty_print=True, xml_declaration=True,
-                                    encoding="UTF-8")
-        # Remove xmlns:* attributes which are not recognized by preCICE
-        # print( " STR: ", xml_string)
-        from_index = xml_string.decode("ascii").find("<precice-configuration")
-        to_index = xml_string.decode("ascii").find(">", from_index)
-        xml_string = xml_string.decode("ascii")[0:from_index] + "<precice-configuration>" + xml_string.decode("ascii")[
-                                                                                            to_index + 1:]
-        # just a workaround of how to avoid problems with the parser
-        # TODO: later we should find a more elegant solution
-        replace_only_list = [("from___", "from"), ("exchange___directory", "exchange-directory")]
-        for a,b in replace_only_list:
-            xml_string = xml_string.replace(a, b)
-        replace_list = [("data:", "data___"), ("mapping:nearest", "mapping___nearest"), ("m2n:", "m2n___" ),
-                        ("coupling-scheme:","coupling-scheme___"), ("acceleration:", "acceleration___")]
-        for a,b in replace_list:
-            xml_string = xml_string.replace(a, b)
-
-        # reformat the XML and add indents
-        replaced_str = my_minidom.parseString(xml_string)
-        xml_string = replaced_str.toprettyxml(indent="   ")
-
-        for a,b in replace_list:
-            xml_string = xml_string.replace(b, a)
-
-        output_xml_file = open(filename, "w")
-        output_xml_file.write(xml_string)
-        output_xml_file.close()
-
-        log.rep_info("Output XML file: " + filename)
-
-        pass
-
-    def validate_convergence_measure_mesh_exchange(self, config, exchange_mesh_names):
+        additional_exchanges = []
+        self.validate_convergence_measure_mesh_exchange(self, self.exchange_mesh_names,
+                                                        additional_exchanges, receive_meshes)
+        if additional_exchanges:
+            coupling_scheme = replace(coupling_scheme,
+                                      exchanges=coupling_scheme.exchanges + tuple(additional_exchanges))
+
+        participants_list = []
+        for solver_name in self.solvers:
+            solver = self.solvers[solver_name]
+            # the first exchange that the participant receives defines its coupling interface
+            interface = None
+            for exchange in self.exchange_index.received_by(solver.name)[:1]:
+                interface = InterfaceIR(exchange.get('from'), exchange.get('from-patch'), exchange.get('to-patch'))
+            participants_list.append(ParticipantIR(
+                name=solver.name,
+                solver=solver.solver_name,
+                provide_meshes=tuple(self.solver_provide_meshes[solver_name]),
+                receive_meshes=tuple(receive_meshes[solver_name]),
+                write_data=tuple(write_data[solver_name]),
+                read_data=tuple(read_data[solver_name]),
+                mappings=tuple(mappings[solver_name]),
+                interface=interface))
+
+        return ConfigIR(data=tuple(data_list), meshes=tuple(meshes_list), participants=tuple(participants_list),
+                        m2n=tuple(m2n_list), coupling_scheme=coupling_scheme)
+
+    def build_precice_xml_tree(self):
+        """ This is the main entry point to build the preCICE config as an XML element tree.
+        The tree is built from the intermediate representation created by create_config.
+        It uses the final preCICE tag and attribute names (e.g. "data:vector", "from") and is
+        serialized by an emitter, so no string post-processing of the XML is necessary"""
+        return build_precice_config_tree(self.ir)
+
+    def validate_convergence_measure_mesh_exchange(self, config, exchange_mesh_names,
+                                                   additional_exchanges: list, receive_meshes: dict):
         """
         Validate that meshes used in convergence measures are properly exchanged in multi-coupling schemes.
         
         Args:
             config (PS_PreCICEConfig): The configuration to validate
-            exchange_mesh_names (list): List of mesh names exchanged during configuration
+            exchange_mesh_names (dict): The mesh names exchanged during configuration, in the order of the exchanges
+            additional_exchanges (list): The exchanges to the control participant that are missing are appended here
+            receive_meshes (dict): The received meshes of each participant, missing meshes of the control
+                participant are appended
         
         Raises:
             ValueError: If a mesh used in convergence measure is not exchanged to the control participant
@@ -441,42 +475,31 @@ class PS_PreCICEConfig(object):
         control_participant_meshes = set(config.solvers[control_participant].meshes)
         control_participant_meshes.update(self.solver_receive_meshes.get(control_participant, []))
 
-        exchanged_data_on_control = []
-        for exchange in config.exchanges:
-            if exchange.get('to').lower() == control_participant.lower():
-                exchanged_data_on_control.append(exchange.get('data'))
+        exchanged_data_on_control = [exchange.get('data')
+                                     for exchange in config.exchange_index.received_by(control_participant, ignore_case=True)]
+
+        # Participants providing each mesh, in the order of the solvers
+        mesh_providers = {}
+        for p_name, p in config.solvers.items():
+            for mesh in p.meshes:
+                mesh_providers.setdefault(mesh, []).append(p_name)
 
         # Check if each exchanged mesh is present in the control participant's meshes
         for mesh in exchange_mesh_names:
             # Find which participant provides this mesh
-            providing_participants = [
-                p_name for p_name, p in config.solvers.items() 
-                if mesh in p.meshes
-            ]
+            providing_participants = mesh_providers.get(mesh, [])
 
             # If no participant provides the mesh, raise an error
             if not providing_participants:
                 raise ValueError(f"Mesh '{mesh}' used in configuration is not available to any participant")
 
             #get data via topology
-            for exchange in config.exchanges:                  
-                if providing_participants[0].lower() == exchange.get('from').lower():
-                    data = exchange.get('data')
-                    if (data not in exchanged_data_on_control) and (exchange.get('from').lower() != control_participant.lower()):
-                        exchanged_data_on_control.append(data)
-                        e = etree.SubElement(self.coupling_scheme, "exchange", 
-                            data= data, mesh=mesh,
-                            from___=providing_participants[0], to=control_participant)
-                        config.exchanges.append({
-                            'data': data,
-                            'mesh': mesh,
-                            'from': providing_participants[0],
-                            'to': control_participant
-                        }) 
+            for exchange in config.exchange_index.sent_by(providing_participants[0]):
+                data = exchange.get('data')
+                if (data not in exchanged_data_on_control) and (exchange.get('from').lower() != control_participant.lower()):
+                    exchanged_data_on_control.append(data)
+                    additional_exchanges.append(ExchangeIR(data, mesh, providing_participants[0], control_participant))
                     
             if mesh not in control_participant_meshes:
                 # Add the mesh to the control participant as receive and add an exchange for it
-                solver_tag = self.solver_tags[control_participant]
-                solver_mesh_tag = etree.SubElement(solver_tag,
-                                    "receive-mesh", name=mesh,
-                                    from___=providing_participants[0])
+                receive_meshes[control_participant].append(ReceiveMeshIR(mesh, providing_participants[0]))
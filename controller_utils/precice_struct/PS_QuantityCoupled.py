@@ -1,20 +1,28 @@
 from controller_utils.myutils.UT_PCErrorLogging import UT_PCErrorLogging
+from controller_utils.myutils.UT_Names import intern_name
 from enum import Enum
 
 class QuantityCouple(object):
-    """ the quantity that is coupled """
+    """ the quantity that is coupled
+
+    The physical description of the quantity (name, unit, mapping, dimension) is the same for all
+    quantities of one type, therefore it is stored once in the class and is read only on the instances.
+    The instances only store what belongs to one coupled data """
+    __slots__ = ("instance_name", "BC", "list_of_solvers", "source_solver", "source_mesh_name")
+
+    name = "None"   # the name of the quantity as it is called physically
+    unit = "None"   # unit of the quantity
+    relative_tolerance = 1E-4 # the relative convergence for coupling
+    mapping_string = "ERROR" # conservative or consistent
+    dim = 3 # the dimension of the quantity
+    is_consistent = True # True if this quantity is consistent False if it is conservative
+
     def __init__(self):
-        self.name = "None"   # the name of the quantity as it is called physically
         self.instance_name = "None" # this will be the solver name "-" quantity name, example: "InnerSolver-Pressure"
-        self.unit = "None"   # unit of the quantity
         self.BC = -1 # boundary code for the coupling
-        self.relative_tolerance = 1E-4 # the relative convergence for coupling
         self.list_of_solvers = {} # list of solvers that use this quantity (either read or write)
         self.source_solver = None # the origin of this quantity the solver how creates it
         self.source_mesh_name = "None" # the source mesh name
-        self.mapping_string = "ERROR" # conservative or consistent
-        self.dim = 3 # the dimension of the quantity
-        self.is_consistent = True # True if this quantity is consistent False if it is conservative
         pass
 
 
@@ -41,68 +49,62 @@ def get_quantity_object(name:str, bc:str, instance_name:str):
         ret.BC = bc
         # the instance name is like "InnerSolver-Pressure" (a combination of solver name and quantity name)
         # print(" Instance Name = ",instance_name)
-        ret.instance_name = instance_name
+        ret.instance_name = intern_name(instance_name)
         return ret
 
 class Force(QuantityCouple):
     """ Forces """
-    def __init__(self):
-        super().__init__()
-        self.name = "Force"
-        self.unit = "N"
-        self.mapping_string = "conservative"
-        self.is_consistent = False
-        pass
+    __slots__ = ()
+
+    name = "Force"
+    unit = "N"
+    mapping_string = "conservative"
+    is_consistent = False
 
 
 class Displacement(QuantityCouple):
     """ Displacements """
-    def __init__(self):
-        super().__init__()
-        self.name = "Displacement"
-        self.unit = "m"
-        self.mapping_string = "consistent"
-        pass
+    __slots__ = ()
+
+    name = "Displacement"
+    unit = "m"
+    mapping_string = "consistent"
 
 
 class Velocity(QuantityCouple):
     """ Velocities """
-    def __init__(self):
-        super().__init__()
-        self.name = "Velocity"
-        self.unit = "m/s"
-        self.mapping_string = "consistent"
-        pass
+    __slots__ = ()
+
+    name = "Velocity"
+    unit = "m/s"
+    mapping_string = "consistent"
 
 
 class Pressure(QuantityCouple):
     """ Pressures """
-    def __init__(self):
-        super().__init__()
-        self.name = "Pressure"
-        self.unit = "N/m^2"
-        self.mapping_string = "consistent"
-        self.dim = 1
-        pass
+    __slots__ = ()
+
+    name = "Pressure"
+    unit = "N/m^2"
+    mapping_string = "consistent"
+    dim = 1
 
 
 class Temperature(QuantityCouple):
     """ temperature """
-    def __init__(self):
-        super().__init__()
-        self.name = "Temperature"
-        self.unit = "C"
-        self.mapping_string = "consistent"
-        self.dim = 1
-        pass
+    __slots__ = ()
+
+    name = "Temperature"
+    unit = "C"
+    mapping_string = "consistent"
+    dim = 1
 
 
 class HeatTransfer(QuantityCouple):
     """ heat transfer """
-    def __init__(self):
-        super().__init__()
-        self.name = "HeatTransfer"
-        self.unit = "?"
-        self.mapping_string = "consistent"
-        self.dim = 1
-        pass
\ No newline at end of file
+    __slots__ = ()
+
+    name = "HeatTransfer"
+    unit = "?"
+    mapping_string = "consistent"
+    dim = 1
@@ -3,6 +3,8 @@ from .PS_ParticipantSolver import SolverDomain
 from .PS_ParticipantSolver import SolverDimension
 from .PS_ParticipantSolver import SolverNature
 from .PS_QuantityCoupled import QuantityCouple
+from .PS_ConfigIR import ConfigIR
+from .PS_ConfigTree import build_precice_config_tree
 from .PS_PreCICEConfig import PS_PreCICEConfig
 from .PS_CouplingScheme import PS_ImplicitCoupling
 from .PS_CouplingScheme import PS_ExplicitCoupling
\ No newline at end of file
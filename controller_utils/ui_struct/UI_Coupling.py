@@ -12,6 +12,8 @@ class UI_Coupling(object):
     This class contains information on the user input level
     regarding the coupling of two participants
     """
+    __slots__ = ("boundaryC1", "boundaryC2", "participant1", "participant2", "coupling_type")
+
     def __init__(self):
         """The constructor."""
         self.boundaryC1 = -1
@@ -0,0 +1,89 @@
+class UI_ExchangeIndex(object):
+    """
+    This class indexes the exchanges of the topology, such that the config builder
+    can look up the exchanges of a participant pair, of a participant or of a data name
+    without scanning the complete list of exchanges.
+
+    All lookups return the exchanges in the order of the topology.
+    """
+    def __init__(self, exchanges: list = None):
+        """The constructor, builds the index in one pass over the exchanges"""
+        self.exchanges = []           # all exchanges in topology order
+        self.by_pair = {}             # (from, to) -> positions
+        self.by_participant = {}      # participant name (sender or receiver) -> positions
+        self.by_data = {}             # data name -> positions
+        self.by_receiver = {}         # receiving participant -> positions
+        self.by_sender_and_data = {}  # (sending participant, data name) -> positions
+        self.by_receiver_and_data = {}  # (receiving participant, data name) -> positions
+        # the config builder compares some names case insensitive
+        self.by_sender_lower = {}
+        self.by_receiver_lower = {}
+        self.by_data_lower = {}
+        for exchange in exchanges or []:
+            self.add(exchange)
+        pass
+
+    def add(self, exchange: dict):
+        """ adds one exchange at the end of the index """
+        position = len(self.exchanges)
+        self.exchanges.append(exchange)
+        sender = exchange.get("from")
+        receiver = exchange.get("to")
+        data = exchange.get("data")
+
+        self.by_pair.setdefault((sender, receiver), []).append(position)
+        self.by_participant.setdefault(sender, []).append(position)
+        if receiver != sender:
+            self.by_participant.setdefault(receiver, []).append(position)
+        self.by_data.setdefault(data, []).append(position)
+        self.by_receiver.setdefault(receiver, []).append(position)
+        self.by_sender_and_data.setdefault((sender, data), []).append(position)
+        self.by_receiver_and_data.setdefault((receiver, data), []).append(position)
+        if isinstance(sender, str):
+            self.by_sender_lower.setdefault(sender.lower(), []).append(position)
+        if isinstance(receiver, str):
+            self.by_receiver_lower.setdefault(receiver.lower(), []).append(position)
+        if isinstance(data, str):
+            self.by_data_lower.setdefault(data.lower(), []).append(position)
+        pass
+
+    def _lookup(self, index: dict, key) -> list:
+        """ returns the exchanges stored under the key of the given index """
+        return [self.exchanges[position] for position in index.get(key, [])]
+
+    def between(self, sender: str, receiver: str) -> list:
+        """ returns the exchanges sent from one participant to the other """
+        return self._lookup(self.by_pair, (sender, receiver))
+
+    def of_participant(self, participant_name: str) -> list:
+        """ returns the exchanges sent or received by the participant """
+        return self._lookup(self.by_participant, participant_name)
+
+    def with_data(self, data_name: str, ignore_case: bool = False) -> list:
+        """ returns the exchanges of a data name """
+        if ignore_case:
+            return self._lookup(self.by_data_lower, data_name.lower())
+        return self._lookup(self.by_data, data_name)
+
+    def sent_by(self, participant_name: str) -> list:
+        """ returns the exchanges sent by the participant, the name is compared case insensitive """
+        return self._lookup(self.by_sender_lower, participant_name.lower())
+
+    def received_by(self, participant_name: str, ignore_case: bool = False) -> list:
+        """ returns the exchanges received by the participant """
+        if ignore_case:
+            return self._lookup(self.by_receiver_lower, participant_name.lower())
+        return self._lookup(self.by_receiver, participant_name)
+
+    def of_participant_with_data(self, participant_name: str, write_data: list, read_data: list) -> list:
+        """ returns the exchanges that the participant writes with a data name in write_data
+        or reads with a data name in read_data, in topology order """
+        positions = set()
+        for data in write_data:
+            positions.update(self.by_sender_and_data.get((participant_name, data), []))
+        for data in read_data:
+            for position in self.by_receiver_and_data.get((participant_name, data), []):
+                # an exchange that the participant sends is never treated as read
+                if self.exchanges[position].get("from") != participant_name:
+                    positions.add(position)
+        return [self.exchanges[position] for position in sorted(positions)]
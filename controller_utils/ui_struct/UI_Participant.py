@@ -1,4 +1,5 @@
 from controller_utils.myutils.UT_PCErrorLogging import UT_PCErrorLogging
+from controller_utils.myutils.UT_Names import intern_name
 from controller_utils.ui_struct.UI_Coupling import UI_Coupling
 
 
@@ -6,14 +7,15 @@ class UI_Participant(object):
     """
     This class represents one participant as it is declared on the user input level
     """
+    __slots__ = ("name", "solver_name", "list_of_couplings", "solver_domain", "data_type", "dimensionality")
 
     def __init__(self, name: str = "", solver_name: str = "", list_of_couplings=None,
                  solver_domain: str = "", data_type: str = "scalar", dimensionality: int = None):
         if list_of_couplings is None:
             list_of_couplings = []
 
-        self.name = name
-        self.solver_name = solver_name
+        self.name = intern_name(name)
+        self.solver_name = intern_name(solver_name)
         self.list_of_couplings = list_of_couplings  # list of empty couplings
         self.solver_domain = solver_domain  # this shows if this participant is a fluid or structure or else solver
         self.data_type = data_type
@@ -27,8 +29,8 @@ class UI_Participant(object):
         self = cls()
 
         try:
-            self.name = participant_name
-            self.solver_name = etree["solver"]
+            self.name = intern_name(participant_name)
+            self.solver_name = intern_name(etree["solver"])
             self.data_type = etree["data-type"]
         except:
             mylog.rep_error("Error in YAML initialization of the Participant.")
@@ -0,0 +1,80 @@
+import re
+
+# the index of a replicated entry, optionally with a format spec, e.g. "Solid{i}" or "Solid{i:03d}"
+INDEX_PLACEHOLDER = re.compile(r"\{i(?::([^{}]*))?\}")
+
+
+def replicate_indices(replicate) -> range:
+    """ returns the indices of a replicated participant or exchange
+    replicate is either the number of copies (indices 0 .. count-1) or a mapping
+    {first: a, last: b} with the inclusive index range, an empty range is rejected """
+    if isinstance(replicate, int) and not isinstance(replicate, bool):
+        if replicate < 1:
+            raise ValueError(f"Invalid replicate value: {replicate}. The number of copies must be at least 1.")
+        return range(replicate)
+    if isinstance(replicate, dict) and isinstance(replicate.get("first"), int) \
+            and isinstance(replicate.get("last"), int):
+        if replicate["last"] < replicate["first"]:
+            raise ValueError(f"Invalid replicate value: {replicate}. 'last' must not be smaller than 'first'.")
+        return range(replicate["first"], replicate["last"] + 1)
+    raise ValueError(f"Invalid replicate value: {replicate}. "
+                     f"Must be a count or a mapping with 'first' and 'last' index.")
+
+
+def _format_index(match, index: int) -> str:
+    """ formats the index for one placeholder, a format spec that cannot format an integer is rejected """
+    try:
+        return format(index, match.group(1) or "")
+    except (ValueError, OverflowError) as format_error:
+        raise ValueError(f"Invalid index placeholder {match.group(0)}: {format_error}")
+
+
+def substitute_index(value, index: int):
+    """ replaces the index placeholders in the string values of a (nested) entry """
+    if isinstance(value, str):
+        if "{" not in value:
+            return value
+        return INDEX_PLACEHOLDER.sub(lambda match: _format_index(match, index), value)
+    if isinstance(value, dict):
+        return {key: substitute_index(item, index) for key, item in value.items()}
+    if isinstance(value, list):
+        return [substitute_index(item, index) for item in value]
+    return value
+
+
+def _describe_entry(entry: dict, position: int) -> str:
+    """ names an entry for messages, by its name or its participants """
+    if "name" in entry:
+        return f"entry {position} ({entry['name']})"
+    if "from" in entry or "to" in entry:
+        return f"entry {position} ({entry.get('from')} -> {entry.get('to')})"
+    return f"entry {position}"
+
+
+def check_entries(entries) -> None:
+    """ checks the replicated entries of a topology without expanding them: the replicate value and the
+    index placeholders, formatted with the first and the last index
+    raises ValueError naming the first broken entry """
+    for position, entry in enumerate(entries or []):
+        if not isinstance(entry, dict) or "replicate" not in entry:
+            continue
+        try:
+            indices = replicate_indices(entry["replicate"])
+            template = {key: value for key, value in entry.items() if key != "replicate"}
+            for index in (indices[0], indices[-1]):
+                substitute_index(template, index)
+        except ValueError as replicate_error:
+            raise ValueError(f"{_describe_entry(entry, position)}: {replicate_error}")
+
+
+def expand_entries(entries):
+    """ yields the participants or exchanges of a topology one after another, replicated
+    entries (with a 'replicate' key) are expanded into one entry per index.
+    The entries are produced on demand, the expanded list is never built here """
+    for entry in entries or []:
+        if not isinstance(entry, dict) or "replicate" not in entry:
+            yield entry
+            continue
+        template = {key: value for key, value in entry.items() if key != "replicate"}
+        for index in replicate_indices(entry["replicate"]):
+            yield substitute_index(template, index)
@@ -3,6 +3,8 @@ from controller_utils.ui_struct.UI_Participant import UI_Participant
 from controller_utils.ui_struct.UI_Coupling import UI_Coupling
 from controller_utils.myutils.UT_PCErrorLogging import UT_PCErrorLogging
 from controller_utils.ui_struct.UI_Coupling import UI_CouplingType
+from controller_utils.ui_struct.UI_ExchangeIndex import UI_ExchangeIndex
+from controller_utils.ui_struct.UI_Replication import expand_entries
 
 
 class UI_UserInput(object):
@@ -20,26 +22,96 @@ class UI_UserInput(object):
         self.participants = {} # empty participants stored as a dictionary
         self.couplings = []    # empty coupling list
         self.exchanges = []    # empty exchanges list
+        self.exchange_index = UI_ExchangeIndex() # index over the exchanges
         pass
 
+    def init_coupling_scheme_from_yaml(self, etree):
+        """ Reads the simulation info from the 'coupling-scheme' section of a topology.
+        Also used on its own to vary the coupling scheme of an already initialized case """
+        simulation_info = etree["coupling-scheme"]
+        self.sim_info.NrTimeStep = simulation_info.get("max-time")
+        self.sim_info.Dt = simulation_info.get("time-window-size")
+        self.sim_info.max_iterations = simulation_info.get("max-iterations")
+        self.sim_info.display_standard_values = simulation_info.get('display_standard_values', 'false')
+        self.sim_info.coupling = simulation_info.get("coupling", "parallel")
+
+    def init_acceleration_from_yaml(self, etree, mylog: UT_PCErrorLogging):
+        """ Reads the 'acceleration' section of a topology, the acceleration is None if there is none.
+        Also used on its own to vary the acceleration of an already initialized case """
+        self.acceleration = None
+        if 'acceleration' in etree:
+            acceleration = etree['acceleration']
+            display_standard_values = acceleration.get('display_standard_values', 'false')
+            if display_standard_values.lower() not in ['true', 'false']:
+                mylog.rep_error(f"Invalid display_standard_values value: {display_standard_values}. Must be 'true' or 'false'.")
+            if display_standard_values.lower() == 'true':
+                self.acceleration = {
+                    'name': acceleration.get('name', 'IQN-ILS'),
+                    'initial-relaxation': {
+                        'value': acceleration.get('initial-relaxation', {}).get('value', 0.1),
+                        'enforce': acceleration.get('initial-relaxation', {}).get('enforce', 'false')
+                    },
+                    'preconditioner': {
+                        'freeze-after': acceleration.get('preconditioner', {}).get('freeze-after', -1),
+                        'type': acceleration.get('preconditioner', {}).get('type', None)
+                    },
+                    'filter': {
+                        'limit': acceleration.get('filter', {}).get('limit', 1e-16),
+                        'type': acceleration.get('filter', {}).get('type', None)
+                    },
+                    'max-used-iterations': acceleration.get('max-used-iterations', None),
+                    'time-windows-reused': acceleration.get('time-windows-reused', None),
+                    'imvj-restart-mode': {
+                        'truncation-threshold': acceleration.get('imvj-restart-mode', {}).get('truncation-threshold', None),
+                        'chunk-size': acceleration.get('imvj-restart-mode', {}).get('chunk-size', None),
+                        'reused-time-windows-at-restart': acceleration.get('imvj-restart-mode', {}).get('reused-time-windows-at-restart', None),
+                        'type': acceleration.get('imvj-restart-mode', {}).get('type', None)
+                    }if any(acceleration.get('imvj-restart-mode', {}).values()) else None,
+                    'display_standard_values': acceleration.get('display_standard_values', 'false')
+                }
+            # If display_standard_values is false, set default values to none so they are not displayed
+            else:
+                self.acceleration = {
+                    'name': acceleration.get('name', 'IQN-ILS'),
+                    'initial-relaxation': acceleration.get('initial-relaxation', None),
+                    'preconditioner': {
+                        'freeze-after': acceleration.get('preconditioner', {}).get('freeze-after', None),
+                        'type': acceleration.get('preconditioner', {}).get('type', None)
+                    } if any(acceleration.get('preconditioner', {}).values()) else None,
+                    'initial-relaxation': {
+                        'value': acceleration.get('initial-relaxation', {}).get('value', None),
+                        'enforce': acceleration.get('initial-relaxation', {}).get('enforce', None)
+                    } if any(acceleration.get('initial-relaxation', {}).values()) else None,
+                    'filter': {
+                        'limit': acceleration.get('filter', {}).get('limit', None),
+                        'type': acceleration.get('filter', {}).get('type', None)
+                    } if any(acceleration.get('filter', {}).values()) else None,
+                    'max-used-iterations': acceleration.get('max-used-iterations', None),
+                    'time-windows-reused': acceleration.get('time-windows-reused', None),
+                    'imvj-restart-mode': {
+                        'truncation-threshold': acceleration.get('imvj-restart-mode', {}).get('truncation-threshold', None),
+                        'chunk-size': acceleration.get('imvj-restart-mode', {}).get('chunk-size', None),
+                        'reused-time-windows-at-restart': acceleration.get('imvj-restart-mode', {}).get('reused-time-windows-at-restart', None),
+                        'type': acceleration.get('imvj-restart-mode', {}).get('type', None)
+                    } if any(acceleration.get('imvj-restart-mode', {}).values()) else None,
+                    'display_standard_values': acceleration.get('display_standard_values', 'false')
+                }
+
     def init_from_yaml(self, etree, mylog: UT_PCErrorLogging):
         # Check if using new topology structure
         if "coupling-scheme" in etree and "participants" in etree and "exchanges" in etree:
             # --- Parse simulation info from 'coupling-scheme' ---
-            simulation_info = etree["coupling-scheme"]
-            self.sim_info.NrTimeStep = simulation_info.get("max-time")
-            self.sim_info.Dt = simulation_info.get("time-window-size")
-            self.sim_info.max_iterations = simulation_info.get("max-iterations")
-            self.sim_info.display_standard_values = simulation_info.get('display_standard_values', 'false')
-            self.sim_info.coupling = simulation_info.get("coupling", "parallel")
-
-            # Initialize coupling type+ acceleration to None
+            self.init_coupling_scheme_from_yaml(etree)
+
+            # Initialize coupling type to None
             self.coupling_type = None
-            self.acceleration = None
             
+            # Replicated exchanges are expanded once, the index holds one exchange per instance
+            exchanges_list = list(expand_entries(etree["exchanges"]))
+
             # Extract coupling type from exchanges
             if 'exchanges' in etree:
-                exchanges = etree['exchanges']
+                exchanges = exchanges_list
                 exchange_types = [exchange.get('type') for exchange in exchanges if 'type' in exchange]
                 
                 # Validate exchange types
@@ -57,68 +129,12 @@ class UI_UserInput(object):
                         self.coupling_type = 'weak'
             
             # --- Parse Acceleration ---
-            if 'acceleration' in etree:
-                acceleration = etree['acceleration']
-                display_standard_values = acceleration.get('display_standard_values', 'false')
-                if display_standard_values.lower() not in ['true', 'false']:
-                    mylog.rep_error(f"Invalid display_standard_values value: {display_standard_values}. Must be 'true' or 'false'.")
-                if display_standard_values.lower() == 'true':
-                    self.acceleration = {
-                        'name': acceleration.get('name', 'IQN-ILS'),
-                        'initial-relaxation': {
-                            'value': acceleration.get('initial-relaxation', {}).get('value', 0.1),
-                            'enforce': acceleration.get('initial-relaxation', {}).get('enforce', 'false')
-                        },
-                        'preconditioner': {
-                            'freeze-after': acceleration.get('preconditioner', {}).get('freeze-after', -1),
-                            'type': acceleration.get('preconditioner', {}).get('type', None)
-                        },
-                        'filter': {
-                            'limit': acceleration.get('filter', {}).get('limit', 1e-16),
-                            'type': acceleration.get('filter', {}).get('type', None)
-                        },
-                        'max-used-iterations': acceleration.get('max-used-iterations', None),
-                        'time-windows-reused': acceleration.get('time-windows-reused', None),
-                        'imvj-restart-mode': {
-                            'truncation-threshold': acceleration.get('imvj-restart-mode', {}).get('truncation-threshold', None),
-                            'chunk-size': acceleration.get('imvj-restart-mode', {}).get('chunk-size', None),
-                            'reused-time-windows-at-restart': acceleration.get('imvj-restart-mode', {}).get('reused-time-windows-at-restart', None),
-                            'type': acceleration.get('imvj-restart-mode', {}).get('type', None)
-                        }if any(acceleration.get('imvj-restart-mode', {}).values()) else None,
-                        'display_standard_values': acceleration.get('display_standard_values', 'false')
-                    }
-                # If display_standard_values is false, set default values to none so they are not displayed
-                else:
-                    self.acceleration = {
-                        'name': acceleration.get('name', 'IQN-ILS'),
-                        'initial-relaxation': acceleration.get('initial-relaxation', None),
-                        'preconditioner': {
-                            'freeze-after': acceleration.get('preconditioner', {}).get('freeze-after', None),
-                            'type': acceleration.get('preconditioner', {}).get('type', None)
-                        } if any(acceleration.get('preconditioner', {}).values()) else None,
-                        'initial-relaxation': {
-                            'value': acceleration.get('initial-relaxation', {}).get('value', None),
-                            'enforce': acceleration.get('initial-relaxation', {}).get('enforce', None)
-                        } if any(acceleration.get('initial-relaxation', {}).values()) else None,
-                        'filter': {
-                            'limit': acceleration.get('filter', {}).get('limit', None),
-                            'type': acceleration.get('filter', {}).get('type', None)
-                        } if any(acceleration.get('filter', {}).values()) else None,
-                        'max-used-iterations': acceleration.get('max-used-iterations', None),
-                        'time-windows-reused': acceleration.get('time-windows-reused', None),
-                        'imvj-restart-mode': {
-                            'truncation-threshold': acceleration.get('imvj-restart-mode', {}).get('truncation-threshold', None),
-                            'chunk-size': acceleration.get('imvj-restart-mode', {}).get('chunk-size', None),
-                            'reused-time-windows-at-restart': acceleration.get('imvj-restart-mode', {}).get('reused-time-windows-at-restart', None),
-                            'type': acceleration.get('imvj-restart-mode', {}).get('type', None)
-                        } if any(acceleration.get('imvj-restart-mode', {}).values()) else None,
-                        'display_standard_values': acceleration.get('display_standard_values', 'false')
-                    }
-                
-            
+            self.init_acceleration_from_yaml(etree, mylog)
+
             # --- Parse participants ---
             self.participants = {}
-            participants_data = etree["participants"]
+            # replicated participants are expanded on the fly, one UI_Participant per index
+            participants_data = expand_entries(etree["participants"])
             for participant in participants_data:
                 # Handle new list of dictionaries format
                 if isinstance(participant, dict):
@@ -140,9 +156,10 @@ class UI_UserInput(object):
                     continue
 
             # --- Parse couplings from exchanges ---
-            exchanges_list = etree["exchanges"]
             # Save full exchange details
-            self.exchanges = exchanges_list.copy()
+            self.exchanges = exchanges_list
+            # Index the exchanges once, the config builder looks them up by pair, participant and data
+            self.exchange_index = UI_ExchangeIndex(self.exchanges)
 
             # Group exchanges by unique participant pairs
             groups = {}
@@ -1,2 +1,3 @@
 from .UI_Coupling import *
+from .UI_ExchangeIndex import UI_ExchangeIndex
 from .UI_UserInput import UI_UserInput
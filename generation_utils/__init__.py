@@ -1,8 +1,49 @@
-from .structure_handler import StructureHandler
-from .logger import Logger
-from .adapter_config_generator import AdapterConfigGenerator
-from .format_precice_config import PrettyPrinter
-from .other_files_generator import OtherFilesGenerator
-from .config_generator import ConfigGenerator
-from .readme_generator import ReadmeGenerator
-from .file_generator import FileGenerator
+import importlib
+
+# The exported names are imported on first use (PEP 562), so that importing one module of the package does not load
+# the dependencies of all the others (lxml, jsonschema, PyYAML, ...)
+_EXPORTS = {
+    "StructureHandler": "structure_handler",
+    "InMemoryStructureHandler": "structure_handler",
+    "Logger": "logger",
+    "Profiler": "profiler",
+    "TopologyDocument": "topology_document",
+    "topology_errors": "topology_validator",
+    "Template": "template_registry",
+    "TemplateRegistry": "template_registry",
+    "AdapterConfigGenerator": "adapter_config_generator",
+    "PrettyPrinter": "format_precice_config",
+    "PreciceConfigEmitter": "precice_config_emitter",
+    "OtherFilesGenerator": "other_files_generator",
+    "ConfigGenerator": "config_generator",
+    "ReadmeGenerator": "readme_generator",
+    "GenerationCache": "generation_cache",
+    "FileGenerator": "file_generator",
+    "BatchGenerator": "batch_generator",
+    "GenerationServer": "generation_server",
+    "InMemoryCase": "in_memory_generator",
+    "generate_in_memory": "in_memory_generator",
+    "ArchiveStructureHandler": "archive_writer",
+    "write_archive": "archive_writer",
+    "TopologyWatcher": "topology_watcher",
+    "CasePlan": "case_planner",
+    "plan_case": "case_planner",
+    "SweepGenerator": "sweep_generator",
+    "dump_topology": "topology_formats",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """Imports the module of an exported name when the name is used for the first time."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
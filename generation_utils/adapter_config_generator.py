@@ -1,26 +1,27 @@
 from pathlib import Path
 from generation_utils.logger import Logger
-from lxml import etree
+from generation_utils.template_registry import TEMPLATES
+import copy
 import json
-import yaml
+
 
 class AdapterConfigGenerator:
-    def __init__(self, adapter_config_path: Path, precice_config_path: Path, topology_path: Path, target_participant: str) -> None:
+    def __init__(self, adapter_config_path: Path, config_ir, target_participant: str, structure=None) -> None:
         """
-        Initializes the AdapterConfigGenerator with paths to the adapter config, precice config, and topology file.
+        Initializes the AdapterConfigGenerator with the path to the adapter config and the intermediate representation of the case.
 
         Args:
             adapter_config_path (Path): Path to the output adapter-config.json file.
-            precice_config_path (Path): Path to the input precice-config.xml file.
-            topology_path (Path): Path to the topology YAML file.
+            config_ir (ConfigIR): The intermediate representation created from the topology.
             target_participant (str): Name of the target participant.
+            structure (StructureHandler): Optional structure handler through which the file is written.
         """
         self.adapter_config_path = adapter_config_path
-        self.adapter_config_schema_path = Path(__file__).parent.parent / "templates" / "adapter-config-template.json"
+        self.adapter_config_schema_path = TEMPLATES.template_dir / "adapter-config-template.json"
         self.logger = Logger()
-        self.precice_config_path = precice_config_path
-        self.topology_path = topology_path
+        self.config_ir = config_ir
         self.target_participant = target_participant
+        self.structure = structure
 
         # Load the JSON template into a dictionary during initialization
         self.adapter_config_schema = self._load_adapter_schema()
@@ -33,8 +34,8 @@ class AdapterConfigGenerator:
             dict: The adapter configuration schema as a dictionary.
         """
         try:
-            with open(self.adapter_config_schema_path, 'r', encoding='utf-8') as adapter_config_template_file:
-                adapter_config_schema = json.load(adapter_config_template_file)
+            # The template is parsed once per process, every generator works on its own copy
+            adapter_config_schema = copy.deepcopy(TEMPLATES.json(self.adapter_config_schema_path.name))
             self.logger.info("Retrieved adapter-config template successfully.")
             return adapter_config_schema
         
@@ -47,83 +48,51 @@ class AdapterConfigGenerator:
 
     def _get_generated_precice_config(self):
         """
-        Parses the precice-config.xml file, removes namespaces, and stores the root element.
+        Takes the intermediate representation of the generated case.
         """
-        try:
-            with open(self.precice_config_path, 'r', encoding='utf-8') as precice_config_file:
-                precice_config = precice_config_file.read()
-        except FileNotFoundError:
-            self.logger.error(f"PreCICE config file not found at {self.precice_config_path}")
-            raise
-
-        # Parse with lxml and clean namespaces
-        parser = etree.XMLParser(ns_clean=True, recover=True)
-        try:
-            doc = etree.fromstring(precice_config.encode('utf-8'), parser=parser)
-        except etree.XMLSyntaxError as e:
-            self.logger.error(f"Error parsing XML: {e}")
-            raise
-
-        # Strip namespace prefixes from tags
-        for elem in doc.iter():
-            if isinstance(elem.tag, str) and '}' in elem.tag:
-                elem.tag = elem.tag.split('}', 1)[1]
+        if self.config_ir is None:
+            self.logger.error("No generated preCICE configuration available.")
+            raise ValueError("No generated preCICE configuration available.")
 
-        self.root = doc
-        self.logger.info("Parsed precice-config.xml successfully.")
+        self.logger.info("Retrieved generated precice-config successfully.")
 
-    def _load_topology(self):
+    def _load_topology(self, participant):
         """
-        Loads the topology YAML file and extracts patch information for the target participant.
+        Extracts patch information for the target participant from its coupling interface.
 
         Returns:
             dict: Patch information for the target participant.
         """
-        try:
-            with open(self.topology_path, 'r', encoding='utf-8') as topology_file:
-                topology = yaml.safe_load(topology_file)
-            
-            # Find the exchange for the target participant
-            for exchange in topology.get('exchanges', []):
-                if exchange.get('to') == self.target_participant:
-                    return {
-                        'from_participant': exchange.get('from'),
-                        'from_patch': exchange.get('from-patch'),
-                        'to_patch': exchange.get('to-patch')
-                    }
-            
-            self.logger.warning(f"No exchange found for participant {self.target_participant}")
-            return None
-        
-        except FileNotFoundError:
-            self.logger.error(f"Topology file not found at {self.topology_path}")
-            return None
-        except yaml.YAMLError as e:
-            self.logger.error(f"Error parsing topology YAML: {e}")
-            return None
+        # The interface is the first exchange that the target participant receives
+        interface = participant.interface if participant is not None else None
+        if interface is not None:
+            return {
+                'from_participant': interface.from_participant,
+                'from_patch': interface.from_patch,
+                'to_patch': interface.to_patch
+            }
+
+        self.logger.warning(f"No exchange found for participant {self.target_participant}")
+        return None
 
     def _fill_out_adapter_schema(self):
         """
-        Fills out the adapter configuration schema based on the precice-config.xml and topology data.
+        Fills out the adapter configuration schema based on the intermediate representation of the case.
         """
         self._get_generated_precice_config()
 
-        # Load topology information
-        topology_info = self._load_topology()
+        participant = self.config_ir.get_participant(self.target_participant)
 
-        participant_elem = None
-        for participant in self.root.findall(".//participant"):
-            if participant.get("name") == self.target_participant:
-                participant_elem = participant
-                break
+        # Load topology information
+        topology_info = self._load_topology(participant)
 
-        if participant_elem is None:
+        if participant is None:
             self.logger.error(f"Participant '{self.target_participant}' not found in precice-config.xml.")
             return
 
         # Attempt to find read-data and write-data elements
-        read_data_elem = participant_elem.find("read-data")
-        write_data_elem = participant_elem.find("write-data")
+        read_data_elem = participant.read_data[0] if participant.read_data else None
+        write_data_elem = participant.write_data[0] if participant.write_data else None
 
         # Log warnings if certain elements are missing
         if read_data_elem is None:
@@ -143,14 +112,14 @@ class AdapterConfigGenerator:
 
         # If read_data_elem exists, set mesh_name and read_data_names
         if read_data_elem is not None:
-            interface_dict["mesh_name"] = read_data_elem.get("mesh")
-            read_data_name = read_data_elem.get("name")
+            interface_dict["mesh_name"] = read_data_elem.mesh
+            read_data_name = read_data_elem.name
             if read_data_name:
                 interface_dict["read_data_names"].append(read_data_name)
 
         # If write_data_elem exists, set write_data_names
         if write_data_elem is not None:
-            write_data_name = write_data_elem.get("name")
+            write_data_name = write_data_elem.name
             if write_data_name:
                 interface_dict["write_data_names"].append(write_data_name)
 
@@ -181,8 +150,13 @@ class AdapterConfigGenerator:
         self._fill_out_adapter_schema()
 
         try:
-            with open(self.adapter_config_path, 'w', encoding='utf-8') as adapter_config_file:
-                json.dump(self.adapter_config_schema, adapter_config_file, indent=4)
+            adapter_config_content = json.dumps(self.adapter_config_schema, indent=4)
+            if self.structure is not None:
+                # Only rewritten if the content changed
+                self.structure.write_file(self.adapter_config_path, adapter_config_content, logger=self.logger)
+            else:
+                with open(self.adapter_config_path, 'w', encoding='utf-8') as adapter_config_file:
+                    adapter_config_file.write(adapter_config_content)
             self.logger.success(f"Adapter configuration written to {self.adapter_config_path}")
         except IOError as e:
             self.logger.error(f"Failed to write adapter configuration to file: {e}")
@@ -0,0 +1,173 @@
+from pathlib import Path, PurePosixPath
+import io
+import os
+import sys
+import time
+import uuid
+
+from .structure_handler import InMemoryStructureHandler
+
+ARCHIVE_FORMATS = ("tar", "tar.gz", "tar.zst", "zip")
+# Files of the case that are started by the user
+EXECUTABLE_FILES = ("clean.sh", "run.sh")
+
+
+def archive_format_for(target) -> str:
+    """ Derives the archive format from the file name of the target.
+        :param target: Path of the archive, "-" for stdout
+        :return: One of ARCHIVE_FORMATS, plain tar if the name does not tell"""
+    name = str(target).lower()
+    if name.endswith((".tar.gz", ".tgz")):
+        return "tar.gz"
+    if name.endswith((".tar.zst", ".tzst")):
+        return "tar.zst"
+    if name.endswith(".zip"):
+        return "zip"
+    return "tar"
+
+
+def _file_mode(relative_path: str) -> int:
+    """The permissions of a file in the archive, the scripts of the case are executable."""
+    return 0o755 if PurePosixPath(relative_path).name in EXECUTABLE_FILES else 0o644
+
+
+def _folders(relative_paths: list[str]) -> list[str]:
+    """All folders that contain the given files, parents before their children."""
+    folders = set()
+    for relative_path in relative_paths:
+        folders.update(parent.as_posix() for parent in PurePosixPath(relative_path).parents
+                       if parent != PurePosixPath("."))
+    return sorted(folders)
+
+
+def _import_zstandard():
+    """Imports the optional zstandard package, which is only needed for tar.zst archives."""
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("Writing tar.zst archives requires the zstandard package (pip install zstandard)")
+    return zstandard
+
+
+def _write_tar(files: dict[str, bytes], stream, mtime: int) -> None:
+    """Writes the files as an uncompressed tar stream, without seeking."""
+    import tarfile # only loaded when an archive is written, it slows down the start of the CLI
+    with tarfile.open(fileobj=stream, mode="w|", format=tarfile.PAX_FORMAT) as archive:
+        for folder in _folders(list(files)):
+            folder_info = tarfile.TarInfo(folder)
+            folder_info.type = tarfile.DIRTYPE
+            folder_info.mode = 0o755
+            folder_info.mtime = mtime
+            archive.addfile(folder_info)
+        for relative_path, content in files.items():
+            file_info = tarfile.TarInfo(relative_path)
+            file_info.size = len(content)
+            file_info.mode = _file_mode(relative_path)
+            file_info.mtime = mtime
+            archive.addfile(file_info, io.BytesIO(content))
+
+
+def _write_zip(files: dict[str, bytes], stream, mtime: int) -> None:
+    """Writes the files as a zip archive. Works on streams that cannot seek, e.g. a pipe."""
+    import zipfile
+    date_time = time.localtime(max(mtime, 315532800))[:6] # zip cannot store dates before 1980
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for folder in _folders(list(files)):
+            folder_info = zipfile.ZipInfo(folder + "/", date_time=date_time)
+            folder_info.external_attr = (0o40755 << 16) | 0x10
+            archive.writestr(folder_info, b"")
+        for relative_path, content in files.items():
+            file_info = zipfile.ZipInfo(relative_path, date_time=date_time)
+            file_info.compress_type = zipfile.ZIP_DEFLATED
+            file_info.external_attr = (0o100000 | _file_mode(relative_path)) << 16
+            archive.writestr(file_info, content)
+
+
+def write_archive(files: dict[str, bytes], target, archive_format: str = None, prefix: str = "_generated",
+                  mtime: int = None) -> None:
+    """ Streams generated files into a tar (optionally compressed with gzip or zstd) or zip archive.
+        The members are sorted by path, folders come first. clean.sh and run.sh are executable.
+        :param files: The content of every file by its path relative to the _generated dir
+        :param target: Path of the archive, "-" for stdout, or a writable binary stream
+        :param archive_format: One of ARCHIVE_FORMATS, derived from the name of the target if not given
+        :param prefix: Folder in the archive that contains the files
+        :param mtime: Modification time of all members, defaults to now"""
+    if archive_format is None:
+        archive_format = archive_format_for(target) if isinstance(target, (str, Path)) else "tar"
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ValueError(f"Unknown archive format {archive_format}, expected one of {', '.join(ARCHIVE_FORMATS)}")
+    if archive_format == "tar.zst":
+        # Checked before the target is opened, so that a missing package leaves no empty archive behind
+        _import_zstandard()
+    mtime = int(time.time()) if mtime is None else int(mtime)
+    members = {(f"{prefix}/{relative_path}" if prefix else relative_path): files[relative_path]
+               for relative_path in sorted(files)}
+
+    if isinstance(target, (str, Path)) and str(target) != "-":
+        _write_archive_file(members, Path(target), archive_format, mtime)
+    else:
+        stream = sys.stdout.buffer if isinstance(target, (str, Path)) else target
+        _write_archive_stream(members, stream, archive_format, mtime)
+        stream.flush()
+
+
+def _write_archive_file(members: dict[str, bytes], target: Path, archive_format: str, mtime: int) -> None:
+    """ Writes the archive to a file. A regular file is written next to the target and renamed over it, so a write that
+        fails leaves neither a truncated archive nor a half written one behind. Anything else, e.g. a named pipe or a
+        device, is written directly."""
+    if target.exists() and not target.is_file():
+        with open(target, "wb") as archive_file:
+            _write_archive_stream(members, archive_file, archive_format, mtime)
+        return
+    temporary_target = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(temporary_target, "wb") as archive_file:
+            _write_archive_stream(members, archive_file, archive_format, mtime)
+        os.replace(temporary_target, target)
+    finally:
+        if temporary_target.exists():
+            temporary_target.unlink()
+
+
+def _write_archive_stream(members: dict[str, bytes], stream, archive_format: str, mtime: int) -> None:
+    """Writes the archive to an open binary stream, through the compressor of the format."""
+    if archive_format == "zip":
+        _write_zip(members, stream, mtime)
+    elif archive_format == "tar.gz":
+        import gzip
+        with gzip.GzipFile(fileobj=stream, mode="wb", compresslevel=6, mtime=mtime) as compressed_stream:
+            _write_tar(members, compressed_stream, mtime)
+    elif archive_format == "tar.zst":
+        with _import_zstandard().ZstdCompressor().stream_writer(stream, closefd=False) as compressed_stream:
+            _write_tar(members, compressed_stream, mtime)
+    else:
+        _write_tar(members, stream, mtime)
+
+
+class ArchiveStructureHandler(InMemoryStructureHandler):
+    def __init__(self, target, archive_format: str = None) -> None:
+        """ A structure that streams the generated case into an archive instead of a _generated dir.
+            The files are collected in memory and the archive is written by finalize(), no folder is created.
+            discard() drops the collected files, nothing is written.
+            :param target: Path of the archive, "-" for stdout, or a writable binary stream
+            :param archive_format: One of ARCHIVE_FORMATS, derived from the name of the target if not given"""
+        self.target = target
+        self.archive_format = archive_format
+        super().__init__(Path("<archive>"))
+
+    @property
+    def location(self) -> str:
+        """Where the generated files end up, for messages."""
+        if not isinstance(self.target, (str, Path)):
+            return "stream"
+        return "stdout" if str(self.target) == "-" else str(self.target)
+
+    def finalize(self) -> None:
+        """ Writes the archive. Has to be called after all files were written.
+            A generation that logged errors is discarded instead (see FileGenerator.finish), so it never produces an
+            archive. A failed write is logged as error, which makes the command-line interface exit non-zero."""
+        try:
+            write_archive(self.get_files(), self.target, self.archive_format)
+            self.logger.success(f"Written archive: {self.location}")
+        except (OSError, RuntimeError, ValueError) as archive_exception:
+            self.logger.error(f"Failed to write archive {self.location}. Error: {archive_exception}")
@@ -0,0 +1,182 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import glob
+import os
+import time
+import traceback
+
+from .logger import Logger
+
+# File names of the topologies that are searched in the input directories
+TOPOLOGY_FILE_NAMES = ("topology.yaml", "topology.json", "topology.cbor")
+
+
+def find_topologies(inputs: list) -> list[Path]:
+    """ Resolves the batch inputs into a sorted list of topology files.
+        :param inputs: Directories (searched recursively for topology.yaml, .json and .cbor), glob patterns or
+            topology files
+        :return: Sorted list of unique topology files"""
+    topologies = set()
+    for entry in inputs:
+        entry_path = Path(entry)
+        if entry_path.is_dir():
+            for file_name in TOPOLOGY_FILE_NAMES:
+                topologies.update(entry_path.rglob(file_name))
+        elif entry_path.is_file():
+            topologies.add(entry_path)
+        else:
+            topologies.update(Path(match) for match in glob.glob(str(entry), recursive=True)
+                              if Path(match).is_file())
+    return sorted(topology.resolve() for topology in topologies)
+
+
+def generate_case(topology_file: Path, output_root: Path, validate_topology: bool = True, topology=None,
+                  clean_generated: bool = False, use_cache: bool = True) -> dict:
+    """ Runs the complete generation for one topology. Executed inside the worker processes.
+        :param topology_file: The topology.yaml of the case
+        :param output_root: Folder in which the _generated/ folder of the case is placed
+        :param validate_topology: Whether to validate the topology against the preCICE topology schema first. An
+            invalid topology is reported with all its errors and is not generated
+        :param topology: Already loaded TopologyDocument, if given topology_file is not read
+        :param clean_generated: Remove the _generated/ folder first instead of only rewriting changed files
+        :param use_cache: Restore the case from the cache of generated cases if it was generated before
+        :return: A picklable summary of the case"""
+    # Imported here so that the heavy imports are paid once per worker process and not by the parent
+    from .file_generator import FileGenerator
+    from .generation_cache import GenerationCache
+    from .topology_document import TopologyDocument
+    from .topology_validator import topology_errors
+
+    start = time.perf_counter()
+    result = {
+        "input": str(topology_file),
+        "output": str(Path(output_root) / "_generated"),
+        "errors": [],
+        "warnings": [],
+        "validation": None,
+        "paths": [],
+    }
+    try:
+        if topology is None:
+            topology = TopologyDocument.from_file(Path(topology_file))
+        # A topology that cannot be read is never generated, an invalid one is rejected with all its errors
+        if topology.error is not None:
+            result["errors"].append(topology.error)
+        elif validate_topology:
+            validation_errors = topology_errors(topology.data)
+            if validation_errors:
+                result["validation"] = "\n".join(validation_errors)
+        if not result["errors"] and result["validation"] is None:
+            file_generator = FileGenerator(Path(topology_file), Path(output_root), topology=topology,
+                                           clean_generated=clean_generated,
+                                           cache=GenerationCache() if use_cache else None)
+            file_generator.logger.clear_log_state()
+            # Only files that were moved into place are reported, a failed generation created none
+            if file_generator.generate():
+                result["paths"] = [str(path) for path in file_generator.structure.created_files]
+            result["errors"].extend(file_generator.logger.get_errors())
+            result["warnings"].extend(file_generator.logger.get_warnings())
+    except Exception as generation_exception:
+        result["errors"].append(f"{type(generation_exception).__name__}: {generation_exception}")
+        result["traceback"] = traceback.format_exc()
+
+    # A case that does not match the topology schema is reported as invalid and is not generated
+    if result["errors"]:
+        result["status"] = "error"
+    elif result["validation"] is not None:
+        result["status"] = "invalid"
+    else:
+        result["status"] = "success"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+class BatchGenerator:
+    def __init__(self, topology_files: list[Path], output_path: Path = None, workers: int = None,
+                 validate_topology: bool = True, clean_generated: bool = False, use_cache: bool = True) -> None:
+        """ Generates many topologies in one process pool.
+            :param topology_files: The topology.yaml files to generate
+            :param output_path: Root for the outputs. Every case is placed at its path relative to the common
+                folder of all inputs. If None, every case is generated next to its topology.yaml
+            :param workers: Number of worker processes, defaults to the number of CPUs
+            :param validate_topology: Whether to validate every topology against the preCICE topology schema
+            :param clean_generated: Remove the _generated/ folder of every case before generating it
+            :param use_cache: Restore cases that were generated before from the cache of generated cases"""
+        self.topology_files = [Path(topology_file) for topology_file in topology_files]
+        self.output_path = output_path
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.validate_topology = validate_topology
+        self.clean_generated = clean_generated
+        self.use_cache = use_cache
+        self.logger = Logger()
+        parents = [str(topology_file.parent) for topology_file in self.topology_files]
+        self.common_root = Path(os.path.commonpath(parents)) if parents else None
+
+    def output_root_for(self, topology_file: Path) -> Path:
+        """ Returns the folder in which the _generated/ folder of a case is placed."""
+        if self.output_path is None:
+            return topology_file.parent
+        return Path(self.output_path) / topology_file.parent.relative_to(self.common_root)
+
+    def shared_output_roots(self) -> dict[Path, list[Path]]:
+        """ Finds topologies that would be generated into the same _generated/ folder, e.g. a topology.yaml and a
+            topology.json in the same directory. They would overwrite each other and race for the folder.
+            :return: The topologies of every output root that is shared by more than one topology"""
+        topologies_by_root = {}
+        for topology_file in self.topology_files:
+            output_root = Path(os.path.abspath(self.output_root_for(topology_file)))
+            topologies_by_root.setdefault(output_root, []).append(topology_file)
+        return {output_root: topology_files for output_root, topology_files in topologies_by_root.items()
+                if len(topology_files) > 1}
+
+    def run(self) -> list[dict]:
+        """ Generates all cases and returns the case summaries in input order.
+            Topologies that share their output root are all rejected with an error and none of them is generated."""
+        results = {}
+        for output_root, topology_files in self.shared_output_roots().items():
+            for topology_file in topology_files:
+                others = ", ".join(str(other) for other in topology_files if other != topology_file)
+                results[topology_file] = {
+                    "input": str(topology_file), "output": str(output_root / "_generated"),
+                    "errors": [f"Shares the output folder {output_root / '_generated'} with {others}"],
+                    "warnings": [], "validation": None, "paths": [], "status": "error", "seconds": 0.0}
+
+        jobs = [(topology_file, self.output_root_for(topology_file), self.validate_topology, None,
+                 self.clean_generated, self.use_cache)
+                for topology_file in self.topology_files if topology_file not in results]
+        if self.workers <= 1 or len(jobs) <= 1:
+            results.update((job[0], generate_case(*job)) for job in jobs)
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs))) as executor:
+                futures = [(job[0], executor.submit(generate_case, *job)) for job in jobs]
+                results.update((topology_file, future.result()) for topology_file, future in futures)
+        return [results[topology_file] for topology_file in self.topology_files]
+
+    def print_summary(self, results: list[dict], verbose: bool = False) -> None:
+        """ Prints the per-case timings and the aggregated success/error summary."""
+        name_width = max([len(result["input"]) for result in results] + [len("Topology")])
+        print(f"{'Topology':<{name_width}}  {'Status':<7}  {'Time [s]':>9}")
+        for result in results:
+            print(f"{result['input']:<{name_width}}  {result['status']:<7}  {result['seconds']:>9.3f}")
+
+        for result in results:
+            for error in result["errors"]:
+                self.logger.error(f"{result['input']}: {error}")
+            if result["validation"] is not None:
+                validation_errors = "".join(f"\n  - {line}" for line in result["validation"].splitlines())
+                self.logger.error(f"Validation of {result['input']} failed:{validation_errors}")
+            if verbose:
+                for warning in result["warnings"]:
+                    self.logger.warning(f"{result['input']}: {warning}")
+
+        failed = [result for result in results if result["status"] == "error"]
+        invalid = [result for result in results if result["status"] == "invalid"]
+        total_time = sum(result["seconds"] for result in results)
+        summary = (f"{len(results) - len(failed) - len(invalid)} of {len(results)} cases generated successfully, "
+                   f"{len(invalid)} rejected by the schema validation, {len(failed)} failed "
+                   f"(total case time {total_time:.3f} s, {self.workers} workers)")
+        if failed or invalid:
+            self.logger.error(summary)
+        else:
+            self.logger.success(summary)
+        self.logger.print_all()
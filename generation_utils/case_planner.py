@@ -0,0 +1,188 @@
+from pathlib import Path
+import hashlib
+import json
+
+from .format_precice_config import PrettyPrinter
+from .in_memory_generator import InMemoryCase, generate_in_memory
+from .structure_handler import StructureHandler
+
+# Sections of precice-config.xml that are compared element by element, in the order in which they are reported
+CONFIG_SECTIONS = ("data", "meshes", "participants", "mappings", "m2n", "coupling-scheme", "exchanges",
+                   "acceleration")
+
+
+def _describe(element, skip: tuple = ()) -> str:
+    """ A canonical one-line description of an element with its attributes and children, independent of the layout
+        and of the order of the attributes.
+        :param skip: Tags of children that are left out"""
+    attributes = " ".join(f'{name}="{value}"' for name, value in sorted(element.attrib.items()))
+    children = [_describe(child) for child in element if isinstance(child.tag, str) and child.tag not in skip]
+    description = f"<{element.tag}{' ' + attributes if attributes else ''}"
+    return description + (" " + " ".join(children) + ">" if children else "/>")
+
+
+def config_elements(content: bytes) -> dict[str, dict[str, str]]:
+    """ Splits a preCICE configuration into the elements that are compared by a plan.
+        :param content: The content of a precice-config.xml, None if there is none
+        :return: For every section of CONFIG_SECTIONS, the description of every element by its key, e.g. the
+            participant name or "Force on Solid-Mesh: Fluid -> Solid" for an exchange"""
+    sections = {section: {} for section in CONFIG_SECTIONS}
+    if not content:
+        return sections
+    for element in PrettyPrinter.parse_xml(content).getroot():
+        if not isinstance(element.tag, str):
+            continue # comments
+        tag = element.tag
+        if tag.startswith("data:"):
+            sections["data"][element.get("name")] = _describe(element)
+        elif tag == "mesh":
+            sections["meshes"][element.get("name")] = _describe(element)
+        elif tag == "participant":
+            name = element.get("name")
+            sections["participants"][name] = _describe(element, skip=tuple(
+                child.tag for child in element if isinstance(child.tag, str) and child.tag.startswith("mapping:")))
+            for mapping in element:
+                if isinstance(mapping.tag, str) and mapping.tag.startswith("mapping:"):
+                    key = f"{name}: {mapping.get('direction')} {mapping.get('from')} -> {mapping.get('to')}"
+                    sections["mappings"][key] = _describe(mapping)
+        elif tag.startswith("m2n:"):
+            sections["m2n"][f"{element.get('acceptor')} - {element.get('connector')}"] = _describe(element)
+        elif tag.startswith("coupling-scheme:"):
+            # There is one coupling scheme and one acceleration, a change of their type is a modification
+            sections["coupling-scheme"]["coupling-scheme"] = _describe(element, skip=tuple(
+                child.tag for child in element if isinstance(child.tag, str) and
+                (child.tag == "exchange" or child.tag.startswith("acceleration:"))))
+            for child in element:
+                if child.tag == "exchange":
+                    key = f"{child.get('data')} on {child.get('mesh')}: {child.get('from')} -> {child.get('to')}"
+                    sections["exchanges"][key] = _describe(child)
+                elif isinstance(child.tag, str) and child.tag.startswith("acceleration:"):
+                    sections["acceleration"]["acceleration"] = _describe(child)
+    return sections
+
+
+def diff_config(old_content: bytes, new_content: bytes) -> dict[str, dict]:
+    """ Compares two preCICE configurations element by element.
+        :return: For every section with changes, the keys of the "added" and "removed" elements and the
+            (key, old description, new description) of the "modified" ones"""
+    old_sections, new_sections = config_elements(old_content), config_elements(new_content)
+    changes = {}
+    for section in CONFIG_SECTIONS:
+        old, new = old_sections[section], new_sections[section]
+        section_changes = {
+            "added": [key for key in new if key not in old],
+            "removed": [key for key in old if key not in new],
+            "modified": [(key, old[key], new[key]) for key in new if key in old and old[key] != new[key]],
+        }
+        if any(section_changes.values()):
+            changes[section] = section_changes
+    return changes
+
+
+class CasePlan:
+    def __init__(self, case: InMemoryCase, previous_files: dict[str, bytes], removable: set, baseline: str,
+                 errors: list[str] = None) -> None:
+        """ What a generation would change, computed in memory without touching the output.
+            :param case: The case generated in memory from the new topology
+            :param previous_files: The content of the files it is compared with, by their path relative to the
+                _generated dir
+            :param removable: The previous files that a generation removes if they are no longer generated. The
+                others were added or modified by hand and are kept
+            :param baseline: Description of what the case is compared with, for the report
+            :param errors: Problems of the new or the older topology, nothing is compared if there are any"""
+        self.case = case
+        self.baseline = baseline
+        self.errors = errors if errors is not None else case.errors
+        if self.errors:
+            previous_files, removable = {}, set()
+        files = case.files if not self.errors else {}
+        self.added = [path for path in files if path not in previous_files]
+        self.modified = [path for path in files if path in previous_files and files[path] != previous_files[path]]
+        self.unchanged = [path for path in files if path in previous_files and files[path] == previous_files[path]]
+        stale = sorted(path for path in previous_files if path not in files)
+        self.removed = [path for path in stale if path in removable]
+        self.kept = [path for path in stale if path not in removable]
+        self.config_changes = {}
+        if "precice-config.xml" in self.added or "precice-config.xml" in self.modified:
+            self.config_changes = diff_config(previous_files.get("precice-config.xml"),
+                                              files.get("precice-config.xml"))
+
+    @property
+    def has_changes(self) -> bool:
+        """True if a generation would write or remove any file."""
+        return bool(self.added or self.modified or self.removed)
+
+    def print_report(self, verbose: bool = False) -> None:
+        """ Prints the changed files and the changed elements of precice-config.xml.
+            :param verbose: Also print the unchanged files and the old and new description of modified elements"""
+        print(f"Plan against {self.baseline}:")
+        if self.errors:
+            print("  Nothing can be compared, the generation failed:")
+            for error in self.errors:
+                print(f"  - {error}")
+            return
+        for warning in self.case.warnings:
+            print(f"  warning: {warning}")
+        if not self.has_changes:
+            print("  No changes, all generated files are up to date.")
+        for marker, paths in (("+", self.added), ("-", self.removed), ("~", self.modified)):
+            for path in paths:
+                print(f"  {marker} {path}")
+        for path in self.kept:
+            print(f"  = {path} (no longer generated, kept because it was added or modified by hand)")
+        if verbose:
+            for path in self.unchanged:
+                print(f"    {path}")
+        print(f"  {len(self.added)} added, {len(self.removed)} removed, {len(self.modified)} modified, "
+              f"{len(self.unchanged)} unchanged")
+
+        if self.config_changes:
+            print("Changes of precice-config.xml:")
+        for section, changes in self.config_changes.items():
+            print(f"  {section}:")
+            for key in changes["added"]:
+                print(f"    + {key}")
+            for key in changes["removed"]:
+                print(f"    - {key}")
+            for key, old, new in changes["modified"]:
+                print(f"    ~ {key}")
+                if verbose:
+                    print(f"        before: {old}")
+                    print(f"        after:  {new}")
+
+
+def read_generated_files(generated_root: Path) -> tuple[dict[str, bytes], set]:
+    """ Reads the files of an existing _generated dir.
+        :return: The content of every file by its relative path and the files that a generation may remove: those
+            that are recorded in the manifest and were not modified since they were generated"""
+    files = {}
+    if generated_root.is_dir():
+        for path in sorted(generated_root.rglob("*")):
+            if path.is_file() and path.name != StructureHandler.MANIFEST_NAME:
+                files[path.relative_to(generated_root).as_posix()] = path.read_bytes()
+    try:
+        with open(generated_root / StructureHandler.MANIFEST_NAME, "r", encoding="utf-8") as manifest_file:
+            generated_hashes = dict(json.load(manifest_file)["files"])
+    except (OSError, ValueError, KeyError, TypeError):
+        generated_hashes = {}
+    removable = {path for path, content in files.items()
+                 if generated_hashes.get(path) == hashlib.sha256(content).hexdigest()}
+    return files, removable
+
+
+def plan_case(topology, output_path: Path = None, previous_topology=None, validate_topology: bool = True) -> CasePlan:
+    """ Generates a topology in memory and compares it with the _generated dir of an output path or with the case of
+        an older topology. Nothing is written.
+        :param topology: The new topology, anything generate_in_memory accepts
+        :param output_path: Folder containing the _generated dir to compare with
+        :param previous_topology: Older topology to compare with instead of an output path
+        :param validate_topology: Whether to validate the topologies against the preCICE topology schema
+        :return: The plan. If the new or the older case has errors, they are reported instead of changes"""
+    case = generate_in_memory(topology, validate_topology=validate_topology)
+    if previous_topology is not None:
+        previous_case = generate_in_memory(previous_topology, validate_topology=validate_topology)
+        errors = case.errors + [f"older topology: {error}" for error in previous_case.errors]
+        return CasePlan(case, previous_case.files, set(previous_case.files), "the older topology", errors)
+    generated_root = Path(output_path) / "_generated"
+    previous_files, removable = read_generated_files(generated_root)
+    return CasePlan(case, previous_files, removable, str(generated_root))
@@ -1,79 +1,240 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-import json
-import jsonschema
-import yaml
-
 from controller_utils.myutils.UT_PCErrorLogging import UT_PCErrorLogging
 from controller_utils.precice_struct import PS_PreCICEConfig
 from controller_utils.ui_struct.UI_UserInput import UI_UserInput
 from .config_generator import ConfigGenerator
-from .format_precice_config import PrettyPrinter
+from .generation_cache import GenerationCache
+from .precice_config_emitter import PreciceConfigEmitter
 from .logger import Logger
 from .other_files_generator import OtherFilesGenerator
+from .profiler import Profiler
 from .readme_generator import ReadmeGenerator
 from .structure_handler import StructureHandler
+from .topology_document import TopologyDocument
 
 
 class FileGenerator:
-    def __init__(self, input_file: Path, output_path: Path) -> None:
+    def __init__(self, input_file: Path, output_path: Path, topology: TopologyDocument = None,
+                 clean_generated: bool = False, cache: GenerationCache = None, jobs: int = None,
+                 profiler: Profiler = None, structure: StructureHandler = None,
+                 previous_inputs: dict = None) -> None:
         """ Class which takes care of generating the content of the necessary files
             :param input_file: Input yaml file that is needed for generation of the precice-config.xml file
-            :param output_path: Path to the folder where the _generated/ folder will be placed"""
+            :param output_path: Path to the folder where the _generated/ folder will be placed
+            :param topology: Already loaded topology document. If given, input_file is not read
+            :param clean_generated: Remove the _generated/ folder before generating instead of only rewriting the
+                files whose content changed
+            :param cache: Optional cache of generated cases. On a hit the files are restored from the cache instead
+                of being generated
+            :param jobs: Number of threads generating the files of the participants, defaults to the
+                ThreadPoolExecutor default. 1 generates the participants one after another
+            :param profiler: Optional profiler recording the time spent in every stage
+            :param structure: Optional structure handler receiving the generated files, e.g. an
+                InMemoryStructureHandler. If given, output_path and clean_generated are not used
+            :param previous_inputs: The file_inputs of a previous generation into the same output path. Files
+                whose inputs did not change since then are taken over instead of being generated again"""
         self.input_file = input_file
+        self.profiler = profiler if profiler is not None else Profiler(enabled=False)
+        # In-memory preCICE configuration, filled by generate_level_0 and written once by format_precice_config
+        self.precice_config_tree = None
+        # Intermediate representation of the case, created with the configuration and read by all emitters
+        self.config_ir = None
+        # The topology is read and parsed once here and shared by all generation stages
+        if topology is None:
+            with self.profiler.span("load topology"):
+                topology = TopologyDocument.from_file(input_file)
+        self.topology = topology
         self.precice_config = PS_PreCICEConfig()
         self.mylog = UT_PCErrorLogging()
         self.user_ui = UI_UserInput()
         self.logger = Logger()
-        self.structure = StructureHandler(output_path)
+        if structure is None:
+            structure = StructureHandler(output_path, clean_generated=clean_generated)
+        self.structure = structure
         self.config_generator = ConfigGenerator()
         self.readme_generator = ReadmeGenerator()
-        self.other_files_generator = OtherFilesGenerator()
+        self.other_files_generator = OtherFilesGenerator(self.structure)
+        self.cache = cache
+        self.cache_key = None
+        self.jobs = jobs
+        self.previous_inputs = previous_inputs if previous_inputs is not None else {}
+        # Everything the content of a generated file depends on, by its path relative to the _generated dir
+        self.file_inputs = {}
+        self.kept_files = [] # files taken over from the previous generation because their inputs did not change
     
     
+    def generate(self) -> bool:
+        """Runs all generation stages: level 0, level 1 and the formatting of the preCICE configuration.
+            Afterwards, files of a previous generation that no longer belong to the case are removed.
+            :return: True if the generated files were moved into place, see finish()"""
+        try:
+            if not self.generate_from_cache():
+                self.generate_level_0()
+                self.generate_level_1()
+                self.format_precice_config()
+                self.store_in_cache()
+        except BaseException:
+            # Nothing of a generation that crashed is moved into place
+            self.structure.discard()
+            raise
+        return self.finish()
+
+    def has_errors(self) -> bool:
+        """Check if any stage, file writer or the structure logged an error."""
+        return (self.logger.has_errors() or self.other_files_generator.logger.has_errors()
+                or self.structure.logger.has_errors())
+
+    def finish(self) -> bool:
+        """ Moves the generated files into place. If any stage logged an error, the files are discarded instead and
+            the previous _generated dir is left as it is, a failed generation never replaces a complete one.
+            :return: True if the generated files were moved into place without errors"""
+        if self.has_errors():
+            self.structure.discard()
+            self.logger.info(f"Discarded the generated files, {self.structure.location} was not changed")
+            return False
+        self.structure.finalize()
+        return not self.has_errors()
+
+    def generate_from_cache(self) -> bool:
+        """ Restores the generated files from the cache, skipping all generation stages.
+            :return: True if the case was found in the cache"""
+        if self.cache is None or not self.topology.is_loaded:
+            return False
+        if self.topology.error is not None or not self.topology.is_utf8_encoded:
+            # The key only covers the parsed data, a hit must not hide a problem of the document itself
+            return False
+        with self.profiler.span("cache lookup"):
+            self.cache_key = self.cache.key_for(self.topology.data)
+            cached_case = self.cache.lookup(self.cache_key) if self.cache_key is not None else None
+        if cached_case is None:
+            if self.cache_key is not None:
+                self.logger.info(f"Topology not found in the cache at {self.cache.cache_dir}")
+            return False
+
+        generated_root = self.structure.generated_root
+        self.structure.created_files = []
+        for relative_path, content in cached_case["files"].items():
+            target = generated_root / relative_path
+            self.structure.make_folder(target.parent)
+            self.structure.write_file(target, content)
+            self.structure.created_files.append(target)
+        # Replay the warnings of the original generation
+        for warning in cached_case["warnings"]:
+            self.logger.warning(warning)
+        self.logger.success(f"Restored the generated files from cache entry {self.cache_key}")
+        return True
+
+    def store_in_cache(self) -> None:
+        """Stores the generated files in the cache, if the generation finished without errors."""
+        if self.cache is None or self.cache_key is None:
+            return
+        if self.has_errors():
+            return
+        generated_root = self.structure.generated_root
+        relative_paths = [path.relative_to(generated_root).as_posix() for path in self.structure.created_files]
+        with self.profiler.span("cache store"):
+            # The files are still in the staging dir, finalize() moves them into place
+            self.cache.store(self.cache_key, self.structure.staging_root, relative_paths, self.logger.get_warnings())
+
+    def keep_if_unchanged(self, target: Path, inputs, logger: Logger = None) -> bool:
+        """ Records the inputs of a generated file and takes the file of the previous generation over if they are
+            the same as back then.
+            :param target: The generated file, located inside the _generated dir
+            :param inputs: Comparable value of everything the content depends on, e.g. a part of the config IR.
+                None if the inputs are unknown, the file is then always generated
+            :param logger: Logger of the writer, defaults to the logger of the file generator
+            :return: True if the file was taken over and must not be generated"""
+        if inputs is None:
+            return False
+        relative_path = Path(target).relative_to(self.structure.generated_root).as_posix()
+        self.file_inputs[relative_path] = inputs
+        if relative_path not in self.previous_inputs or self.previous_inputs[relative_path] != inputs:
+            return False
+        if not self.structure.keep_previous_file(target, logger=logger if logger is not None else self.logger):
+            return False
+        self.kept_files.append(Path(target))
+        return True
+
     def generate_level_0(self) -> None:
         """Fills out the files of level 0 (everything in the root folder)."""
-        self.other_files_generator.generate_clean(clean_sh=self.structure.clean)
-        self.config_generator.generate_precice_config(self)
-        self.readme_generator.generate_readme(self)
+        with self.profiler.span("level 0"):
+            with self.profiler.span("clean.sh template"):
+                if not self.keep_if_unchanged(self.structure.clean, "template_clean.sh"):
+                    self.other_files_generator.generate_clean(clean_sh=self.structure.clean)
+            self.config_generator.generate_precice_config(self)
+            with self.profiler.span("README.md"):
+                participants = self.config_ir.participants if self.config_ir is not None else None
+                if not self.keep_if_unchanged(self.structure.README, participants):
+                    self.readme_generator.generate_readme(self)
     
     def _extract_participants(self) -> list[str]:
-        """Extracts the participants from the topology.yaml file."""
-        try:
-            with open(self.input_file, "r") as config_file:
-                config = yaml.load(config_file.read(), Loader=yaml.SafeLoader)
-                self.logger.info(f"Input YAML file: {self.input_file}")
-        except FileNotFoundError:
-            self.logger.error(f"Input YAML file {self.input_file} not found.")
-            return None
-        except Exception as e:
-            self.logger.error(f"Error reading input YAML file: {str(e)}")
-            return None
-        
+        """Extracts the participants from the already parsed topology."""
+        if not self.topology.is_loaded:
+            self.logger.error(f"No participants can be extracted from {self.input_file}.")
+            return []
+
         # Extract participant names from the new list format
-        return [participant['name'] for participant in config.get('participants', [])]
+        return self.topology.participant_names()
     
     def generate_level_1(self) -> None:
-        """Generates the files of level 1 (everything in the generated sub-folders)."""
+        """Generates the files of level 1 (everything in the generated sub-folders).
+            The participants are generated concurrently, their logs are merged in participant order."""
+        with self.profiler.span("level 1"):
+            self._generate_level_1()
 
+    def _generate_level_1(self) -> None:
         participants = self._extract_participants()
+        if self.config_ir is None:
+            # The participant files are derived from the IR, the failed configuration was already reported
+            return
+        # The folders are created up front, so that the registered files keep the participant order
+        targets = []
         for participant in participants:
             target_participant = self.structure.create_level_1_structure(participant, self.user_ui)
-            adapter_config = target_participant[1]
-            run_sh = target_participant[2]
-            self.other_files_generator.generate_adapter_config(target_participant=participant, adapter_config=adapter_config,
-                                                                precice_config=self.structure.precice_config, topology_path=self.input_file)
-            self.other_files_generator.generate_run(run_sh)
+            targets.append((participant, target_participant[1], target_participant[2]))
+
+        if self.jobs == 1 or len(targets) <= 1:
+            loggers = [self._generate_participant(*target) for target in targets]
+        else:
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                futures = [executor.submit(self._generate_participant, *target) for target in targets]
+                loggers = [future.result() for future in futures]
+
+        for participant_logger in loggers:
+            self.other_files_generator.logger.extend(participant_logger)
+
+    def _generate_participant(self, participant: str, adapter_config: Path, run_sh: Path) -> Logger:
+        """ Generates the adapter-config.json and run.sh of one participant.
+            :return: The logger with the messages of this participant"""
+        # Every participant gets its own generator, so that concurrent participants do not share a logger
+        other_files_generator = OtherFilesGenerator(self.structure)
+        logger = other_files_generator.logger
+        participant_ir = self.config_ir.get_participant(participant) if self.config_ir is not None else None
+        with self.profiler.span("adapter-config.json", participant=participant):
+            if not self.keep_if_unchanged(adapter_config, participant_ir, logger=logger):
+                other_files_generator.generate_adapter_config(target_participant=participant,
+                                                              adapter_config=adapter_config, config_ir=self.config_ir)
+        with self.profiler.span("run.sh template", participant=participant):
+            if not self.keep_if_unchanged(run_sh, "template_run.sh", logger=logger):
+                other_files_generator.generate_run(run_sh)
+        return other_files_generator.logger
 
     def format_precice_config(self) -> None:
-        """Formats the generated preCICE configuration file."""
+        """Emits the in-memory preCICE configuration formatted into the precice-config.xml file."""
         
         precice_config_path = self.structure.precice_config
-        # Create an instance of PrettyPrinter.
-        printer = PrettyPrinter(indent='    ', max_width=120)
-        # Specify the path to the XML file you want to prettify.
+        if precice_config_path in self.kept_files:
+            return
+        if self.precice_config_tree is None:
+            self.logger.error(f"No preCICE configuration was generated, nothing to write to {precice_config_path}")
+            return
         try:
-            printer.prettify_file(precice_config_path)
+            with self.profiler.span("emit precice-config.xml"):
+                emitter = PreciceConfigEmitter(indent='    ', max_width=120)
+                # The file is only rewritten if the formatted configuration changed
+                self.structure.write_file(precice_config_path, emitter.emit_to_string(self.precice_config_tree))
             self.logger.success(f"Successfully prettified preCICE configuration XML")
         except Exception as prettify_exception:
             self.logger.error("An error occurred during XML prettification: " + str(prettify_exception))
@@ -86,22 +247,23 @@ class FileGenerator:
             if not self.logger.has_errors():
                 self.logger.clear_messages()
                 # No errors, show success message
-                self.logger.success("Everything worked. You can find the generated files at: " + str(self.structure.generated_root))
+                self.logger.success("Everything worked. You can find the generated files at: " + self.structure.location)
                 # Always show warnings if any exist
                 if self.logger.has_warnings():
                     for warning in self.logger.get_warnings():
                         self.logger.warning(warning)
         self.logger.print_all()
 
-    @staticmethod
-    def validate_topology(args):
-        """Validate the topology.yaml file against the JSON schema."""
-        if args.validate_topology:
-            with open(Path(__file__).parent.parent / "schemas" / "topology-schema.json") as schema_file:
-                schema = json.load(schema_file)
-            with open(args.input_file) as input_file:
-                data = yaml.load(input_file, Loader=yaml.SafeLoader)
-            try:
-                jsonschema.validate(instance=data, schema=schema)
-            except jsonschema.exceptions.ValidationError as e:
-                print(f"Validation of {args.input_file} failed: {e}")
+    def check_topology(self) -> str:
+        """Validate the parsed topology against the JSON schema.
+            :return: None if the topology is valid, otherwise a description of all problems, one per line"""
+        if self.topology.error is not None:
+            return self.topology.error
+        # jsonschema is only loaded when a topology is validated
+        from .topology_validator import topology_errors
+
+        with self.profiler.span("schema validation"):
+            validation_errors = topology_errors(self.topology.data)
+        if validation_errors:
+            return "\n".join(validation_errors)
+        return None
@@ -1,22 +1,21 @@
 #!/usr/bin/env python3
 import io
-import shutil
 import sys
 
-from lxml import etree
-
 
 def is_empty_tag(element):
     """
     Check if an XML element is empty (has no children).
+    Works for lxml as well as xml.etree.ElementTree elements.
     """
-    return not element.getchildren()
+    return len(element) == 0
 
 def is_comment(element):
     """
     Check if the given element is an XML comment.
+    Comments (and other special nodes) have a non-string tag in lxml and xml.etree.ElementTree.
     """
-    return isinstance(element, etree._Comment)
+    return not isinstance(element.tag, str)
 
 def attrib_length(element):
     """
@@ -73,18 +72,24 @@ class PrettyPrinter:
         """
         self.stream.write(text + end)
 
+    def fmt_value(self, value):
+        """
+        Format an attribute value. Values are written as they are stored in the tree.
+        """
+        return value
+
     def fmt_attr_h(self, element):
         """
         Format element attributes for inline (horizontal) display.
         """
-        return " ".join(['{}="{}"'.format(k, v) for k, v in element.items()])
+        return " ".join(['{}="{}"'.format(k, self.fmt_value(v)) for k, v in element.items()])
 
     def fmt_attr_v(self, element, level):
         """
         Format element attributes for vertical display, with indentation.
         """
         prefix = self.indent * (level + 1)
-        return "\n".join(['{}{}="{}"'.format(prefix, k, v) for k, v in element.items()])
+        return "\n".join(['{}{}="{}"'.format(prefix, k, self.fmt_value(v)) for k, v in element.items()])
 
     def print_xml_declaration(self, root):
         """
@@ -105,11 +110,11 @@ class PrettyPrinter:
         """
         Print the start tag of an element with precise formatting.
         """
-        assert isinstance(element, etree._Element)
+        assert not is_comment(element)
         # Always use self-closing tags for empty elements
-        if not element.getchildren() and element.attrib:
+        if is_empty_tag(element) and element.attrib:
             self.print("{}<{} {}/>".format(self.indent * level, element.tag, self.fmt_attr_h(element)))
-        elif not element.getchildren():
+        elif is_empty_tag(element):
             self.print("{}<{} />".format(self.indent * level, element.tag))
         else:
             # For non-empty elements, use traditional open/close tags
@@ -122,16 +127,16 @@ class PrettyPrinter:
         """
         Print the end tag of an element.
         """
-        assert isinstance(element, etree._Element)
+        assert not is_comment(element)
         # Only print end tag for non-empty elements
-        if element.getchildren():
+        if not is_empty_tag(element):
             self.print("{}</{}>".format(self.indent * level, element.tag))
 
     def print_tag_empty(self, element, level):
         """
         Print an empty element with precise self-closing tag formatting.
         """
-        assert isinstance(element, etree._Element)
+        assert not is_comment(element)
         if element.attrib:
             self.print("{}<{} {}/>".format(self.indent * level, element.tag, self.fmt_attr_h(element)))
         else:
@@ -141,15 +146,15 @@ class PrettyPrinter:
         """
         Print an XML comment.
         """
-        assert isinstance(element, etree._Comment)
-        self.print(self.indent * level + str(element))
+        assert is_comment(element)
+        self.print(self.indent * level + "<!--{}-->".format(element.text))
 
     def print_element(self, element, level):
         """
         Recursively print an XML element and its children in prettified format.
         """
         # If the element is a comment, print it and return.
-        if isinstance(element, etree._Comment):
+        if is_comment(element):
             self.print_comment(element, level=level)
             return
 
@@ -162,7 +167,7 @@ class PrettyPrinter:
 
     def print_children(self, element, level):
         if level > self.max_group_level:
-            for child in element.getchildren():
+            for child in element:
                 self.print_element(child, level=level)
             return
 
@@ -184,7 +189,7 @@ class PrettyPrinter:
             return 6  # Unknown elements appear last
 
         # Sort children based on the predefined order
-        sorted_children = sorted(element.getchildren(), key=custom_sort_key)
+        sorted_children = sorted(element, key=custom_sort_key)
 
         last = len(sorted_children)
         for i, group in enumerate(sorted_children, start=1):
@@ -201,7 +206,7 @@ class PrettyPrinter:
                 
                 # Sort participant's children based on the defined order
                 sorted_participant_children = sorted(
-                    group.getchildren(), 
+                    group, 
                     key=lambda child: next(
                         (rank for prefix, rank in participant_order.items() 
                          if str(child.tag).startswith(prefix)), 
@@ -225,7 +230,7 @@ class PrettyPrinter:
                 # Construct participant tag with attributes
                 participant_tag = "<{}".format(group.tag)
                 for attr, value in group.items():
-                    participant_tag += ' {}="{}"'.format(attr, value)
+                    participant_tag += ' {}="{}"'.format(attr, self.fmt_value(value))
                 participant_tag += ">"
                 
                 # Print participant opening tag
@@ -253,7 +258,7 @@ class PrettyPrinter:
                     if len(mapping_elem.items()) > 2:
                         self.print("{}<{}".format(self.indent * (level + 1), mapping_elem.tag))
                         for k, v in mapping_elem.items():
-                            self.print("{}{}=\"{}\"".format(self.indent * (level + 2), k, v))
+                            self.print("{}{}=\"{}\"".format(self.indent * (level + 2), k, self.fmt_value(v)))
                         self.print("{} />".format(self.indent * (level + 1)))
                     else:
                         # Single-line formatting for simple mappings
@@ -272,7 +277,7 @@ class PrettyPrinter:
             elif 'coupling-scheme' in str(group.tag):
                 # Sort children of coupling-scheme
                 sorted_scheme_children = sorted(
-                    group.getchildren(),
+                    group,
                     key=lambda child: 0 if str(child.tag) == 'relative-convergence-measure' else 
                                       1 if str(child.tag) == 'exchange' else 2
                 )
@@ -365,9 +370,30 @@ class PrettyPrinter:
         Returns:
           An lxml ElementTree object.
         """
+        # lxml is only needed to format existing files, generated configurations are emitted from their tree
+        from lxml import etree
+
         parser = etree.XMLParser(recover=True, remove_comments=False, remove_blank_text=True)
         return etree.fromstring(content, parser).getroottree()
 
+    def prettify_tree(self, xml_tree):
+        """
+        Prettify an already parsed XML tree without touching the disk.
+
+        Parameters:
+          xml_tree: An lxml ElementTree, e.g. as returned by parse_xml.
+
+        Returns:
+          str: The prettified XML content.
+        """
+        # Create an in-memory text stream to hold the prettified XML.
+        buffer = io.StringIO()
+        # Use a temporary PrettyPrinter instance with the buffer as output.
+        temp_printer = PrettyPrinter(stream=buffer, indent=self.indent,
+                                     max_width=self.max_width, max_group_level=self.max_group_level)
+        temp_printer.print_root(xml_tree)
+        return buffer.getvalue()
+
     def prettify_file(self, file_path):
         """
         Prettify the XML file at the given path and overwrite the file with the prettified content.
@@ -395,22 +421,13 @@ class PrettyPrinter:
             print(e)
             return False
 
-        # Create an in-memory text stream to hold the prettified XML.
-        buffer = io.StringIO()
-        # Use a temporary PrettyPrinter instance with the buffer as output.
-        temp_printer = PrettyPrinter(stream=buffer, indent=self.indent,
-                                     max_width=self.max_width, max_group_level=self.max_group_level)
-        temp_printer.print_root(xml_tree)
-
-        # Get the prettified content from the buffer.
-        new_content = buffer.getvalue()
+        new_content = self.prettify_tree(xml_tree)
         # Compare with the original content (decoded from bytes).
         if new_content != content.decode("utf-8"):
             try:
                 # Overwrite the original file with the prettified content.
                 with open(file_path, "w") as xml_file:
-                    buffer.seek(0)
-                    shutil.copyfileobj(buffer, xml_file)
+                    xml_file.write(new_content)
             except Exception as e:
                 print(f"Failed to write prettified content to file: \"{file_path}\"")
                 print(e)
@@ -0,0 +1,154 @@
+from pathlib import Path
+import functools
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+from .logger import Logger
+
+PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+# The folders whose files determine the content of a generated case, besides the topology
+GENERATOR_SOURCES = ("templates", "generation_utils", "controller_utils")
+
+
+def generator_version() -> str:
+    """Version of the installed generator, part of every cache key."""
+    try:
+        from importlib.metadata import version
+        return version("precice-generator")
+    except Exception:
+        return "unknown"
+
+
+@functools.lru_cache(maxsize=None)
+def generator_fingerprint() -> str:
+    """ Hash of the templates and the Python sources of the generator, part of every cache key.
+        The package version is not bumped for every change, so a changed template or generator module would otherwise
+        restore cases generated by the previous code. Computed once per process."""
+    digest = hashlib.sha256()
+    for folder in GENERATOR_SOURCES:
+        for path in sorted((PACKAGE_ROOT / folder).rglob("*")):
+            if not path.is_file() or "__pycache__" in path.parts or path.suffix == ".pyc":
+                continue
+            digest.update(path.relative_to(PACKAGE_ROOT).as_posix().encode("utf-8") + b"\0")
+            digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+class GenerationCache:
+    ENTRY_FILE = "entry.json"
+    FILES_DIR = "files"
+
+    def __init__(self, cache_dir: Path = None, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024) -> None:
+        """ Content-addressed cache of generated cases.
+            An entry is keyed by a hash of the normalized topology, the generator version and the content of the
+            templates and generator sources (see generator_fingerprint) and holds all files of the _generated/ folder,
+            so topologies that only differ in key order, comments or YAML formatting share one entry. The least recently used
+            entries are evicted once max_entries or max_bytes is exceeded.
+            :param cache_dir: Folder of the cache, defaults to $PRECICE_GEN_CACHE_DIR or $XDG_CACHE_HOME/precice-gen
+            :param max_entries: Maximum number of cached cases
+            :param max_bytes: Maximum total size of the cached files"""
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else self.default_dir()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version = generator_version()
+        self.fingerprint = generator_fingerprint()
+        self.logger = Logger()
+
+    @staticmethod
+    def default_dir() -> Path:
+        """The cache folder used if none is given."""
+        if os.environ.get("PRECICE_GEN_CACHE_DIR"):
+            return Path(os.environ["PRECICE_GEN_CACHE_DIR"])
+        cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        return Path(cache_home) / "precice-gen"
+
+    def key_for(self, topology_data) -> str:
+        """ Canonical hash of a parsed topology.
+            Mapping keys are sorted and the YAML text itself is never hashed, so formatting and comments do not matter.
+            :return: The cache key, or None if the topology cannot be normalized"""
+        try:
+            key_data = {"generator": self.version, "sources": self.fingerprint, "topology": topology_data}
+            normalized = json.dumps(key_data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+        except (TypeError, ValueError, RecursionError):
+            return None
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str) -> dict:
+        """ Returns the cached case of a key and marks it as recently used.
+            :return: {"files": {relative path: content}, "warnings": [...]} or None on a miss"""
+        entry_dir = self.cache_dir / key
+        try:
+            with open(entry_dir / self.ENTRY_FILE, "r", encoding="utf-8") as entry_file:
+                entry = json.load(entry_file)
+            files = {relative_path: (entry_dir / self.FILES_DIR / relative_path).read_text(encoding="utf-8")
+                     for relative_path in entry["files"]}
+            # The modification time of the entry file is the last use for the LRU eviction
+            os.utime(entry_dir / self.ENTRY_FILE)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as lookup_exception:
+            self.logger.warning(f"Ignoring broken cache entry {entry_dir}. Error: {lookup_exception}")
+            return None
+        return {"files": files, "warnings": entry.get("warnings", [])}
+
+    def store(self, key: str, generated_root: Path, relative_paths: list[str], warnings: list[str]) -> None:
+        """ Copies the generated files of a case into the cache.
+            The entry is assembled in a temporary folder and renamed into place, so concurrent processes never see a
+            half written entry.
+            :param generated_root: The _generated/ folder of the case
+            :param relative_paths: The generated files, relative to generated_root
+            :param warnings: Warnings of the generation, replayed on a cache hit"""
+        entry_dir = self.cache_dir / key
+        if entry_dir.exists():
+            return
+        staging_dir = self.cache_dir / f".{key}.{uuid.uuid4().hex}.tmp"
+        try:
+            staging_dir.mkdir(parents=True)
+            size = 0
+            for relative_path in relative_paths:
+                cached_file = staging_dir / self.FILES_DIR / relative_path
+                cached_file.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(generated_root / relative_path, cached_file)
+                size += cached_file.stat().st_size
+            entry = {"version": self.version, "files": list(relative_paths), "warnings": list(warnings),
+                     "size": size}
+            with open(staging_dir / self.ENTRY_FILE, "w", encoding="utf-8") as entry_file:
+                json.dump(entry, entry_file, indent=2)
+            os.rename(staging_dir, entry_dir)
+        except OSError as store_exception:
+            # Another process stored the same entry first, or the cache is not writable
+            if not entry_dir.exists():
+                self.logger.warning(f"Failed to store cache entry {entry_dir}. Error: {store_exception}")
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        self.evict()
+
+    def evict(self) -> None:
+        """Removes the least recently used entries until the cache is within its limits."""
+        entries = []
+        if not self.cache_dir.is_dir():
+            return
+        for entry_dir in self.cache_dir.iterdir():
+            try:
+                entry_file = entry_dir / self.ENTRY_FILE
+                with open(entry_file, "r", encoding="utf-8") as entry_stream:
+                    size = json.load(entry_stream).get("size", 0)
+                entries.append((entry_file.stat().st_mtime, size, entry_dir))
+            except (OSError, ValueError, AttributeError):
+                # Temporary folders of running stores and foreign files are left alone
+                continue
+
+        entries.sort(key=lambda entry: entry[0], reverse=True)
+        total_size = 0
+        for index, (_, size, entry_dir) in enumerate(entries):
+            total_size += size
+            if index >= self.max_entries or total_size > self.max_bytes:
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                self.logger.info(f"Evicted cache entry {entry_dir.name}")
+
+    def clear(self) -> None:
+        """Removes the whole cache."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
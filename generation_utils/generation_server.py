@@ -0,0 +1,164 @@
+from pathlib import Path
+import json
+import os
+import socketserver
+import stat
+import sys
+
+from .batch_generator import generate_case
+from .logger import Logger
+from .topology_validator import load_topology_validator
+from .topology_document import TopologyDocument
+from .template_registry import TEMPLATES
+
+# The JSON types of the request fields, a request with a field of another type is answered with an error
+REQUEST_FIELD_TYPES = {
+    "output": (str,),
+    "topology": (str, dict),
+    "topology-file": (str,),
+    "source": (str,),
+    "validate": (bool,),
+    "clean": (bool,),
+    "cache": (bool,),
+}
+JSON_TYPE_NAMES = {str: "a string", dict: "an object", bool: "a boolean"}
+
+
+def error_response(request_id, errors: list[str]) -> dict:
+    """The response to a request that could not be generated at all."""
+    return {"id": request_id, "status": "error", "paths": [], "errors": errors, "warnings": [],
+            "validation": None, "seconds": 0.0}
+
+
+def request_errors(request: dict) -> list[str]:
+    """ Checks the fields of a request before anything is generated.
+        :return: One message per missing or mistyped field, empty if the request is well-formed"""
+    errors = []
+    for field, field_types in REQUEST_FIELD_TYPES.items():
+        if field in request and not isinstance(request[field], field_types):
+            expected = " or ".join(JSON_TYPE_NAMES[field_type] for field_type in field_types)
+            errors.append(f"Request field '{field}' has to be {expected}.")
+    if "output" not in request:
+        errors.append("Request has no 'output'.")
+    if "topology" not in request and "topology-file" not in request:
+        errors.append("Request has neither 'topology' nor 'topology-file'.")
+    return errors
+
+
+class GenerationServer:
+    def __init__(self, validate_topology: bool = True, use_cache: bool = True) -> None:
+        """ Long-running generator that answers JSON-lines generation requests.
+            Imports, the compiled topology schema validator and all templates are loaded once when the server
+            starts, so a request only pays for building and writing the configuration.
+
+            A request is one JSON object per line:
+                {"id": 1, "topology": "<topology.yaml content>", "output": "/path/to/case"}
+            "topology" is the YAML or JSON text of the topology or the topology itself as JSON object. Instead of
+            "topology", "topology-file" may name a topology file (YAML, JSON or CBOR) on the server's filesystem.
+            The optional key "validate" overrides the schema validation setting for a single request, the optional
+            key "clean" removes the _generated/ folder before generating instead of only rewriting changed files and
+            the optional key "cache" overrides whether the cache of generated cases is used.
+            Every request is answered with one JSON line containing "id", "status" (success, invalid or error),
+            "paths", "errors", "warnings", "validation" and "seconds". "paths" only lists the files that were moved
+            into the _generated/ folder, it is empty for a request that failed. A malformed request or a request
+            that crashed the generation is answered with status error, the server keeps answering the next ones.
+            :param validate_topology: Whether to validate the topologies against the preCICE topology schema. Invalid
+                topologies are answered with status invalid and are not generated
+            :param use_cache: Whether to restore topologies that were generated before from the cache"""
+        self.validate_topology = validate_topology
+        self.use_cache = use_cache
+        self.logger = Logger()
+        self._warm_up()
+
+    def _warm_up(self) -> None:
+        """Loads the schema validator and the templates into the process-wide caches."""
+        load_topology_validator()
+        TEMPLATES.preload()
+
+    def handle_request(self, request: dict) -> dict:
+        """ Generates the case described by one request.
+            :param request: The decoded request
+            :return: The response of the request"""
+        request_id = request.get("id")
+        errors = request_errors(request)
+        if errors:
+            return error_response(request_id, errors)
+
+        if "topology" in request:
+            topology_file = request.get("source", "<request>")
+            if isinstance(request["topology"], dict):
+                # A JSON topology embedded in the request is already parsed
+                topology = TopologyDocument.from_data(request["topology"], source=topology_file)
+            else:
+                topology = TopologyDocument.from_string(request["topology"], source=topology_file)
+        else:
+            topology_file = request["topology-file"]
+            topology = TopologyDocument.from_file(Path(topology_file))
+
+        result = generate_case(Path(topology_file), Path(request["output"]),
+                               validate_topology=request.get("validate", self.validate_topology),
+                               topology=topology, clean_generated=request.get("clean", False),
+                               use_cache=request.get("cache", self.use_cache))
+        result["id"] = request_id
+        return result
+
+    def handle_line(self, line: str) -> str:
+        """ Answers one JSON line with one JSON line (without the trailing newline)."""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("a request must be a JSON object")
+        except ValueError as invalid_request:
+            return json.dumps(error_response(None, [f"Invalid request: {invalid_request}"]))
+        try:
+            response = self.handle_request(request)
+        except Exception as request_exception:
+            # One broken request must not stop the server
+            response = error_response(request.get("id"), [f"{type(request_exception).__name__}: {request_exception}"])
+        return json.dumps(response)
+
+    def serve_stream(self, input_stream=sys.stdin, output_stream=sys.stdout) -> None:
+        """ Answers requests read line by line from input_stream until it is closed."""
+        for line in input_stream:
+            if not line.strip():
+                continue
+            output_stream.write(self.handle_line(line) + "\n")
+            output_stream.flush()
+
+    def serve_unix_socket(self, socket_path: Path) -> bool:
+        """ Answers requests on a Unix domain socket, every connection may send any number of requests.
+            A socket left behind at socket_path is replaced, any other file is never removed.
+            :return: False if the server did not start, the reason is in the logger"""
+        socket_path = Path(socket_path)
+        try:
+            existing_mode = os.lstat(socket_path).st_mode
+        except FileNotFoundError:
+            existing_mode = None
+        if existing_mode is not None:
+            if not stat.S_ISSOCK(existing_mode):
+                self.logger.error(f"{socket_path} exists and is not a socket, refusing to replace it")
+                return False
+            # A socket of a server that did not shut down cleanly
+            socket_path.unlink()
+
+        server = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    line = line.decode("utf-8")
+                    if not line.strip():
+                        continue
+                    self.wfile.write((server.handle_line(line) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+
+        with socketserver.ThreadingUnixStreamServer(str(socket_path), RequestHandler) as unix_server:
+            unix_server.daemon_threads = True
+            try:
+                unix_server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                if socket_path.exists():
+                    os.unlink(socket_path)
+        return True
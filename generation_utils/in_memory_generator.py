@@ -0,0 +1,84 @@
+from pathlib import Path
+
+from .file_generator import FileGenerator
+from .structure_handler import InMemoryStructureHandler
+from .topology_document import TopologyDocument
+from .topology_validator import topology_errors
+
+
+class InMemoryCase:
+    def __init__(self, files: dict[str, bytes], diagnostics: list[dict], config_ir=None) -> None:
+        """ A case generated in memory.
+            :param files: The content of every generated file by its path relative to the _generated dir, e.g.
+                "precice-config.xml" or "fluid-openfoam/adapter-config.json"
+            :param diagnostics: One dict per problem with the keys "severity" ("error" or "warning"),
+                "source" ("topology", "generation" or "validation") and "message"
+            :param config_ir: The intermediate representation of the case, None if it could not be created"""
+        self.files = files
+        self.diagnostics = diagnostics
+        self.config_ir = config_ir
+
+    @property
+    def errors(self) -> list[str]:
+        """The messages of all errors."""
+        return [diagnostic["message"] for diagnostic in self.diagnostics if diagnostic["severity"] == "error"]
+
+    @property
+    def warnings(self) -> list[str]:
+        """The messages of all warnings."""
+        return [diagnostic["message"] for diagnostic in self.diagnostics if diagnostic["severity"] == "warning"]
+
+    @property
+    def ok(self) -> bool:
+        """True if the case was generated without errors."""
+        return not self.errors
+
+
+def load_topology(topology) -> TopologyDocument:
+    """ Wraps the topology handed to the library into a TopologyDocument.
+        :param topology: The parsed topology (dict), the topology as YAML or JSON text (str or bytes), as CBOR (bytes)
+            or a TopologyDocument"""
+    if isinstance(topology, TopologyDocument):
+        return topology
+    if isinstance(topology, dict):
+        return TopologyDocument.from_data(topology)
+    if isinstance(topology, str):
+        return TopologyDocument.from_string(topology)
+    if isinstance(topology, (bytes, bytearray)):
+        return TopologyDocument("<bytes>", bytes(topology))
+    raise TypeError(f"Unsupported topology of type {type(topology).__name__}, expected a dict, str or bytes")
+
+
+def generate_in_memory(topology, validate_topology: bool = True) -> InMemoryCase:
+    """ Generates a case without touching the filesystem, e.g. for a web service or a test harness.
+        The files are the same as the ones written to _generated/ by the command-line interface.
+        :param topology: The parsed topology (dict), the topology as YAML or JSON text (str or bytes), as CBOR (bytes)
+            or a TopologyDocument
+        :param validate_topology: Whether to validate the topology against the preCICE topology schema first. An invalid
+            topology is not generated, every schema error is reported as diagnostic
+        :return: The generated files and the diagnostics of the generation. A case with errors has no files"""
+    document = load_topology(topology)
+    # A topology that cannot be read is never generated, an invalid one is rejected with all its errors
+    if document.error is not None:
+        return InMemoryCase({}, [{"severity": "error", "source": "topology", "message": document.error}])
+    if validate_topology:
+        validation_errors = topology_errors(document.data)
+        if validation_errors:
+            return InMemoryCase({}, [{"severity": "error", "source": "validation", "message": message}
+                                     for message in validation_errors])
+
+    structure = InMemoryStructureHandler()
+    file_generator = FileGenerator(Path(document.source), None, topology=document, jobs=1, structure=structure)
+    diagnostics = []
+    try:
+        file_generator.generate()
+    except Exception as generation_exception:
+        # A crashed generation is reported like every other error, generate() already discarded its files
+        diagnostics.append({"severity": "error", "source": "generation",
+                            "message": f"{type(generation_exception).__name__}: {generation_exception}"})
+    for logger in (file_generator.logger, structure.logger, file_generator.other_files_generator.logger):
+        diagnostics.extend({"severity": "error", "source": "generation", "message": message}
+                           for message in logger.get_errors())
+        diagnostics.extend({"severity": "warning", "source": "generation", "message": message}
+                           for message in logger.get_warnings())
+    return InMemoryCase(structure.get_files(), diagnostics, file_generator.config_ir)
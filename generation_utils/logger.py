@@ -65,6 +65,20 @@ class Logger:
         """Retrieve logged warnings."""
         return self._warnings
 
+    def get_errors(self) -> list:
+        """Retrieve logged errors."""
+        return self._errors
+
+    def extend(self, other: "Logger") -> None:
+        """Appends all messages, warnings and errors of another logger, keeping their order."""
+        self._messages.extend(other._messages)
+        for warning in other._warnings:
+            if not warning in self._warnings:
+                self._warnings.append(warning)
+        for error in other._errors:
+            if not error in self._errors:
+                self._errors.append(error)
+
     def clear_log_state(self) -> None:
         """Clear all logged errors and warnings."""
         self._errors.clear()
@@ -1,36 +1,42 @@
 from pathlib import Path
 from generation_utils.logger import Logger
 from generation_utils.adapter_config_generator import AdapterConfigGenerator
+from generation_utils.template_registry import TEMPLATES
+
 
 class OtherFilesGenerator:
-    def __init__(self) -> None:
+    def __init__(self, structure=None) -> None:
         """
-        Initialize OtherFilesGenerator with optional logger.
+        Initialize OtherFilesGenerator.
         
-        :param logger: Optional Logger instance. If not provided, a new Logger will be created.
+        :param structure: Optional StructureHandler. If given, files are written through it and are only
+            rewritten if their content changed.
         """
         self.logger = Logger()
+        self.structure = structure
+
+    def _write(self, target: Path, content: str) -> None:
+        """Writes a generated file, through the structure handler if there is one."""
+        if self.structure is not None:
+            self.structure.write_file(target, content, logger=self.logger)
+            return
+        with open(target, 'w', encoding="utf-8") as target_file:
+            target_file.write(content)
 
     def _generate_static_files(self, target: Path, name: str) -> None:
         """Generate static files from templates
             :param target: target file path
             :param name: name of the function"""
         try:
-            template = Path(__file__).parent.parent / "templates" / f"template_{name}"
             self.logger.info(f"Reading in the template file for {name}")
 
-            # Check if the template file exists
-            if not template.exists():
-                raise FileNotFoundError(f"Template file not found: {template}")
-
-            # Read the template content
-            template_content = template.read_text(encoding="utf-8")
+            # The template is loaded once per process, the templates do not change while the process runs
+            template_content = TEMPLATES.get(f"template_{name}").text
 
             self.logger.info(f"Writing the template to the target: {str(target)}")
 
             # Write content to the target file
-            with open(target, 'w', encoding="utf-8") as template:
-                template.write(template_content)
+            self._write(target, template_content)
 
             self.logger.success(f"Successfully written {name} content to: {str(target)}")
 
@@ -51,18 +57,17 @@ class OtherFilesGenerator:
             :param clean_sh: Path to the clean.sh file"""
         self._generate_static_files(target=clean_sh, name="clean.sh")
 
-    def generate_adapter_config(self, adapter_config: Path, precice_config: Path, topology_path: Path, target_participant: str) -> None:
+    def generate_adapter_config(self, adapter_config: Path, config_ir, target_participant: str) -> None:
         """Generates the adapter-config.json file.
         
         :param adapter_config: Path to the output adapter-config.json file
-        :param precice_config: Path to the precice-config.xml file
-        :param topology_path: Path to the topology YAML file
+        :param config_ir: The intermediate representation of the generated case
         :param target_participant: Name of the target participant
         """
         adapter_config_generator = AdapterConfigGenerator(
             adapter_config_path=adapter_config,
-            precice_config_path=precice_config, 
-            topology_path=topology_path,  
-            target_participant=target_participant
+            config_ir=config_ir,
+            target_participant=target_participant,
+            structure=self.structure
         )
         adapter_config_generator.write_to_file()
\ No newline at end of file
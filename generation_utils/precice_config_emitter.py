@@ -0,0 +1,52 @@
+import io
+import sys
+
+from .format_precice_config import PrettyPrinter
+
+
+class PreciceConfigEmitter(PrettyPrinter):
+    """
+    Writes a generated preCICE configuration straight to an output stream.
+
+    The element tree built by PS_PreCICEConfig already carries the final preCICE tag and
+    attribute names (data:vector, m2n:sockets, coupling-scheme:*, mapping:*, from, ...).
+    It is therefore emitted in a single pass with the ordering and layout rules of the
+    PrettyPrinter, without serializing, rewriting and re-parsing the document in between.
+    """
+    def __init__(self, stream=sys.stdout, indent='    ', max_width=120, max_group_level=1):
+        super().__init__(stream=stream, indent=indent, max_width=max_width, max_group_level=max_group_level)
+
+    def fmt_value(self, value):
+        """
+        Escape an attribute value, the tree holds the raw (unescaped) values.
+        Same result as xml.sax.saxutils.escape, which would import urllib and http at startup.
+        """
+        return (str(value).replace("&", "&amp;").replace(">", "&gt;").replace("<", "&lt;")
+                .replace('"', "&quot;"))
+
+    def emit(self, root) -> None:
+        """
+        Write the XML declaration and the whole configuration starting at the root element.
+
+        Parameters:
+          root: The precice-configuration element (xml.etree.ElementTree or lxml element).
+        """
+        self.print('<?xml version="1.0" encoding="UTF-8"?>')
+        self.print()  # Add an extra newline after XML declaration
+        self.print_element(root, level=0)
+
+    def emit_to_string(self, root) -> str:
+        """
+        Emit the configuration into a string instead of the configured stream.
+
+        Parameters:
+          root: The precice-configuration element.
+
+        Returns:
+          str: The formatted preCICE configuration.
+        """
+        buffer = io.StringIO()
+        emitter = PreciceConfigEmitter(stream=buffer, indent=self.indent,
+                                       max_width=self.max_width, max_group_level=self.max_group_level)
+        emitter.emit(root)
+        return buffer.getvalue()
@@ -0,0 +1,75 @@
+from pathlib import Path
+import contextlib
+import json
+import os
+import threading
+import time
+
+
+class Profiler:
+    def __init__(self, enabled: bool = True) -> None:
+        """ Records timing spans of the generation stages.
+            A disabled profiler records nothing, so the spans can stay in place at no cost.
+            :param enabled: Whether spans are recorded"""
+        self.enabled = enabled
+        self.spans = [] # (name, start, duration, thread, args), start and duration in seconds
+        self.start = time.perf_counter()
+        self._threads = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args):
+        """ Times the enclosed block.
+            :param name: Name of the stage
+            :param args: Additional information shown in the trace (for example the participant)"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                thread = self._threads.setdefault(threading.get_ident(), len(self._threads))
+                self.spans.append((name, start, duration, thread, args))
+
+    def summary(self) -> list[dict]:
+        """ Aggregates the spans per stage, in the order in which the stages were first entered.
+            Stages can be nested, so the shares of all stages do not add up to 100%."""
+        stages = {}
+        for name, start, duration, _, _ in sorted(self.spans, key=lambda span: span[1]):
+            stage = stages.setdefault(name, {"name": name, "calls": 0, "total": 0.0})
+            stage["calls"] += 1
+            stage["total"] += duration
+        return list(stages.values())
+
+    def print_table(self) -> None:
+        """Prints the time spent in every stage."""
+        wall_time = time.perf_counter() - self.start
+        stages = self.summary()
+        name_width = max([len(stage["name"]) for stage in stages] + [len("Wall time")])
+        print(f"{'Stage':<{name_width}}  {'Calls':>5}  {'Total [ms]':>10}  {'Mean [ms]':>10}  {'Share':>6}")
+        for stage in stages:
+            total = stage["total"] * 1000
+            share = stage["total"] / wall_time * 100 if wall_time > 0 else 0.0
+            print(f"{stage['name']:<{name_width}}  {stage['calls']:>5}  {total:>10.3f}  {total / stage['calls']:>10.3f}  "
+                  f"{share:>5.1f}%")
+        print(f"{'Wall time':<{name_width}}  {'':>5}  {wall_time * 1000:>10.3f}")
+
+    def write_chrome_trace(self, trace_file: Path) -> None:
+        """ Writes the spans in the Chrome trace event format (chrome://tracing, Perfetto).
+            :param trace_file: The JSON file to write"""
+        pid = os.getpid()
+        events = [{
+            "name": name,
+            "cat": "precice-gen",
+            "ph": "X",
+            "ts": (start - self.start) * 1e6,
+            "dur": duration * 1e6,
+            "pid": pid,
+            "tid": thread,
+            "args": {key: str(value) for key, value in args.items()},
+        } for name, start, duration, thread, args in sorted(self.spans, key=lambda span: span[1])]
+        with open(trace_file, "w", encoding="utf-8") as trace_stream:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_stream, indent=1)
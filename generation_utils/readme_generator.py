@@ -1,4 +1,4 @@
-from pathlib import Path
+from .template_registry import TEMPLATES
 
 class ReadmeGenerator:
     SOLVER_DOCS = {
@@ -23,13 +23,10 @@ class ReadmeGenerator:
     def generate_readme(self, file_generator):
         """Generates the README.md file with dynamic content based on simulation configuration"""
         logger = file_generator.logger
-        user_ui = file_generator.user_ui
+        config_ir = file_generator.config_ir
         
-        # Read the template README with explicit UTF-8 encoding
-        readme_template_path = Path(__file__).parent.parent / "templates" / "template_README.md"
-        
-        with open(readme_template_path, 'r', encoding='utf-8') as template_file:
-            readme_content = template_file.read()
+        # The template README is loaded once per process
+        readme_template = TEMPLATES.get("template_README.md")
 
         # Extract participants and their solvers
         participants_list = []
@@ -38,13 +35,14 @@ class ReadmeGenerator:
         original_solver_names = {}
 
         # Ensure participants exist before processing
-        if not hasattr(user_ui, 'participants') or not user_ui.participants:
+        if config_ir is None or not config_ir.participants:
             logger.warning("No participants found. Using default placeholders.")
             participants_list = ["DefaultParticipant"]
             solvers_list = ["DefaultSolver"]
             original_solver_names = {"defaultparticipant": "DefaultSolver"}
         else:
-            for participant_name, participant_info in user_ui.participants.items():
+            for participant_info in config_ir.participants:
+                participant_name = participant_info.name
                 # Preserve original solver name
                 original_solver_name = getattr(participant_info, 'solverName', 'UnknownSolver')
                 solver_name = original_solver_name.lower()
@@ -59,15 +57,6 @@ class ReadmeGenerator:
         # Determine coupling strategy
         coupling_strategy = "Partitioned" if len(participants_list) > 1 else "Single Solver"
 
-        # Replace placeholders
-        readme_content = readme_content.replace("{PARTICIPANTS_LIST}", "\n  ".join(f"- {p}" for p in participants_list))
-        readme_content = readme_content.replace("{SOLVERS_LIST}", "\n  ".join(f"- {s}" for s in solvers_list))
-        readme_content = readme_content.replace("{COUPLING_STRATEGY}", coupling_strategy)
-        
-        # Explicitly replace solver-specific placeholders
-        readme_content = readme_content.replace("{SOLVER1_NAME}", solvers_list[0] if solvers_list else "Solver1")
-        readme_content = readme_content.replace("{SOLVER2_NAME}", solvers_list[1] if len(solvers_list) > 1 else "Solver2")
-        
         # Generate adapter configuration paths for all participants
         adapter_config_paths = []
         
@@ -75,29 +64,28 @@ class ReadmeGenerator:
             # Find the corresponding solver name for this participant
             solver_name = original_solver_names.get(participant.lower(), 'solver')
             adapter_config_paths.append(f"- **{participant}**: `{participant}-{solver_name}/adapter-config.json`")
-        
-        # Replace adapter configuration section
-        readme_content = readme_content.replace(
-            "- **Adapter Configuration**: `{PARTICIPANT_NAME}/adapter-config.json`", 
-            "**Adapter Configurations**:\n" + "\n".join(adapter_config_paths)
-        )
-        
-        # Explicitly replace solver links
-        readme_content = readme_content.replace(
-            "[Link1]", 
-            f"[{solvers_list[0] if solvers_list else 'Solver1'}]({solver_links.get(solvers_list[0].lower(), '#') if solvers_list else '#'})"
-        )
-        readme_content = readme_content.replace(
-            "[Link2]", 
-            f"[{solvers_list[1] if len(solvers_list) > 1 else 'Solver2'}]({solver_links.get(solvers_list[1].lower(), '#') if len(solvers_list) > 1 else '#'})"
-        )
+
+        # Replace all placeholders in one pass over the template
+        readme_content = readme_template.render({
+            "{PARTICIPANTS_LIST}": "\n  ".join(f"- {p}" for p in participants_list),
+            "{SOLVERS_LIST}": "\n  ".join(f"- {s}" for s in solvers_list),
+            "{COUPLING_STRATEGY}": coupling_strategy,
+            # Explicitly replace solver-specific placeholders
+            "{SOLVER1_NAME}": solvers_list[0] if solvers_list else "Solver1",
+            "{SOLVER2_NAME}": solvers_list[1] if len(solvers_list) > 1 else "Solver2",
+            # Replace adapter configuration section
+            "- **Adapter Configuration**: `{PARTICIPANT_NAME}/adapter-config.json`":
+                "**Adapter Configurations**:\n" + "\n".join(adapter_config_paths),
+            # Explicitly replace solver links
+            "[Link1]": f"[{solvers_list[0] if solvers_list else 'Solver1'}]({solver_links.get(solvers_list[0].lower(), '#') if solvers_list else '#'})",
+            "[Link2]": f"[{solvers_list[1] if len(solvers_list) > 1 else 'Solver2'}]({solver_links.get(solvers_list[1].lower(), '#') if len(solvers_list) > 1 else '#'})",
+        })
 
         # Write the README
         structure = file_generator.structure
 
         try:
-            with open(structure.README, 'w', encoding='utf-8') as readme_file:
-                readme_file.write(readme_content)
+            structure.write_file(structure.README, readme_content)
             logger.success(f"README.md generated successfully at {structure.README}")
             return structure.README
         except Exception as e:
@@ -1,34 +1,107 @@
 from pathlib import Path
 from .logger import Logger
+import errno
+import functools
+import hashlib
+import json
+import os
 import shutil
+import sys
+import threading
+import uuid
+
+# renameat2() arguments, see rename(2)
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+
+
+@functools.lru_cache(maxsize=None)
+def _load_renameat2():
+    """The renameat2 function of the C library, None where there is none (not Linux or glibc before 2.28)."""
+    if not sys.platform.startswith("linux"):
+        return None
+    import ctypes # only loaded when a generation is moved into place
+    import ctypes.util
+    try:
+        renameat2 = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return None
+    renameat2.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint)
+    renameat2.restype = ctypes.c_int
+    return renameat2
+
+
+def exchange_paths(first: Path, second: Path) -> bool:
+    """ Atomically exchanges two existing paths with renameat2(RENAME_EXCHANGE).
+        :return: False if the platform or the filesystem cannot exchange paths, nothing was changed then
+        :raises OSError: If the exchange failed for another reason"""
+    renameat2 = _load_renameat2()
+    if renameat2 is None:
+        return False
+    if renameat2(AT_FDCWD, os.fsencode(first), AT_FDCWD, os.fsencode(second), RENAME_EXCHANGE) == 0:
+        return True
+    import ctypes
+    error_number = ctypes.get_errno()
+    if error_number in (errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+        return False
+    raise OSError(error_number, os.strerror(error_number), str(first), None, str(second))
 
 class StructureHandler:
-    def __init__(self, output_path: Path, clean_generated: bool = True) -> None:
+    MANIFEST_NAME = ".manifest.json"
+
+    def __init__(self, output_path: Path, clean_generated: bool = False) -> None:
         """ Creates the files and folders in a structure.
-            :param clean_generated: If set to True, clean the _generated dir before the files are created.
+            The files are written into a staging dir next to the _generated dir, which finalize() renames into place,
+            so a partially written case is never visible as _generated. Every file is written exactly once. Files
+            whose content did not change are hard linked from the previous generation instead, which keeps their
+            modification time. A manifest in the _generated dir records a content hash per generated file, so that
+            finalize() can leave out files that no longer belong to the case.
+            :param clean_generated: If set to True, nothing of the previous _generated dir is kept.
             Can be useful if you added or adjusted files yourself, and you are not sure what you changed."""
         # Objects
         self.run = None
         self.root = output_path
+        self.created_files = [] # all files that belong to the generated case
         self.generated_root = self.root / "_generated"
+        self.staging_root = self.root / f".{self.generated_root.name}.{uuid.uuid4().hex}.tmp"
+        self.manifest = self.generated_root / self.MANIFEST_NAME
+        self.clean_generated = clean_generated
         self.logger = Logger()
+        self._lock = threading.Lock()
+        self._file_hashes = {} # content hash of every file written in this run
+        self._previous_file_hashes = {} # content hash of every file of the previous run
 
         # Create level 0 structure (everything in the root folder)
-        if clean_generated:
-            self._cleaner()
+        if not clean_generated:
+            self._previous_file_hashes = self._read_manifest()
         self._create_folder_structure()
         self._create_level_0_structure()
 
     def _create_folder_structure(self) -> None:
         """Creates the structure needed for generated files"""
-        try: 
-            self.generated_root.mkdir(parents=True, exist_ok=True)
-            self.logger.success(f"Created folder: {self.generated_root}")
+        try:
+            self.make_folder(self.generated_root)
         except Exception as create_folder_structure_exception:
             self.logger.error(f"Failed to create folder structure. Error: {create_folder_structure_exception}")
 
+    @property
+    def location(self) -> str:
+        """Where the generated files end up, for messages."""
+        return str(self.generated_root)
+
+    def staged_path(self, target: Path) -> Path:
+        """The location in the staging dir of a file or folder inside the _generated dir."""
+        return self.staging_root / Path(target).relative_to(self.generated_root)
+
+    def make_folder(self, folder: Path) -> None:
+        """Creates a folder of the structure, including its parents.
+            :param folder: The folder inside the _generated dir, it is created in the staging dir"""
+        self.staged_path(folder).mkdir(parents=True, exist_ok=True)
+        self.logger.success(f"Created folder: {folder}")
+
     def _create_level_0_structure(self) -> None:
-        """Creates the necessary files of level 0 (everything in the root folder)."""
+        """Registers the necessary files of level 0 (everything in the root folder).
+            The files themselves are created when their content is written."""
 
         # Files that need to be created
         files = [
@@ -38,16 +111,10 @@ class StructureHandler:
         ]
 
         self.clean, self.README, self.precice_config = files
-
-        for file in files:
-            try:
-                file.touch(exist_ok=True)
-                self.logger.success(f"Created file: {file}")
-            except Exception as create_files_exception:
-                self.logger.error(f"Failed to create file {file}. Error: {create_files_exception}")
+        self.created_files.extend(files)
 
     def create_level_1_structure(self, participant: str, user_ui=None) -> list[Path]:
-        """ Creates the necessary files of level 1 (everything in the generated sub-folders).
+        """ Creates the folder of a participant and registers its files (everything in the generated sub-folders).
             :param participant: The participant for which the files should be created.
             :param user_ui: Optional UI_UserInput instance to retrieve participant information
             :return: participant_folder, adapter_config, run"""
@@ -60,22 +127,16 @@ class StructureHandler:
             solver_name = user_ui.participants[participant].solver_name.lower()
             #folder name starts with lowercase
             participant = participant.lower()
-            
+
 
             # Create the participant folder with name-solver format
             participant_folder = self.generated_root / f"{participant}-{solver_name}"
-            participant_folder.mkdir(parents=True, exist_ok=True)
-            self.logger.success(f"Created folder: {participant_folder}")
+            self.make_folder(participant_folder)
 
-            # Create the adapter-config.json file
+            # The adapter-config.json and run.sh files are created when their content is written
             adapter_config = participant_folder / "adapter-config.json"
-            adapter_config.touch(exist_ok=True)
-            self.logger.success(f"Created file: {adapter_config}")
-
-            # Create the run.sh file
             self.run = participant_folder / "run.sh"
-            self.run.touch(exist_ok=True)
-            self.logger.success(f"Created file: {self.run}")
+            self.created_files.extend([adapter_config, self.run])
 
             return [participant_folder, adapter_config, self.run]
         except Exception as create_participant_folder_exception:
@@ -83,17 +144,216 @@ class StructureHandler:
             participant_folder = self.generated_root / participant
             self.logger.error(f"Failed to create folder/file for participant: {participant_folder}. Error: {create_participant_folder_exception}")
 
-    def _cleaner(self) -> None:
-        """
-        Removes the entire `self.generated_root` directory and its contents.
-        If `self.generated_root` exists, it deletes everything inside it.
-        """
-        if self.generated_root.exists():
+    def write_file(self, target: Path, content: str, logger: Logger = None) -> bool:
+        """ Writes a generated file into the staging dir with a single open, write and close.
+            If the file of the previous generation has the same content, it is hard linked instead, so its
+            modification time is preserved.
+            Safe to call from several threads, as long as every thread writes different files.
+            :param target: The file to write, located inside the _generated dir
+            :param content: The complete content of the file
+            :param logger: Logger of the writer, defaults to the logger of the structure handler
+            :return: True if the file was written, False if it was already up to date"""
+        logger = logger if logger is not None else self.logger
+        target = Path(target)
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        relative_path = target.relative_to(self.generated_root).as_posix()
+        with self._lock:
+            self._file_hashes[relative_path] = digest
+        staged_file = self.staging_root / relative_path
+
+        if not self.clean_generated and self._is_up_to_date(target, data) and self._keep_file(target, staged_file):
+            logger.info(f"File is up to date: {target}")
+            return False
+
+        with open(staged_file, "wb") as target_file:
+            target_file.write(data)
+        logger.success(f"Written file: {target}")
+        return True
+
+    def keep_previous_file(self, target: Path, logger: Logger = None) -> bool:
+        """ Takes a file of the previous generation over without its content, for files whose inputs did not change.
+            Only files that were not modified since they were generated are taken over.
+            :param target: The file to keep, located inside the _generated dir
+            :param logger: Logger of the writer, defaults to the logger of the structure handler
+            :return: True if the file was taken over, False if it has to be written"""
+        logger = logger if logger is not None else self.logger
+        target = Path(target)
+        relative_path = target.relative_to(self.generated_root).as_posix()
+        digest = self._previous_file_hashes.get(relative_path)
+        if self.clean_generated or digest is None:
+            return False
+        try:
+            if hashlib.sha256(target.read_bytes()).hexdigest() != digest:
+                return False
+        except OSError:
+            return False
+        if not self._keep_file(target, self.staging_root / relative_path):
+            return False
+        with self._lock:
+            self._file_hashes[relative_path] = digest
+        logger.info(f"File is up to date: {target}")
+        return True
+
+    def _is_up_to_date(self, target: Path, data: bytes) -> bool:
+        """Checks whether the file on disk already has the given content."""
+        try:
+            if target.stat().st_size != len(data):
+                return False
+            # Files that were edited by hand are caught by comparing the bytes, the manifest only records our writes
+            return target.read_bytes() == data
+        except OSError:
+            return False
+
+    def _keep_file(self, existing_file: Path, staged_file: Path) -> bool:
+        """ Takes a file of the previous generation over into the staging dir, as hard link if the filesystem
+            supports it and as copy with the same modification time otherwise.
+            :return: True if the file was taken over"""
+        try:
+            if existing_file.is_symlink():
+                os.symlink(os.readlink(existing_file), staged_file)
+                return True
+            try:
+                os.link(existing_file, staged_file)
+            except OSError:
+                shutil.copy2(existing_file, staged_file)
+            return True
+        except OSError:
+            return False
+
+    def finalize(self) -> None:
+        """ Completes the staging dir and renames it into place as the new _generated dir.
+            Files of the previous generation that no longer belong to the case are left out, unless they were
+            modified after they were generated. Files that were added by hand are kept.
+            Has to be called after all files were written."""
+        if self.generated_root.is_dir() and not self.clean_generated:
+            self._take_over_previous_files()
+
+        manifest = json.dumps({"version": 1, "files": dict(sorted(self._file_hashes.items()))}, indent=2) + "\n"
+        try:
+            self.staging_root.mkdir(parents=True, exist_ok=True)
+            self.staged_path(self.manifest).write_text(manifest, encoding="utf-8")
+        except OSError as manifest_exception:
+            self.logger.error(f"Failed to write manifest {self.manifest}. Error: {manifest_exception}")
+        self._swap_into_place()
+
+    def _take_over_previous_files(self) -> None:
+        """Links the files of the previous _generated dir that are not generated in this run into the staging dir."""
+        for existing_file in sorted(self.generated_root.rglob("*")):
+            if existing_file.is_dir() and not existing_file.is_symlink():
+                if not any(existing_file.iterdir()):
+                    # An empty folder was added by hand, generated folders always contain files
+                    self.staged_path(existing_file).mkdir(parents=True, exist_ok=True)
+                continue
+            relative_path = existing_file.relative_to(self.generated_root).as_posix()
+            if relative_path in self._file_hashes or relative_path == self.MANIFEST_NAME:
+                continue
             try:
-                # Remove the directory and all its contents
-                shutil.rmtree(self.generated_root)
+                if relative_path not in self._previous_file_hashes:
+                    pass # added by hand
+                elif hashlib.sha256(existing_file.read_bytes()).hexdigest() != self._previous_file_hashes[relative_path]:
+                    # The file was changed after it was generated, do not throw away the changes
+                    self.logger.warning(f"Keeping {existing_file}: it is no longer generated but was modified.")
+                else:
+                    self.logger.success(f"Removed file that is no longer generated: {existing_file}")
+                    continue
+                staged_file = self.staging_root / relative_path
+                staged_file.parent.mkdir(parents=True, exist_ok=True)
+                if not self._keep_file(existing_file, staged_file):
+                    self.logger.error(f"Failed to keep {existing_file} in the new generation.")
+            except OSError as keep_exception:
+                self.logger.error(f"Failed to keep {existing_file} in the new generation. Error: {keep_exception}")
+
+    def _swap_into_place(self) -> None:
+        """ Replaces the _generated dir by the staging dir. A partially written generation is never visible as
+            _generated.
+            On Linux, both dirs are exchanged by a single renameat2(RENAME_EXCHANGE), so _generated always exists and
+            a reader sees either the complete previous or the complete new generation. Where that is not available
+            (other platforms, glibc before 2.28, filesystems without support), the previous dir is renamed away
+            before the staging dir is renamed into place, and for that moment _generated does not exist."""
+        previous_root = None
+        try:
+            if not self.generated_root.exists():
+                os.rename(self.staging_root, self.generated_root)
+            elif exchange_paths(self.staging_root, self.generated_root):
+                # The staging path now holds the previous generation
+                previous_root = self.staging_root
+            else:
+                previous_root = self.root / f".{self.generated_root.name}.{uuid.uuid4().hex}.old"
+                os.rename(self.generated_root, previous_root)
+                os.rename(self.staging_root, self.generated_root)
+        except OSError as swap_exception:
+            self.logger.error(f"Failed to move the generated files into {self.generated_root}. "
+                              f"Error: {swap_exception}")
+            if previous_root is not None and not self.generated_root.exists():
+                os.rename(previous_root, self.generated_root)
+                previous_root = None
+            shutil.rmtree(self.staging_root, ignore_errors=True)
+        if previous_root is not None:
+            shutil.rmtree(previous_root, ignore_errors=True)
+            if self.clean_generated:
                 self.logger.success(f"Successfully removed directory and all contents: {self.generated_root}")
-            except Exception as cleaner_exception:
-                self.logger.error(f"Failed to remove directory: {self.generated_root}. Error: {cleaner_exception}")
-        else:
-            self.logger.info(f"Directory {self.generated_root} does not exist. Nothing to clean.")
\ No newline at end of file
+
+    def discard(self) -> None:
+        """Removes the staging dir without touching the _generated dir, e.g. if the generation failed."""
+        shutil.rmtree(self.staging_root, ignore_errors=True)
+
+    def _read_manifest(self) -> dict:
+        """Reads the content hashes of the previous generation, if there is a manifest."""
+        try:
+            with open(self.manifest, "r", encoding="utf-8") as manifest_file:
+                return dict(json.load(manifest_file)["files"])
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, KeyError, TypeError) as manifest_exception:
+            self.logger.warning(f"Ignoring unreadable manifest {self.manifest}. Error: {manifest_exception}")
+            return {}
+
+
+class InMemoryStructureHandler(StructureHandler):
+    def __init__(self, output_path: Path = Path("<memory>")) -> None:
+        """ A structure that keeps the generated files in memory instead of writing them to disk.
+            Neither folders nor files are created and no manifest is read or written, the filesystem is not touched.
+            :param output_path: Only used to build the paths of the files, it does not need to exist"""
+        self.files = {} # content of every written file, by its path relative to the _generated dir
+        super().__init__(Path(output_path), clean_generated=False)
+
+    def _read_manifest(self) -> dict:
+        """There is no previous generation in memory."""
+        return {}
+
+    def make_folder(self, folder: Path) -> None:
+        """Folders only exist as part of the paths of the files."""
+        pass
+
+    def write_file(self, target: Path, content: str, logger: Logger = None) -> bool:
+        """ Stores the content of a generated file.
+            Safe to call from several threads, as long as every thread writes different files.
+            :param target: The file to write, located inside the _generated dir
+            :param content: The complete content of the file
+            :param logger: Ignored, storing a file cannot fail
+            :return: Always True"""
+        relative_path = Path(target).relative_to(self.generated_root).as_posix()
+        data = content.encode("utf-8")
+        with self._lock:
+            self.files[relative_path] = data
+        return True
+
+    def keep_previous_file(self, target: Path, logger: Logger = None) -> bool:
+        """There is no previous generation in memory, every file is written."""
+        return False
+
+    def finalize(self) -> None:
+        """Nothing to clean up, there are no files of a previous generation in memory."""
+        pass
+
+    def discard(self) -> None:
+        """Forgets the stored files."""
+        self.files.clear()
+
+    def get_files(self) -> dict[str, bytes]:
+        """ Returns the files of the generated case in the order in which they were registered.
+            :return: The content of every file by its path relative to the _generated dir"""
+        relative_paths = [path.relative_to(self.generated_root).as_posix() for path in self.created_files]
+        return {relative_path: self.files[relative_path] for relative_path in relative_paths
+                if relative_path in self.files}
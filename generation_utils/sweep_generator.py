@@ -0,0 +1,213 @@
+from pathlib import Path, PurePosixPath
+import copy
+import itertools
+import json
+
+import yaml
+
+from controller_utils.precice_struct import build_precice_config_tree
+from .file_generator import FileGenerator
+from .logger import Logger
+from .precice_config_emitter import PreciceConfigEmitter
+from .profiler import Profiler
+from .structure_handler import InMemoryStructureHandler, StructureHandler
+from .topology_document import TopologyDocument
+
+# Only these sections of a topology may vary between the cases of a sweep, everything else is shared by all cases
+SWEEPABLE_SECTIONS = ("coupling-scheme", "acceleration")
+SWEEP_MODES = ("product", "zip")
+INDEX_NAME = "sweep-index.json"
+
+
+def load_sweep_spec(spec_file: Path) -> dict:
+    """ Reads a sweep spec, a YAML file with the base topology and the varied parameters:
+            base: topology.yaml                  # optional, relative to the spec
+            mode: product                        # product (default) or zip of the axes
+            axes:
+              coupling-scheme.time-window-size: [1e-3, 5e-4]
+              acceleration.initial-relaxation.value: [0.1, 0.5]
+        Instead of axes, "variants" may list the parameters of every case, e.g. [{coupling-scheme.max-time: 1.0}].
+        :raises ValueError: If the spec cannot be read"""
+    try:
+        with open(spec_file, "r", encoding="utf-8") as spec_stream:
+            spec = yaml.safe_load(spec_stream)
+    except (OSError, yaml.YAMLError) as spec_exception:
+        raise ValueError(f"Cannot read sweep spec {spec_file}: {spec_exception}")
+    if not isinstance(spec, dict):
+        raise ValueError(f"Sweep spec {spec_file} has to be a mapping with 'axes' or 'variants'")
+    return spec
+
+
+def sweep_variants(spec: dict) -> list[dict]:
+    """ Expands a sweep spec into the parameters of every case.
+        :return: One dict per case, the value of every varied parameter by its dotted path
+        :raises ValueError: If the spec is inconsistent or varies a section that is shared by all cases"""
+    if ("axes" in spec) == ("variants" in spec):
+        raise ValueError("A sweep spec needs either 'axes' or 'variants'")
+    if "variants" in spec:
+        variants = spec["variants"]
+        if not isinstance(variants, list) or not all(isinstance(variant, dict) for variant in variants):
+            raise ValueError("'variants' has to be a list of mappings from parameter to value")
+    else:
+        axes = spec["axes"]
+        if not isinstance(axes, dict) or not axes:
+            raise ValueError("'axes' has to be a mapping from parameter to a list of values")
+        for parameter, values in axes.items():
+            if not isinstance(values, list) or not values:
+                raise ValueError(f"The values of axis {parameter} have to be a non-empty list")
+        mode = spec.get("mode", "product")
+        if mode not in SWEEP_MODES:
+            raise ValueError(f"Unknown sweep mode {mode}, expected one of {', '.join(SWEEP_MODES)}")
+        if mode == "zip":
+            lengths = {len(values) for values in axes.values()}
+            if len(lengths) > 1:
+                raise ValueError("All axes of a zip sweep need the same number of values")
+            combinations = zip(*axes.values())
+        else:
+            combinations = itertools.product(*axes.values())
+        variants = [dict(zip(axes, combination)) for combination in combinations]
+
+    for variant in variants:
+        for parameter in variant:
+            if str(parameter).split(".")[0] not in SWEEPABLE_SECTIONS:
+                raise ValueError(f"Parameter {parameter} cannot be swept, only the sections "
+                                 f"{', '.join(SWEEPABLE_SECTIONS)} may differ between the cases")
+    return variants
+
+
+def apply_parameters(data: dict, parameters: dict) -> dict:
+    """ Returns a copy of a topology with the given parameters set. Only the swept sections are copied.
+        :param parameters: The value of every parameter by its dotted path, e.g. "coupling-scheme.max-time" """
+    variant = dict(data)
+    for section in SWEEPABLE_SECTIONS:
+        if section in variant:
+            variant[section] = copy.deepcopy(variant[section])
+    for parameter, value in parameters.items():
+        *sections, key = str(parameter).split(".")
+        node = variant
+        for section in sections:
+            if not isinstance(node.get(section), dict):
+                node[section] = {}
+            node = node[section]
+        node[key] = value
+    return variant
+
+
+class SweepGenerator:
+    def __init__(self, topology: TopologyDocument, output_root: Path, variants: list[dict],
+                 validate_topology: bool = True, profiler: Profiler = None) -> None:
+        """ Generates many cases that differ only in their coupling scheme or acceleration settings.
+            The base topology is generated once. Every case only derives its coupling scheme again and emits its own
+            precice-config.xml, all other files are rendered once and written to every case as independent copies.
+            The cases are written to numbered folders case-0000, case-0001, ... below the output root,
+            together with an index of the parameters of every case.
+            :param topology: The base topology
+            :param output_root: Folder that receives the case folders and the index
+            :param variants: The parameters of every case, see sweep_variants
+            :param validate_topology: Whether to validate the base topology and every swept value against the preCICE
+                topology schema
+            :param profiler: Optional profiler recording the time spent in every stage"""
+        self.topology = topology
+        self.output_root = Path(output_root)
+        self.variants = variants
+        self.validate_topology = validate_topology
+        self.profiler = profiler if profiler is not None else Profiler(enabled=False)
+        self.logger = Logger()
+        self.cases = [] # the name and parameters of every case, "error" for a case that could not be generated
+        self.width = max(4, len(str(len(variants) - 1)))
+
+    def case_name(self, index: int) -> str:
+        """The folder name of a case, e.g. case-0042."""
+        return f"case-{index:0{self.width}d}"
+
+    def check_topologies(self) -> list[str]:
+        """ Validates the base topology and every swept value on top of it against the topology schema.
+            Every value is checked once, not every combination of values.
+            :return: The errors, empty if all are valid"""
+        # jsonschema is only loaded when a topology is validated
+        from .topology_validator import topology_errors
+
+        if self.topology.error is not None:
+            return [self.topology.error]
+        errors = [f"base topology: {error}" for error in topology_errors(self.topology.data)]
+        if errors:
+            return errors
+        checked = set()
+        for variant in self.variants:
+            for parameter, value in variant.items():
+                key = (parameter, json.dumps(value, sort_keys=True, default=str))
+                if key in checked:
+                    continue
+                checked.add(key)
+                errors.extend(f"{parameter}={value}: {error}"
+                              for error in topology_errors(apply_parameters(self.topology.data, {parameter: value})))
+        return errors
+
+    def run(self) -> bool:
+        """ Generates all cases and writes the index.
+            :return: True if all cases were generated, the errors are in the logger otherwise"""
+        if self.topology.error is not None:
+            self.logger.error(self.topology.error)
+            return False
+        if self.validate_topology:
+            with self.profiler.span("schema validation"):
+                validation_errors = self.check_topologies()
+            if validation_errors:
+                for validation_error in validation_errors:
+                    self.logger.error(validation_error)
+                return False
+
+        # The structure of the case is derived once, from the base topology
+        with self.profiler.span("base case"):
+            structure = InMemoryStructureHandler()
+            base = FileGenerator(Path(self.topology.source), None, topology=self.topology, jobs=1, structure=structure)
+            base.generate()
+        for logger in (base.logger, structure.logger, base.other_files_generator.logger):
+            for error in logger.get_errors():
+                self.logger.error(error)
+        if self.logger.has_errors():
+            return False
+        for warning in base.logger.get_warnings():
+            self.logger.warning(warning)
+        shared_files = {relative_path: content.decode("utf-8")
+                        for relative_path, content in structure.get_files().items()
+                        if relative_path != "precice-config.xml"}
+        folders = sorted({PurePosixPath(relative_path).parent.as_posix() for relative_path in shared_files} - {"."})
+
+        self.output_root.mkdir(parents=True, exist_ok=True)
+        emitter = PreciceConfigEmitter(indent='    ', max_width=120)
+        self.cases = []
+        for index, parameters in enumerate(self.variants):
+            case_name = self.case_name(index)
+            try:
+                with self.profiler.span("coupling scheme"):
+                    variant_data = apply_parameters(self.topology.data, parameters)
+                    base.user_ui.init_coupling_scheme_from_yaml(variant_data)
+                    base.user_ui.init_acceleration_from_yaml(variant_data, base.mylog)
+                    config_ir = base.precice_config.vary_coupling_scheme(base.user_ui)
+                with self.profiler.span("emit precice-config.xml"):
+                    precice_config = emitter.emit_to_string(build_precice_config_tree(config_ir))
+            except Exception as variant_exception:
+                # The other cases are still generated, the failed case gets no folder
+                self.logger.error(f"{case_name}: Failed to build preCICE XML config: {variant_exception}")
+                self.cases.append({"case": case_name, "parameters": parameters, "error": str(variant_exception)})
+                continue
+            with self.profiler.span("write case"):
+                case_structure = StructureHandler(self.output_root / case_name)
+                generated_root = case_structure.generated_root
+                for folder in folders:
+                    case_structure.make_folder(generated_root / folder)
+                case_structure.write_file(case_structure.precice_config, precice_config)
+                # Every case gets its own copy, so that editing the files of one case leaves the others as they are
+                for relative_path, content in shared_files.items():
+                    case_structure.write_file(generated_root / relative_path, content)
+                case_structure.finalize()
+            for error in case_structure.logger.get_errors():
+                self.logger.error(error)
+            self.cases.append({"case": case_name, "parameters": parameters})
+
+        index = {"base": str(self.topology.source), "cases": self.cases}
+        with open(self.output_root / INDEX_NAME, "w", encoding="utf-8") as index_file:
+            json.dump(index, index_file, indent=2, default=str)
+            index_file.write("\n")
+        return not self.logger.has_errors()
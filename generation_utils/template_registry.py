@@ -0,0 +1,77 @@
+from pathlib import Path
+import json
+import re
+import threading
+
+TEMPLATE_DIR = Path(__file__).parent.parent / "templates"
+
+
+class Template:
+    def __init__(self, name: str, text: str) -> None:
+        """ A template that is loaded once and rendered for many cases.
+            :param name: File name of the template in the templates folder
+            :param text: Content of the template"""
+        self.name = name
+        self.text = text
+        self._patterns = {} # compiled substitution pattern per set of placeholders
+
+    def render(self, replacements: dict[str, str]) -> str:
+        """ Replaces all placeholders in a single pass over the template.
+            Replacement values are inserted as they are, placeholders inside them are not replaced again.
+            :param replacements: Replacement value by placeholder, e.g. {"{SOLVERS_LIST}": "- OpenFOAM"}
+            :return: The rendered text"""
+        placeholders = tuple(replacements)
+        pattern = self._patterns.get(placeholders)
+        if pattern is None:
+            # Longer placeholders first, so that a placeholder that contains another one wins
+            pattern = re.compile("|".join(re.escape(placeholder)
+                                          for placeholder in sorted(placeholders, key=len, reverse=True)))
+            self._patterns[placeholders] = pattern
+        return pattern.sub(lambda match: replacements[match.group(0)], self.text)
+
+
+class TemplateRegistry:
+    def __init__(self, template_dir: Path = TEMPLATE_DIR) -> None:
+        """ Loads every template at most once per process and keeps it for all following cases.
+            :param template_dir: Folder containing the templates"""
+        self.template_dir = template_dir
+        self._templates = {}
+        self._json_templates = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Template:
+        """ Returns a text template, loading it on first use.
+            :param name: File name of the template, e.g. "template_run.sh"
+            :raises FileNotFoundError: If there is no such template"""
+        template = self._templates.get(name)
+        if template is None:
+            path = self.template_dir / name
+            try:
+                text = path.read_text(encoding="utf-8")
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Template file not found: {path}")
+            with self._lock:
+                template = self._templates.setdefault(name, Template(name, text))
+        return template
+
+    def json(self, name: str):
+        """ Returns a parsed JSON template, loading it on first use. The returned object is shared by all callers,
+            copy it before changing it.
+            :param name: File name of the template, e.g. "adapter-config-template.json"
+            :raises FileNotFoundError: If there is no such template"""
+        parsed = self._json_templates.get(name)
+        if parsed is None:
+            parsed = json.loads(self.get(name).text)
+            with self._lock:
+                parsed = self._json_templates.setdefault(name, parsed)
+        return parsed
+
+    def preload(self) -> None:
+        """Loads all templates used by the generator, e.g. before a service answers its first request."""
+        for name in ("template_run.sh", "template_clean.sh", "template_README.md"):
+            self.get(name)
+        self.json("adapter-config-template.json")
+
+
+# The templates do not change while the process runs, all generators share one registry
+TEMPLATES = TemplateRegistry()
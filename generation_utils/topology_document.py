@@ -0,0 +1,144 @@
+from pathlib import Path
+import json
+
+from controller_utils.ui_struct.UI_Replication import check_entries, expand_entries
+from .topology_formats import FORMAT_EXTENSIONS, decode_cbor, detect_format, load_yaml
+
+
+class TopologyDocument:
+    UTF8_BOM = b'\xef\xbb\xbf'
+
+    def __init__(self, source: str, content: bytes, topology_format: str = None) -> None:
+        """ A topology file that is read, decoded and parsed exactly once.
+            The same instance is handed to every generation stage, so none of them needs to touch the file again.
+            :param source: Where the content comes from (file path or a description), used for messages
+            :param content: Raw bytes of the topology document
+            :param topology_format: "yaml", "json" or "cbor", detected from the content and the file name if None"""
+        self.source = source
+        self.content = content
+        self.format = topology_format if topology_format is not None else detect_format(source, content)
+        self.data = None
+        self.error = None
+        # A document with a BOM or with invalid UTF-8 bytes is not considered pure UTF-8
+        self.is_utf8_encoded = not content.startswith(self.UTF8_BOM)
+        self._parse()
+        self._check_replication()
+
+    @classmethod
+    def from_file(cls, file_path: Path) -> "TopologyDocument":
+        """ Reads the topology file in one go and parses it.
+            A missing or unreadable file results in a document with an error instead of an exception.
+            :param file_path: Path to the topology file (YAML, JSON or CBOR)"""
+        try:
+            with open(file_path, 'rb') as topology_file:
+                content = topology_file.read()
+        except OSError as read_error:
+            document = cls(str(file_path), b"")
+            document.data = None
+            if isinstance(read_error, FileNotFoundError):
+                document.error = f"Input YAML file {file_path} not found."
+            else:
+                document.error = f"Input file {file_path} cannot be read: {read_error.strerror}."
+            return document
+        return cls(str(file_path), content)
+
+    @classmethod
+    def from_string(cls, content: str, source: str = "<string>") -> "TopologyDocument":
+        """ Parses a topology that is already available as text.
+            :param content: The topology as YAML or JSON text
+            :param source: Description of the origin of the content"""
+        return cls(source, content.encode('utf-8'))
+
+    @classmethod
+    def from_data(cls, data: dict, source: str = "<data>") -> "TopologyDocument":
+        """ Wraps a topology that is already parsed, e.g. built in memory by a caller of the library.
+            :param data: The topology as it would be loaded from a file
+            :param source: Description of the origin of the data"""
+        document = cls(source, b"")
+        document.data = data
+        document._check_replication()
+        return document
+
+    def _parse(self) -> None:
+        """Decodes the raw content and loads the document in its format."""
+        if self.format == "cbor":
+            try:
+                self.data = decode_cbor(self.content)
+            except ValueError as cbor_error:
+                self.error = f"Error reading input CBOR file: {cbor_error}"
+            return
+
+        try:
+            text = self.content.decode('utf-8-sig')
+        except UnicodeDecodeError as decode_error:
+            self.is_utf8_encoded = False
+            self.error = f"Input {self.format.upper()} file {self.source} is not UTF-8 encoded: {decode_error}"
+            return
+        if not self.is_utf8_encoded:
+            # Rejected here, so that every entry point reports it the same way instead of failing during generation
+            self.error = f"Input {self.format.upper()} file {self.source} is not UTF-8 encoded without BOM."
+            return
+
+        if self.format == "json":
+            try:
+                self.data = json.loads(text)
+                return
+            except RecursionError:
+                self.error = "Error reading input JSON file: the document is nested too deeply"
+                return
+            except ValueError as json_error:
+                if FORMAT_EXTENSIONS.get(Path(self.source).suffix.lower()) == "json":
+                    self.error = f"Error reading input JSON file: {json_error}"
+                    return
+                # Only the content looked like JSON, it may still be a YAML flow mapping
+                self.format = "yaml"
+
+        try:
+            self.data = load_yaml(text)
+        except RecursionError:
+            self.error = "Error reading input YAML file: the document is nested too deeply"
+        except Exception as e:
+            self.error = f"Error reading input YAML file: {str(e)}"
+
+    def _check_replication(self) -> None:
+        """Rejects replicated participants or exchanges that cannot be expanded, before any stage expands them."""
+        if not self.is_loaded:
+            return
+        for section in ('participants', 'exchanges'):
+            if not isinstance(self.data.get(section), list):
+                continue
+            try:
+                check_entries(self.data[section])
+            except RecursionError:
+                self.error = f"Cannot replicate {section}: an entry is nested too deeply"
+                return
+            except ValueError as replicate_error:
+                self.error = f"Cannot replicate {section} {replicate_error}"
+                return
+
+    @property
+    def is_loaded(self) -> bool:
+        """True if the document was parsed into a mapping."""
+        return isinstance(self.data, dict)
+
+    @property
+    def participants(self) -> list:
+        """ The participant entries of the topology, one per instance of a replicated participant
+            (empty if the document could not be loaded)."""
+        if not self.is_loaded:
+            return []
+        return list(expand_entries(self.data.get('participants', [])))
+
+    @property
+    def exchanges(self) -> list:
+        """ The exchange entries of the topology, one per instance of a replicated exchange
+            (empty if the document could not be loaded)."""
+        if not self.is_loaded:
+            return []
+        return list(expand_entries(self.data.get('exchanges', [])))
+
+    def participant_names(self) -> list[str]:
+        """Names of all participants in declaration order."""
+        if not self.is_loaded:
+            return []
+        return [participant['name'] for participant in expand_entries(self.data.get('participants', []))]
@@ -0,0 +1,228 @@
+from pathlib import Path
+import json
+import struct
+
+import yaml
+
+TOPOLOGY_FORMATS = ("yaml", "json", "cbor")
+FORMAT_EXTENSIONS = {".yaml": "yaml", ".yml": "yaml", ".json": "json", ".cbor": "cbor"}
+# Self-described CBOR (tag 55799) starts every CBOR topology, the bytes are never valid UTF-8 text
+CBOR_MAGIC = b"\xd9\xd9\xf7"
+# The libyaml loader is much faster than the pure Python one and loads the same data
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+# libyaml builds nested collections by C recursion and crashes the process instead of raising for documents nested some
+# ten thousand levels deep. Documents that might be nested deeper than this are loaded by the pure Python loader, which
+# raises a RecursionError instead
+C_LOADER_MAX_DEPTH = 5000
+
+
+def detect_format(source: str, content: bytes) -> str:
+    """ Determines the format of a topology document by its magic bytes or the extension of its file name.
+        A document without either that starts with "{" is tried as JSON first, everything else is YAML.
+        :param source: The file path or a description of the document
+        :param content: The raw bytes of the document
+        :return: One of TOPOLOGY_FORMATS"""
+    if content.startswith(CBOR_MAGIC):
+        return "cbor"
+    extension_format = FORMAT_EXTENSIONS.get(Path(str(source)).suffix.lower())
+    if extension_format is not None:
+        return extension_format
+    if content.lstrip(b"\xef\xbb\xbf \t\r\n").startswith(b"{"):
+        return "json"
+    return "yaml"
+
+
+def _may_nest_deeper(text: str, depth: int) -> bool:
+    """ Cheap upper bound check of the nesting depth of a YAML document. Every flow collection needs a bracket and the
+        entries of a block collection start at most two levels further right than the ones of its parent."""
+    if len(text) <= depth:
+        return False
+    longest_line = max(map(len, text.splitlines()), default=0)
+    return text.count("[") + text.count("{") + 2 * (longest_line + 1) > depth
+
+
+def load_yaml(text: str):
+    """Loads a YAML topology with the libyaml loader if PyYAML was built with it."""
+    if _may_nest_deeper(text, C_LOADER_MAX_DEPTH):
+        return yaml.load(text, Loader=yaml.SafeLoader)
+    return yaml.load(text, Loader=YAML_LOADER)
+
+
+def dump_topology(data, topology_format: str) -> bytes:
+    """ Encodes a parsed topology in one of TOPOLOGY_FORMATS. Every format holds the same data, a topology that is
+        converted generates the same files as the original.
+        :param data: The topology as loaded from any of the formats
+        :param topology_format: The format of the result"""
+    if topology_format == "yaml":
+        return yaml.safe_dump(data, sort_keys=False).encode("utf-8")
+    if topology_format == "json":
+        return json.dumps(data, indent=2).encode("utf-8")
+    if topology_format == "cbor":
+        return encode_cbor(data)
+    raise ValueError(f"Unknown topology format {topology_format}, expected one of {', '.join(TOPOLOGY_FORMATS)}")
+
+
+def _encode_head(major_type: int, argument: int, chunks: list) -> None:
+    """Appends the initial byte and the argument of a CBOR data item."""
+    if argument < 24:
+        chunks.append(bytes((major_type << 5 | argument,)))
+    elif argument < 0x100:
+        chunks.append(struct.pack(">BB", major_type << 5 | 24, argument))
+    elif argument < 0x10000:
+        chunks.append(struct.pack(">BH", major_type << 5 | 25, argument))
+    elif argument < 0x100000000:
+        chunks.append(struct.pack(">BI", major_type << 5 | 26, argument))
+    elif argument < 0x10000000000000000:
+        chunks.append(struct.pack(">BQ", major_type << 5 | 27, argument))
+    else:
+        raise ValueError(f"Integer {argument} does not fit into 64 bits")
+
+
+def _encode_item(value, chunks: list) -> None:
+    """Appends the CBOR encoding of a value."""
+    if value is None:
+        chunks.append(b"\xf6")
+    elif value is True:
+        chunks.append(b"\xf5")
+    elif value is False:
+        chunks.append(b"\xf4")
+    elif isinstance(value, int):
+        if value >= 0:
+            _encode_head(0, value, chunks)
+        else:
+            _encode_head(1, -1 - value, chunks)
+    elif isinstance(value, float):
+        chunks.append(struct.pack(">Bd", 0xfb, value))
+    elif isinstance(value, str):
+        encoded = value.encode("utf-8")
+        _encode_head(3, len(encoded), chunks)
+        chunks.append(encoded)
+    elif isinstance(value, (bytes, bytearray)):
+        _encode_head(2, len(value), chunks)
+        chunks.append(bytes(value))
+    elif isinstance(value, (list, tuple)):
+        _encode_head(4, len(value), chunks)
+        for item in value:
+            _encode_item(item, chunks)
+    elif isinstance(value, dict):
+        _encode_head(5, len(value), chunks)
+        for key, item in value.items():
+            _encode_item(key, chunks)
+            _encode_item(item, chunks)
+    else:
+        raise ValueError(f"Cannot encode {type(value).__name__} in a CBOR topology")
+
+
+def encode_cbor(data) -> bytes:
+    """ Encodes a topology as self-described CBOR (RFC 8949), the compact binary topology format.
+        Only the types of a parsed topology are supported: mappings, lists, strings, numbers, booleans and null."""
+    chunks = [CBOR_MAGIC]
+    _encode_item(data, chunks)
+    return b"".join(chunks)
+
+
+class _CborDecoder:
+    def __init__(self, content: bytes) -> None:
+        """ Decodes a CBOR document with the subset of CBOR that encode_cbor writes, plus indefinite lengths and
+            half and single precision floats as written by other encoders.
+            :param content: The encoded document"""
+        self.content = content
+        self.position = 0
+
+    def _read(self, length: int) -> bytes:
+        end = self.position + length
+        if end > len(self.content):
+            raise ValueError("CBOR document ends unexpectedly")
+        data = self.content[self.position:end]
+        self.position = end
+        return data
+
+    def _argument(self, additional: int) -> int:
+        """Reads the argument of a data item, None for an indefinite length."""
+        if additional < 24:
+            return additional
+        if additional == 24:
+            return self._read(1)[0]
+        if additional == 25:
+            return struct.unpack(">H", self._read(2))[0]
+        if additional == 26:
+            return struct.unpack(">I", self._read(4))[0]
+        if additional == 27:
+            return struct.unpack(">Q", self._read(8))[0]
+        if additional == 31:
+            return None
+        raise ValueError(f"Invalid CBOR argument {additional} at byte {self.position - 1}")
+
+    def _at_break(self) -> bool:
+        """Consumes the break that ends an indefinite length item."""
+        if self.content[self.position:self.position + 1] == b"\xff":
+            self.position += 1
+            return True
+        return False
+
+    def decode(self):
+        """Decodes the next data item."""
+        initial = self._read(1)[0]
+        major_type, additional = initial >> 5, initial & 0x1f
+        if major_type == 7:
+            if additional == 20:
+                return False
+            if additional == 21:
+                return True
+            if additional in (22, 23):
+                return None
+            if additional == 25:
+                return struct.unpack(">e", self._read(2))[0]
+            if additional == 26:
+                return struct.unpack(">f", self._read(4))[0]
+            if additional == 27:
+                return struct.unpack(">d", self._read(8))[0]
+            raise ValueError(f"Unsupported CBOR simple value {additional}")
+        argument = self._argument(additional)
+        if major_type == 0:
+            return argument
+        if major_type == 1:
+            return -1 - argument
+        if major_type in (2, 3):
+            if argument is None:
+                chunks = []
+                while not self._at_break():
+                    chunks.append(self.decode())
+                return "".join(chunks) if major_type == 3 else b"".join(chunks)
+            data = self._read(argument)
+            return data.decode("utf-8") if major_type == 3 else data
+        if major_type == 4:
+            if argument is None:
+                items = []
+                while not self._at_break():
+                    items.append(self.decode())
+                return items
+            return [self.decode() for _ in range(argument)]
+        if major_type == 5:
+            mapping = {}
+            if argument is None:
+                while not self._at_break():
+                    key = self.decode()
+                    mapping[key] = self.decode()
+            else:
+                for _ in range(argument):
+                    key = self.decode()
+                    mapping[key] = self.decode()
+            return mapping
+        # major type 6, a tag: the tagged value is used as it is
+        return self.decode()
+
+
+def decode_cbor(content: bytes):
+    """ Decodes a CBOR topology.
+        :raises ValueError: If the document is not valid CBOR"""
+    decoder = _CborDecoder(content)
+    try:
+        data = decoder.decode()
+    except (struct.error, UnicodeDecodeError, TypeError) as cbor_error:
+        raise ValueError(f"Invalid CBOR document: {cbor_error}")
+    except RecursionError:
+        raise ValueError("Invalid CBOR document: nested too deeply")
+    if decoder.position != len(content):
+        raise ValueError(f"Invalid CBOR document: unexpected data after byte {decoder.position}")
+    return data
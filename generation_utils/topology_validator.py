@@ -0,0 +1,35 @@
+from pathlib import Path
+import functools
+import json
+
+import jsonschema
+
+SCHEMA_PATH = Path(__file__).parent.parent / "schemas" / "topology-schema.json"
+
+
+@functools.lru_cache(maxsize=None)
+def load_topology_validator():
+    """Loads the topology schema and builds its validator once per process."""
+    with open(SCHEMA_PATH) as schema_file:
+        schema = json.load(schema_file)
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+def _location(error) -> str:
+    """The position of an error in the topology, e.g. coupling-scheme.time-window-size or exchanges[2].data."""
+    location = ""
+    for part in error.absolute_path:
+        location += f"[{part}]" if isinstance(part, int) else (f".{part}" if location else str(part))
+    return location or "topology"
+
+
+def topology_errors(data) -> list[str]:
+    """ Validates a parsed topology against the topology schema.
+        All errors are reported, ordered by their position in the topology.
+        :param data: The topology as loaded from YAML
+        :return: One message per error, empty if the topology is valid"""
+    errors = sorted(load_topology_validator().iter_errors(data),
+                    key=lambda error: [str(part) for part in error.absolute_path])
+    return [f"{_location(error)}: {error.message}" for error in errors]
@@ -0,0 +1,222 @@
+from pathlib import Path
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+import types
+
+from .file_generator import FileGenerator
+from .profiler import Profiler
+from .template_registry import TEMPLATES
+from .topology_document import TopologyDocument
+from .topology_validator import load_topology_validator, topology_errors
+
+# inotify events that show that a file was written, replaced (editors save to a new file and rename it) or deleted
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCHED_EVENTS = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII") # wd, mask, cookie, length of the name
+
+
+class InotifyWatcher:
+    def __init__(self, watched_file: Path) -> None:
+        """ Waits for changes of a file with inotify (Linux), without polling.
+            The folder of the file is watched, so that files that are replaced by renaming them are noticed too.
+            :param watched_file: The file to watch
+            :raises OSError: If inotify is not available"""
+        self.watched_file = Path(watched_file).resolve()
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        try:
+            inotify_init1, inotify_add_watch = libc.inotify_init1, libc.inotify_add_watch
+        except AttributeError:
+            raise OSError("inotify is not available on this platform")
+        self._fd = inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if inotify_add_watch(self._fd, os.fsencode(self.watched_file.parent), WATCHED_EVENTS) < 0:
+            error_number = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(error_number, f"Cannot watch {self.watched_file.parent}")
+
+    def wait(self, timeout: float = None) -> bool:
+        """ Waits until the file changes.
+            :param timeout: Seconds to wait at most, forever if None
+            :return: True if the file changed, False if the timeout passed"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        name = os.fsencode(self.watched_file.name)
+        while True:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            if not select.select([self._fd], [], [], remaining)[0]:
+                return False
+            events = os.read(self._fd, 64 * 1024)
+            offset = 0
+            while offset < len(events):
+                _, mask, _, length = EVENT_HEADER.unpack_from(events, offset)
+                offset += EVENT_HEADER.size
+                event_name = events[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if event_name == name and mask & WATCHED_EVENTS:
+                    return True
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    def __init__(self, watched_file: Path, interval: float = 0.25) -> None:
+        """ Waits for changes of a file by comparing its modification time, size and inode regularly.
+            Used where inotify is not available.
+            :param watched_file: The file to watch
+            :param interval: Seconds between two checks"""
+        self.watched_file = Path(watched_file)
+        self.interval = interval
+        self._signature = self._stat()
+
+    def _stat(self):
+        try:
+            stat = self.watched_file.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def wait(self, timeout: float = None) -> bool:
+        """ Waits until the file changes.
+            :param timeout: Seconds to wait at most, forever if None
+            :return: True if the file changed, False if the timeout passed"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            signature = self._stat()
+            if signature != self._signature:
+                self._signature = signature
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(self.interval if deadline is None else min(self.interval, max(deadline - time.monotonic(), 0.0)))
+
+    def close(self) -> None:
+        pass
+
+
+def create_file_watcher(watched_file: Path, polling: bool = False):
+    """ Creates an inotify watcher, or a polling watcher if inotify is not available or polling is requested.
+        :param watched_file: The file to watch"""
+    if not polling:
+        try:
+            return InotifyWatcher(watched_file)
+        except OSError:
+            pass
+    return PollingWatcher(watched_file)
+
+
+class TopologyWatcher:
+    def __init__(self, input_file: Path, output_path: Path, validate_topology: bool = True, jobs: int = None,
+                 debounce: float = 0.2, polling: bool = False, verbose: bool = False) -> None:
+        """ Stays resident and regenerates a case whenever its topology.yaml changes.
+            Imports, the schema validator and the templates are loaded once. Every generated file records the part of
+            the topology it depends on; files whose part did not change are taken over from the previous generation
+            without generating them again, e.g. changing only the acceleration rewrites only precice-config.xml.
+            :param input_file: The topology.yaml to watch
+            :param output_path: Path to the folder where the _generated/ folder will be placed
+            :param validate_topology: Whether to validate the topology before generating. An invalid topology is
+                reported and nothing is generated until it is fixed
+            :param jobs: Number of threads generating the files of the participants
+            :param debounce: Seconds without further changes before a change is generated, so that an editor that
+                saves several times in a row triggers one generation
+            :param polling: Poll the file instead of using inotify
+            :param verbose: Print all messages of every generation"""
+        self.input_file = Path(input_file)
+        self.output_path = Path(output_path)
+        self.validate_topology = validate_topology
+        self.jobs = jobs
+        self.debounce = debounce
+        self.polling = polling
+        self.verbose = verbose
+        self.generations = 0
+        self._data = None # topology of the last generation
+        self._file_inputs = {} # inputs of every file of the last generation
+        if validate_topology:
+            load_topology_validator()
+        TEMPLATES.preload()
+
+    def generate(self) -> bool:
+        """ Generates the case once, taking over every file whose inputs did not change since the last generation.
+            Prints the outcome and the time of every stage. A generation that raises is reported as an error.
+            :return: True if the case was generated without errors"""
+        profiler = Profiler()
+        with profiler.span("load topology"):
+            topology = TopologyDocument.from_file(self.input_file)
+        if topology.error is not None:
+            print(f"Cannot read {self.input_file}: {topology.error}")
+            return False
+        if topology.data == self._data and (self.output_path / "_generated").is_dir():
+            print(f"{self.input_file} did not change, nothing to generate.")
+            return True
+
+        if self.validate_topology:
+            with profiler.span("schema validation"):
+                validation_errors = topology_errors(topology.data)
+            if validation_errors:
+                print(f"Validation of {self.input_file} failed:")
+                for validation_error in validation_errors:
+                    print(f"  - {validation_error}")
+                return False
+
+        file_generator = FileGenerator(self.input_file, self.output_path, topology=topology, jobs=self.jobs,
+                                       profiler=profiler, previous_inputs=self._file_inputs)
+        file_generator.logger.clear_log_state()
+        try:
+            with profiler.span("generate"):
+                file_generator.generate()
+        except Exception as generation_exception:
+            # A crashed generation is reported like a failed one, the watcher keeps waiting for the next change
+            file_generator.logger.error(f"Generation of {self.input_file} failed: "
+                                        f"{type(generation_exception).__name__}: {generation_exception}")
+        self.generations += 1
+
+        changed = self._changed_sections(topology.data)
+        succeeded = not file_generator.has_errors()
+        if succeeded:
+            # A failed generation is not a reference, its files are generated again next time
+            self._data = topology.data
+            self._file_inputs = file_generator.file_inputs
+        file_generator.handle_output(types.SimpleNamespace(verbose=self.verbose))
+        created = len(file_generator.structure.created_files)
+        kept = len(file_generator.kept_files)
+        print(f"Generation {self.generations}" + (f" (changed: {', '.join(changed)})" if changed else "") +
+              f": {created - kept} of {created} files generated, {kept} unchanged files kept")
+        profiler.print_table()
+        return succeeded
+
+    def _changed_sections(self, data) -> list[str]:
+        """The top-level sections of the topology that differ from the last generation."""
+        if not isinstance(self._data, dict) or not isinstance(data, dict):
+            return []
+        return [section for section in dict.fromkeys(list(self._data) + list(data))
+                if self._data.get(section) != data.get(section)]
+
+    def run(self, max_generations: int = None) -> None:
+        """ Generates the case and regenerates it on every change of the topology until interrupted.
+            :param max_generations: Stop after this many generations, run until interrupted if None"""
+        watcher = create_file_watcher(self.input_file, polling=self.polling)
+        kind = "polling" if isinstance(watcher, PollingWatcher) else "inotify"
+        try:
+            self.generate()
+            while max_generations is None or self.generations < max_generations:
+                print(f"Watching {self.input_file} for changes ({kind}), press Ctrl+C to stop.")
+                sys.stdout.flush()
+                watcher.wait()
+                # Wait until the file stays unchanged for the debounce time
+                while watcher.wait(self.debounce):
+                    pass
+                self.generate()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
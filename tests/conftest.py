@@ -0,0 +1,49 @@
+from pathlib import Path
+import sys
+
+import pytest
+import yaml
+
+import cli
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "examples"
+
+
+@pytest.fixture(autouse=True)
+def generation_cache_dir(tmp_path, monkeypatch) -> Path:
+    """Every test gets its own cache of generated cases instead of the one in the home folder."""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("PRECICE_GEN_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+@pytest.fixture
+def topology_file(tmp_path) -> Path:
+    """A copy of a valid two-participant topology."""
+    topology = tmp_path / "topology.yaml"
+    topology.write_text((EXAMPLES / "1" / "topology.yaml").read_text(encoding="utf-8"), encoding="utf-8")
+    return topology
+
+
+@pytest.fixture
+def unbuildable_topology() -> dict:
+    """A topology that passes the schema validation, but whose preCICE configuration cannot be built."""
+    topology = yaml.safe_load((EXAMPLES / "expert" / "5" / "topology.yaml").read_text(encoding="utf-8"))
+    topology["coupling-scheme"]["coupling"] = "serial"
+    return topology
+
+
+def snapshot(folder: Path) -> dict:
+    """The content of every file below a folder, by its relative path."""
+    return {path.relative_to(folder).as_posix(): path.read_bytes() for path in sorted(folder.rglob("*"))
+            if path.is_file()}
+
+
+def run_cli(monkeypatch, *argv) -> int:
+    """Runs the command-line interface and returns its exit code."""
+    monkeypatch.setattr(sys, "argv", ["precice-gen", *map(str, argv)])
+    try:
+        cli.main()
+    except SystemExit as exit_request:
+        return exit_request.code or 0
+    return 0
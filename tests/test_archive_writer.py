@@ -0,0 +1,58 @@
+import io
+import sys
+import tarfile
+import zipfile
+
+import pytest
+
+from generation_utils import archive_writer
+from generation_utils.archive_writer import write_archive
+from conftest import run_cli
+
+FILES = {"precice-config.xml": b"<precice-configuration/>\n", "fluid-su2/run.sh": b"#!/bin/sh\n"}
+
+
+@pytest.mark.parametrize("name", ["case.tar", "case.tar.gz", "case.tgz"])
+def test_tar_archives(tmp_path, name):
+    write_archive(FILES, tmp_path / name, mtime=0)
+    with tarfile.open(tmp_path / name) as archive:
+        assert archive.getnames() == ["_generated", "_generated/fluid-su2", "_generated/fluid-su2/run.sh",
+                                      "_generated/precice-config.xml"]
+        assert archive.getmember("_generated/fluid-su2/run.sh").mode == 0o755
+        assert archive.extractfile("_generated/precice-config.xml").read() == FILES["precice-config.xml"]
+
+
+def test_zip_archive_to_a_stream():
+    stream = io.BytesIO()
+    write_archive(FILES, stream, archive_format="zip")
+    with zipfile.ZipFile(io.BytesIO(stream.getvalue())) as archive:
+        assert archive.read("_generated/fluid-su2/run.sh") == FILES["fluid-su2/run.sh"]
+
+
+def test_failed_write_keeps_the_previous_archive(monkeypatch, tmp_path):
+    target = tmp_path / "case.tar"
+    target.write_bytes(b"previous")
+
+    def broken_write(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(archive_writer, "_write_tar", broken_write)
+    with pytest.raises(OSError):
+        write_archive(FILES, target)
+    assert target.read_bytes() == b"previous"
+    assert [path.name for path in tmp_path.iterdir()] == ["case.tar"]
+
+
+def test_cli_exits_non_zero_if_the_archive_cannot_be_written(monkeypatch, tmp_path, topology_file):
+    # zstandard cannot be imported, so no tar.zst archive can be written
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+    assert run_cli(monkeypatch, "-f", topology_file, "--archive", tmp_path / "case.tar.zst") == 1
+    assert not (tmp_path / "case.tar.zst").exists()
+
+
+def test_cli_writes_no_archive_if_the_generation_failed(monkeypatch, tmp_path):
+    broken_topology = tmp_path / "broken.yaml"
+    broken_topology.write_text("coupling-scheme:\n  max-time: 1.0\n", encoding="utf-8")
+    assert run_cli(monkeypatch, "-f", broken_topology, "--archive", tmp_path / "case.tar",
+                   "--no-validate-topology") == 1
+    assert not (tmp_path / "case.tar").exists()
@@ -0,0 +1,25 @@
+import json
+
+import yaml
+
+from generation_utils.batch_generator import BatchGenerator, find_topologies
+
+
+def test_topologies_sharing_an_output_root_are_rejected(tmp_path, topology_file):
+    (tmp_path / "topology.json").write_text(json.dumps(yaml.safe_load(topology_file.read_text(encoding="utf-8"))),
+                                            encoding="utf-8")
+    other_case = tmp_path / "other" / "topology.yaml"
+    other_case.parent.mkdir()
+    other_case.write_text(topology_file.read_text(encoding="utf-8"), encoding="utf-8")
+
+    topology_files = find_topologies([tmp_path])
+    results = BatchGenerator(topology_files, workers=1, use_cache=False).run()
+
+    statuses = {result["input"]: result["status"] for result in results}
+    assert statuses == {str(tmp_path / "other" / "topology.yaml"): "success",
+                        str(tmp_path / "topology.json"): "error",
+                        str(tmp_path / "topology.yaml"): "error"}
+    assert [result["input"] for result in results] == [str(path) for path in topology_files]
+    assert "Shares the output folder" in results[1]["errors"][0]
+    assert not (tmp_path / "_generated").exists()
+    assert (tmp_path / "other" / "_generated" / "precice-config.xml").is_file()
@@ -0,0 +1,26 @@
+import yaml
+
+from generation_utils.case_planner import plan_case
+from conftest import run_cli, snapshot
+
+
+def test_plan_of_an_unchanged_case(monkeypatch, tmp_path, topology_file):
+    assert run_cli(monkeypatch, "-f", topology_file, "-o", tmp_path / "out", "--no-cache") == 0
+    plan = plan_case(topology_file.read_text(encoding="utf-8"), output_path=tmp_path / "out")
+    assert not plan.errors
+    assert not plan.has_changes
+
+
+def test_failed_generation_is_reported_in_the_plan(monkeypatch, capsys, tmp_path, topology_file,
+                                                   unbuildable_topology):
+    assert run_cli(monkeypatch, "-f", topology_file, "-o", tmp_path / "out", "--no-cache") == 0
+    before = snapshot(tmp_path / "out")
+    unbuildable_file = tmp_path / "unbuildable.yaml"
+    unbuildable_file.write_text(yaml.safe_dump(unbuildable_topology), encoding="utf-8")
+
+    assert run_cli(monkeypatch, "plan", "-f", unbuildable_file, "-o", tmp_path / "out") == 1
+    assert run_cli(monkeypatch, "plan", "-f", topology_file, "--against", unbuildable_file) == 1
+    output = capsys.readouterr().out
+    assert "Failed to build preCICE XML config" in output
+    assert "older topology: Failed to build preCICE XML config" in output
+    assert snapshot(tmp_path / "out") == before
@@ -0,0 +1,35 @@
+from conftest import run_cli, snapshot
+
+
+def test_generation_writes_the_case(monkeypatch, tmp_path, topology_file):
+    assert run_cli(monkeypatch, "-f", topology_file, "-o", tmp_path / "out") == 0
+    generated = snapshot(tmp_path / "out" / "_generated")
+    assert "precice-config.xml" in generated
+    assert "fluid-su2/adapter-config.json" in generated
+
+
+def test_failed_generation_keeps_the_previous_case(monkeypatch, tmp_path, topology_file):
+    output = tmp_path / "out"
+    assert run_cli(monkeypatch, "-f", topology_file, "-o", output) == 0
+    previous = snapshot(output / "_generated")
+
+    # No participants can be extracted, the generation logs errors
+    broken_topology = tmp_path / "broken.yaml"
+    broken_topology.write_text("coupling-scheme:\n  max-time: 1.0\n", encoding="utf-8")
+    assert run_cli(monkeypatch, "-f", broken_topology, "-o", output, "--no-validate-topology") == 1
+
+    assert snapshot(output / "_generated") == previous
+    assert [path.name for path in output.iterdir()] == ["_generated"]
+
+
+def test_unreadable_topology_exits_before_generating(monkeypatch, tmp_path):
+    broken_topology = tmp_path / "topology.yaml"
+    broken_topology.write_text("participants: [\n  - name: Fluid\n", encoding="utf-8")
+    assert run_cli(monkeypatch, "-f", broken_topology, "-o", tmp_path / "out", "--no-validate-topology") == 1
+    assert not (tmp_path / "out").exists()
+
+
+def test_directory_as_topology_exits_before_generating(monkeypatch, capsys, tmp_path):
+    assert run_cli(monkeypatch, "-f", tmp_path, "-o", tmp_path / "out") == 1
+    assert f"Input file {tmp_path} cannot be read: Is a directory." in capsys.readouterr().out
+    assert not (tmp_path / "out").exists()
@@ -0,0 +1,73 @@
+import shutil
+
+import pytest
+
+from generation_utils import generation_cache
+from generation_utils.file_generator import FileGenerator
+from generation_utils.generation_cache import GenerationCache, generator_fingerprint
+from generation_utils.topology_document import TopologyDocument
+from conftest import snapshot
+
+
+@pytest.fixture
+def package_copy(tmp_path, monkeypatch):
+    """A copy of the generator sources whose templates a test may change."""
+    package_root = tmp_path / "package"
+    for folder in generation_cache.GENERATOR_SOURCES:
+        shutil.copytree(generation_cache.PACKAGE_ROOT / folder, package_root / folder,
+                        ignore=shutil.ignore_patterns("__pycache__"))
+    monkeypatch.setattr(generation_cache, "PACKAGE_ROOT", package_root)
+    generator_fingerprint.cache_clear()
+    yield package_root
+    generator_fingerprint.cache_clear()
+
+
+def test_changed_template_changes_the_cache_key(package_copy, topology_file):
+    data = TopologyDocument.from_file(topology_file).data
+    key = GenerationCache().key_for(data)
+
+    template = package_copy / "templates" / "template_clean.sh"
+    template.write_text(template.read_text(encoding="utf-8") + "# changed\n", encoding="utf-8")
+    generator_fingerprint.cache_clear()
+    assert GenerationCache().key_for(data) != key
+
+
+def test_changed_generator_source_changes_the_cache_key(package_copy, topology_file):
+    data = TopologyDocument.from_file(topology_file).data
+    key = GenerationCache().key_for(data)
+
+    source = package_copy / "generation_utils" / "readme_generator.py"
+    source.write_text(source.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+    generator_fingerprint.cache_clear()
+    assert GenerationCache().key_for(data) != key
+
+
+def test_formatting_does_not_change_the_cache_key(topology_file):
+    reformatted = "# a comment\n" + topology_file.read_text(encoding="utf-8")
+    cache = GenerationCache()
+    assert cache.key_for(TopologyDocument.from_string(reformatted).data) == \
+        cache.key_for(TopologyDocument.from_file(topology_file).data)
+
+
+def test_cache_hit_restores_the_same_files(monkeypatch, tmp_path, topology_file):
+    FileGenerator(topology_file, tmp_path / "first", cache=GenerationCache()).generate()
+
+    def generate_level_0(self):
+        raise AssertionError("the case was generated again instead of being restored from the cache")
+
+    monkeypatch.setattr(FileGenerator, "generate_level_0", generate_level_0)
+    assert FileGenerator(topology_file, tmp_path / "second", cache=GenerationCache()).generate()
+    first, second = snapshot(tmp_path / "first" / "_generated"), snapshot(tmp_path / "second" / "_generated")
+    assert first == second
+
+
+def test_topology_with_a_bom_is_not_restored_from_the_cache(tmp_path, topology_file):
+    assert FileGenerator(topology_file, tmp_path / "first", cache=GenerationCache()).generate()
+
+    bom_file = tmp_path / "bom" / "topology.yaml"
+    bom_file.parent.mkdir()
+    bom_file.write_bytes(TopologyDocument.UTF8_BOM + topology_file.read_bytes())
+    file_generator = FileGenerator(bom_file, tmp_path / "second", cache=GenerationCache())
+    assert not file_generator.generate()
+    assert file_generator.cache_key is None
+    assert not (tmp_path / "second" / "_generated").exists()
@@ -0,0 +1,72 @@
+import io
+import json
+
+import pytest
+
+from generation_utils import generation_server
+from generation_utils.generation_server import GenerationServer
+from conftest import run_cli
+
+
+@pytest.fixture(scope="module")
+def server() -> GenerationServer:
+    return GenerationServer(use_cache=False)
+
+
+def answer(server: GenerationServer, request) -> dict:
+    return json.loads(server.handle_line(json.dumps(request)))
+
+
+@pytest.mark.parametrize("request_fields, field", [
+    ({"output": 5, "topology-file": "topology.yaml"}, "output"),
+    ({"output": "case", "topology": 123}, "topology"),
+    ({"output": "case", "topology-file": ["topology.yaml"]}, "topology-file"),
+    ({"output": "case", "topology": "{}", "clean": "yes"}, "clean"),
+])
+def test_mistyped_fields_are_answered_with_an_error(server, request_fields, field):
+    response = answer(server, {"id": 7, **request_fields})
+    assert response["id"] == 7
+    assert response["status"] == "error"
+    assert response["paths"] == []
+    assert any(f"'{field}'" in error for error in response["errors"])
+
+
+def test_request_that_is_no_object_is_answered_with_an_error(server):
+    response = json.loads(server.handle_line("[1, 2]"))
+    assert response["status"] == "error"
+
+
+def test_crashing_request_does_not_stop_the_stream(server, monkeypatch, tmp_path, topology_file):
+    def crash(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    requests = [{"id": 1, "topology-file": str(topology_file), "output": str(tmp_path / "crash")},
+                {"id": 2, "topology-file": str(topology_file), "output": str(tmp_path / "case")}]
+    output_stream = io.StringIO()
+    original_generate_case = generation_server.generate_case
+    calls = iter([crash, original_generate_case])
+    monkeypatch.setattr(generation_server, "generate_case", lambda *args, **kwargs: next(calls)(*args, **kwargs))
+    server.serve_stream(io.StringIO("".join(json.dumps(request) + "\n" for request in requests)), output_stream)
+
+    first, second = [json.loads(line) for line in output_stream.getvalue().splitlines()]
+    assert first == {"id": 1, "status": "error", "paths": [], "errors": ["RuntimeError: boom"], "warnings": [],
+                     "validation": None, "seconds": 0.0}
+    assert second["status"] == "success"
+    assert second["paths"]
+
+
+def test_failed_request_reports_no_paths(server, tmp_path):
+    # Without participants the generation logs errors and nothing is moved into place
+    response = answer(server, {"id": 3, "topology": "coupling-scheme:\n  max-time: 1.0\n", "validate": False,
+                               "output": str(tmp_path)})
+    assert response["status"] == "error"
+    assert response["paths"] == []
+    assert not (tmp_path / "_generated").exists()
+
+
+def test_socket_path_that_is_no_socket_is_not_replaced(monkeypatch, capsys, tmp_path):
+    regular_file = tmp_path / "not-a-socket"
+    regular_file.write_text("keep me", encoding="utf-8")
+    assert run_cli(monkeypatch, "serve", "--no-cache", "-s", regular_file) == 1
+    assert regular_file.read_text(encoding="utf-8") == "keep me"
+    assert "is not a socket" in capsys.readouterr().out
@@ -0,0 +1,74 @@
+import pytest
+import yaml
+
+from generation_utils.file_generator import FileGenerator
+from generation_utils.in_memory_generator import generate_in_memory
+from generation_utils.topology_document import TopologyDocument
+from conftest import run_cli, snapshot
+
+
+def test_files_match_the_command_line_interface(monkeypatch, tmp_path, topology_file):
+    assert run_cli(monkeypatch, "-f", topology_file, "-o", tmp_path / "out", "--no-cache") == 0
+    written = snapshot(tmp_path / "out" / "_generated")
+    written.pop(".manifest.json")
+
+    case = generate_in_memory(topology_file.read_text(encoding="utf-8"))
+    assert case.ok
+    assert case.files == written
+    assert case.config_ir is not None
+
+
+def test_filesystem_is_not_touched(monkeypatch, tmp_path, topology_file):
+    monkeypatch.chdir(tmp_path)
+    before = sorted(tmp_path.rglob("*"))
+    assert generate_in_memory(topology_file.read_bytes()).ok
+    assert sorted(tmp_path.rglob("*")) == before
+
+
+@pytest.mark.parametrize("wrap", [
+    lambda text: text,
+    lambda text: text.encode("utf-8"),
+    lambda text: yaml.safe_load(text),
+    lambda text: TopologyDocument.from_string(text),
+], ids=["str", "bytes", "dict", "document"])
+def test_accepted_topology_types(topology_file, wrap):
+    assert generate_in_memory(wrap(topology_file.read_text(encoding="utf-8"))).ok
+
+
+def test_unsupported_topology_type():
+    with pytest.raises(TypeError):
+        generate_in_memory(42)
+
+
+def test_invalid_topology_is_reported_as_diagnostics(topology_file):
+    data = yaml.safe_load(topology_file.read_text(encoding="utf-8"))
+    data["exchanges"][0]["type"] = "medium"
+    case = generate_in_memory(data)
+    assert not case.ok
+    assert case.files == {}
+    assert case.diagnostics[0]["source"] == "validation"
+    assert case.diagnostics[0]["message"].startswith("exchanges[0].type:")
+
+
+def test_failed_generation_returns_no_files():
+    case = generate_in_memory({"coupling-scheme": {"max-time": 1.0}}, validate_topology=False)
+    assert not case.ok
+    assert case.files == {}
+    assert all(diagnostic["source"] == "generation" for diagnostic in case.diagnostics)
+
+
+def test_unbuildable_topology_is_reported_as_diagnostics(unbuildable_topology):
+    case = generate_in_memory(unbuildable_topology)
+    assert not case.ok
+    assert case.files == {}
+    assert case.errors[0].startswith("Failed to build preCICE XML config")
+
+
+def test_crashed_generation_is_reported_as_diagnostics(monkeypatch, topology_file):
+    def crash(file_generator):
+        raise RuntimeError("stage crashed")
+
+    monkeypatch.setattr(FileGenerator, "generate_level_1", crash)
+    case = generate_in_memory(topology_file.read_text(encoding="utf-8"))
+    assert case.files == {}
+    assert case.errors == ["RuntimeError: stage crashed"]
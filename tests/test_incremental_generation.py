@@ -0,0 +1,58 @@
+import hashlib
+import json
+
+from generation_utils.file_generator import FileGenerator
+from generation_utils.structure_handler import StructureHandler
+
+
+def generate(topology_file, output, **kwargs) -> FileGenerator:
+    file_generator = FileGenerator(topology_file, output, **kwargs)
+    assert file_generator.generate()
+    return file_generator
+
+
+def test_manifest_records_the_hash_of_every_generated_file(tmp_path, topology_file):
+    generate(topology_file, tmp_path)
+    generated_root = tmp_path / "_generated"
+    manifest = json.loads((generated_root / StructureHandler.MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert manifest["version"] == 1
+    assert manifest["files"] == {
+        path.relative_to(generated_root).as_posix(): hashlib.sha256(path.read_bytes()).hexdigest()
+        for path in generated_root.rglob("*") if path.is_file() and path.name != StructureHandler.MANIFEST_NAME}
+
+
+def test_unchanged_files_are_not_rewritten(tmp_path, topology_file):
+    generate(topology_file, tmp_path)
+    config = tmp_path / "_generated" / "precice-config.xml"
+    inode = config.stat().st_ino
+
+    generate(topology_file, tmp_path)
+    # The file of the previous generation is taken over as hard link instead of being written again
+    assert config.stat().st_ino == inode
+
+
+def test_incremental_generation_takes_over_files_with_unchanged_inputs(tmp_path, topology_file):
+    first = generate(topology_file, tmp_path)
+    second = generate(topology_file, tmp_path, previous_inputs=first.file_inputs)
+    assert {path.name for path in second.kept_files} >= {"adapter-config.json", "run.sh", "precice-config.xml"}
+
+
+def test_files_that_are_no_longer_generated(tmp_path, topology_file):
+    generate(topology_file, tmp_path)
+    generated_root = tmp_path / "_generated"
+    stale = generated_root / "solid-calculix" / "run.sh"
+    modified = generated_root / "solid-calculix" / "adapter-config.json"
+    added = generated_root / "notes.txt"
+    modified.write_text(modified.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+    added.write_text("added by hand", encoding="utf-8")
+
+    # The files of solid-calculix are no longer generated
+    topology_file.write_text(topology_file.read_text(encoding="utf-8").replace("Solid", "Structure"), encoding="utf-8")
+    file_generator = generate(topology_file, tmp_path)
+
+    assert (generated_root / "structure-calculix" / "run.sh").is_file()
+    assert not stale.exists()
+    assert modified.is_file()
+    assert added.read_text(encoding="utf-8") == "added by hand"
+    assert file_generator.structure.logger.get_warnings() == [
+        f"Keeping {modified}: it is no longer generated but was modified."]
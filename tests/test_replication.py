@@ -0,0 +1,44 @@
+import pytest
+
+from controller_utils.ui_struct.UI_Replication import check_entries, expand_entries
+from generation_utils.in_memory_generator import generate_in_memory
+from generation_utils.topology_document import TopologyDocument
+
+
+def topology(participant: dict, exchange_replicate=None) -> dict:
+    exchange = {"from": "Fluid", "from-patch": "interface", "to": "Solid{i}", "to-patch": "surface", "data": "Force",
+                "type": "strong"}
+    if exchange_replicate is not None:
+        exchange["replicate"] = exchange_replicate
+    return {"participants": [{"name": "Fluid", "solver": "SU2"}, participant], "exchanges": [exchange]}
+
+
+def test_expand_entries_formats_the_index():
+    entries = [{"name": "Solid{i:02d}", "replicate": {"first": 1, "last": 3}}]
+    assert [entry["name"] for entry in expand_entries(entries)] == ["Solid01", "Solid02", "Solid03"]
+
+
+@pytest.mark.parametrize("entry, message", [
+    ({"name": "Solid{i:zz}", "replicate": 2}, "{i:zz}"),
+    ({"name": "Solid{i}", "replicate": {"first": 3, "last": 1}}, "'last' must not be smaller than 'first'"),
+    ({"name": "Solid{i}", "replicate": 0}, "at least 1"),
+    ({"name": "Solid{i}", "replicate": "two"}, "Invalid replicate value"),
+])
+def test_check_entries_names_the_broken_entry(entry, message):
+    with pytest.raises(ValueError, match="entry 1 \\(Solid") as error:
+        check_entries([{"name": "Fluid"}, entry])
+    assert message in str(error.value)
+
+
+def test_broken_replication_is_a_topology_error():
+    document = TopologyDocument.from_data(topology({"name": "Solid{i:zz}", "solver": "Calculix", "replicate": 2}))
+    assert document.error.startswith("Cannot replicate participants entry 1 (Solid{i:zz})")
+
+
+@pytest.mark.parametrize("validate_topology", [True, False])
+def test_in_memory_reports_broken_replication(validate_topology):
+    data = topology({"name": "Solid{i}", "solver": "Calculix", "replicate": 2}, {"first": 1, "last": 0})
+    case = generate_in_memory(data, validate_topology=validate_topology)
+    assert not case.ok
+    assert case.files == {}
+    assert "Cannot replicate exchanges entry 0 (Fluid -> Solid{i})" in case.errors[0]
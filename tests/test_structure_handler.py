@@ -0,0 +1,50 @@
+import pytest
+
+from generation_utils import structure_handler
+from generation_utils.structure_handler import StructureHandler, exchange_paths
+
+
+def generate(output, files: dict) -> StructureHandler:
+    """Writes a generation with the given files and moves it into place."""
+    structure = StructureHandler(output)
+    for relative_path, content in files.items():
+        target = structure.generated_root / relative_path
+        structure.make_folder(target.parent)
+        structure.write_file(target, content)
+    structure.finalize()
+    return structure
+
+
+def test_exchange_paths_swaps_two_folders(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "marker").write_text("a")
+    (tmp_path / "b").mkdir()
+    if not exchange_paths(tmp_path / "a", tmp_path / "b"):
+        pytest.skip("renameat2(RENAME_EXCHANGE) is not available here")
+    assert (tmp_path / "b" / "marker").read_text() == "a"
+    assert not (tmp_path / "a" / "marker").exists()
+
+
+@pytest.mark.parametrize("exchange", [True, False], ids=["exchange", "two-renames"])
+def test_regeneration_replaces_the_previous_generation(monkeypatch, tmp_path, exchange):
+    if not exchange:
+        monkeypatch.setattr(structure_handler, "exchange_paths", lambda first, second: False)
+    generate(tmp_path, {"a.txt": "first", "sub/b.txt": "first"})
+    structure = generate(tmp_path, {"a.txt": "second"})
+
+    assert not structure.logger.has_errors()
+    assert (tmp_path / "_generated" / "a.txt").read_text() == "second"
+    # b.txt is no longer generated and was not modified, so it is left out
+    assert not (tmp_path / "_generated" / "sub" / "b.txt").exists()
+    # Neither the staging dir nor the previous generation is left behind
+    assert [path.name for path in tmp_path.iterdir()] == ["_generated"]
+
+
+def test_discard_leaves_the_previous_generation(tmp_path):
+    generate(tmp_path, {"a.txt": "first"})
+    structure = StructureHandler(tmp_path)
+    structure.write_file(structure.generated_root / "a.txt", "second")
+    structure.discard()
+
+    assert (tmp_path / "_generated" / "a.txt").read_text() == "first"
+    assert [path.name for path in tmp_path.iterdir()] == ["_generated"]
@@ -0,0 +1,23 @@
+from generation_utils.sweep_generator import SweepGenerator
+from generation_utils.topology_document import TopologyDocument
+from conftest import snapshot
+
+
+def test_cases_do_not_share_files(tmp_path, topology_file):
+    variants = [{"coupling-scheme.max-time": max_time} for max_time in (1.0, 2.0, 3.0)]
+    sweep_generator = SweepGenerator(TopologyDocument.from_file(topology_file), tmp_path / "study", variants)
+    assert sweep_generator.run()
+
+    cases = [tmp_path / "study" / sweep_generator.case_name(index) / "_generated" for index in range(len(variants))]
+    run_scripts = sorted(path.relative_to(cases[0]) for path in cases[0].rglob("run.sh"))
+    assert run_scripts
+    for run_script in run_scripts:
+        assert len({(case / run_script).stat().st_ino for case in cases}) == len(cases)
+        assert all((case / run_script).stat().st_nlink == 1 for case in cases)
+
+    untouched = snapshot(cases[1])
+    edited = cases[0] / run_scripts[0]
+    with open(edited, "a", encoding="utf-8") as run_script:
+        run_script.write("# edited by hand\n")
+    assert snapshot(cases[1]) == untouched
+    assert snapshot(cases[0])[run_scripts[0].as_posix()] != untouched[run_scripts[0].as_posix()]
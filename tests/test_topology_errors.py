@@ -0,0 +1,43 @@
+from generation_utils.batch_generator import generate_case
+from generation_utils.in_memory_generator import generate_in_memory
+from generation_utils.topology_document import TopologyDocument
+
+BROKEN_YAML = "participants: [\n  - name: Fluid\n"
+
+
+def test_unreadable_topology_is_not_generated_without_validation(tmp_path):
+    topology = tmp_path / "topology.yaml"
+    topology.write_text(BROKEN_YAML, encoding="utf-8")
+    result = generate_case(topology, tmp_path, validate_topology=False)
+    assert result["status"] == "error"
+    assert result["paths"] == []
+    assert not (tmp_path / "_generated").exists()
+
+
+def test_missing_topology_is_not_generated(tmp_path):
+    result = generate_case(tmp_path / "missing.yaml", tmp_path)
+    assert result["status"] == "error"
+    assert not (tmp_path / "_generated").exists()
+
+
+def test_in_memory_reports_unreadable_topology():
+    case = generate_in_memory(BROKEN_YAML, validate_topology=False)
+    assert not case.ok
+    assert case.files == {}
+    assert [diagnostic["source"] for diagnostic in case.diagnostics] == ["topology"]
+
+
+def test_topology_with_a_bom_is_a_document_error(tmp_path, topology_file):
+    content = TopologyDocument.UTF8_BOM + topology_file.read_bytes()
+    assert "not UTF-8 encoded without BOM" in TopologyDocument("topology.yaml", content).error
+
+    bom_file = tmp_path / "bom" / "topology.yaml"
+    bom_file.parent.mkdir()
+    bom_file.write_bytes(content)
+    result = generate_case(bom_file, bom_file.parent, validate_topology=False)
+    assert result["status"] == "error"
+    assert not (bom_file.parent / "_generated").exists()
+
+    case = generate_in_memory(content, validate_topology=False)
+    assert case.files == {}
+    assert [diagnostic["source"] for diagnostic in case.diagnostics] == ["topology"]
@@ -0,0 +1,29 @@
+import pytest
+import yaml
+
+from generation_utils.topology_document import TopologyDocument
+from generation_utils.topology_formats import CBOR_MAGIC, dump_topology
+from conftest import EXAMPLES
+
+DEPTH = 100000
+
+
+@pytest.mark.parametrize("topology_format", ["yaml", "json", "cbor"])
+def test_formats_load_the_same_data(topology_format):
+    data = yaml.safe_load((EXAMPLES / "1" / "topology.yaml").read_text(encoding="utf-8"))
+    document = TopologyDocument(f"topology.{topology_format}", dump_topology(data, topology_format))
+    assert document.error is None
+    assert document.format == topology_format
+    assert document.data == data
+
+
+@pytest.mark.parametrize("source, content", [
+    ("topology.cbor", CBOR_MAGIC + b"\x81" * DEPTH + b"\x00"),
+    ("topology.json", b"[" * DEPTH + b"]" * DEPTH),
+    ("topology.yaml", b"[" * DEPTH + b"]" * DEPTH),
+    ("topology.yaml", b"a:\n" + b"".join(b" " * (level + 1) + b"- \n" for level in range(DEPTH // 10))),
+], ids=["cbor", "json", "yaml-flow", "yaml-block"])
+def test_deeply_nested_documents_are_errors(source, content):
+    document = TopologyDocument(source, content)
+    assert document.data is None
+    assert "nested too deeply" in document.error
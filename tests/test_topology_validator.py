@@ -0,0 +1,43 @@
+import copy
+
+import pytest
+
+from generation_utils.topology_validator import topology_errors
+
+TOPOLOGY = {
+    "coupling-scheme": {"max-time": 1.0},
+    "participants": [{"name": "Fluid", "solver": "SU2"}, {"name": "Solid", "solver": "Calculix"}],
+    "exchanges": [{"from": "Fluid", "from-patch": "interface", "to": "Solid", "to-patch": "surface",
+                   "data": "Force", "type": "strong"}],
+}
+
+
+def with_value(section: str, key: str, value) -> dict:
+    topology = copy.deepcopy(TOPOLOGY)
+    topology.setdefault(section, {})[key] = value
+    return topology
+
+
+@pytest.mark.parametrize("value", [1e-3, 2, "1e-3", "-1E+2", ".5e1"])
+def test_exponent_numbers_are_accepted(value):
+    assert topology_errors(with_value("coupling-scheme", "time-window-size", value)) == []
+
+
+@pytest.mark.parametrize("value", ["abc", "1.5", "1e", True])
+def test_other_values_are_rejected(value):
+    assert topology_errors(with_value("coupling-scheme", "time-window-size", value))
+
+
+@pytest.mark.parametrize("limit, valid", [("1e-3", True), (1e-16, True), ("0e0", False), ("-1e-3", False), (0, False)])
+def test_positive_exponent_numbers(limit, valid):
+    topology = with_value("acceleration", "name", "IQN-ILS")
+    topology["acceleration"]["filter"] = {"type": "QR2", "limit": limit}
+    assert (topology_errors(topology) == []) == valid
+
+
+def test_all_errors_are_reported_with_their_position():
+    topology = copy.deepcopy(TOPOLOGY)
+    topology["coupling-scheme"]["max-time"] = "abc"
+    topology["exchanges"][0]["type"] = "medium"
+    errors = topology_errors(topology)
+    assert [error.split(":")[0] for error in errors] == ["coupling-scheme.max-time", "exchanges[0].type"]
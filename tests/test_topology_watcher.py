@@ -0,0 +1,47 @@
+import yaml
+
+from generation_utils import topology_watcher
+from generation_utils.file_generator import FileGenerator
+from generation_utils.topology_watcher import TopologyWatcher
+from conftest import snapshot
+
+
+class EditingWatcher:
+    """Applies the next edit to the topology whenever the watcher waits for a change."""
+
+    def __init__(self, topology_file, edits) -> None:
+        self.topology_file = topology_file
+        self.edits = list(edits)
+
+    def wait(self, timeout: float = None) -> bool:
+        if timeout is not None:
+            # No further saves within the debounce time
+            return False
+        self.topology_file.write_text(self.edits.pop(0), encoding="utf-8")
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+def test_watcher_survives_a_crashed_generation(monkeypatch, capsys, tmp_path, topology_file, unbuildable_topology):
+    generate_level_1 = FileGenerator.generate_level_1
+
+    def crash_on_serial_coupling(file_generator):
+        if file_generator.topology.data["coupling-scheme"].get("coupling") == "serial":
+            raise RuntimeError("stage crashed")
+        generate_level_1(file_generator)
+
+    monkeypatch.setattr(FileGenerator, "generate_level_1", crash_on_serial_coupling)
+    good_edit = topology_file.read_text(encoding="utf-8").replace("coupling-scheme:\n",
+                                                                  "coupling-scheme:\n  max-time: 7.5\n")
+    monkeypatch.setattr(topology_watcher, "create_file_watcher",
+                        lambda *args, **kwargs: EditingWatcher(topology_file, [yaml.safe_dump(unbuildable_topology),
+                                                                               good_edit]))
+
+    watcher = TopologyWatcher(topology_file, tmp_path / "out", debounce=0.0)
+    watcher.run(max_generations=3)
+
+    assert watcher.generations == 3
+    assert "RuntimeError: stage crashed" in capsys.readouterr().out
+    assert b'<max-time value="7.5"' in snapshot(tmp_path / "out" / "_generated")["precice-config.xml"]